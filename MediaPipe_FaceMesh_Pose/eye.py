@@ -47,7 +47,7 @@ while cap.isOpened():
         break
 
     ts = time.time()
-    frame, eye_info = eye_detector.process_frame(frame)
+    frame, eye_info = eye_detector.process_frame(frame, timestamp=ts)
 
     if eye_info is not None:
         blink_count = eye_info["blink_count"]
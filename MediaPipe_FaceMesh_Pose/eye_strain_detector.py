@@ -1,238 +1,64 @@
-import mediapipe as mp
-import numpy as np
+import os
+import sys
 import cv2
-import time
-from collections import deque
+import mediapipe as mp
+
+# The calculator lives in the shared core so both pipelines use the same logic.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.eye_strain import EyeStrainDetector as EyeStrainCalculator
+from core.drawing import draw_eye_contours
+
 
-class EyeStrainDetector:
+class EyeStrainDetector(EyeStrainCalculator):
     """
-    Eye strain detector with:
-     - adaptive EAR calibration
-     - smoothing (moving average)
-     - robust blink counting using closed->open transitions with time thresholds
-     - rolling blink rate (timestamps in a window)
-     - drowsiness detection (long eye closure)
-     - yawn detection using Mouth Aspect Ratio (MAR)
+    FaceMesh front-end for the shared eye strain calculator.
+    - process_frame() runs its own FaceMesh model on the frame (loaded on first use).
+    - process_face() takes landmarks from elsewhere, e.g. an inference backend.
+    - Both hand the landmarks to the shared calculator (EAR, blinks, drowsiness, yawns)
+      and draw the eye overlay on the frame.
     """
 
-    # FaceMesh landmark indices (MediaPipe)
-    LEFT_EYE_IDX = [33, 160, 158, 133, 153, 144]
-    RIGHT_EYE_IDX = [362, 385, 387, 263, 373, 380]
-    # approximate mouth indices for MAR (inner upper, inner lower, left corner, right corner)
-    MOUTH_TOP = 13
-    MOUTH_BOTTOM = 14
-    MOUTH_LEFT = 78
-    MOUTH_RIGHT = 308
-
-    def __init__(self,
-                 ear_smoothing=5,
-                 ear_threshold_default=0.21,
-                 consec_frames_for_blink=2,
-                 blink_window_seconds=60,
-                 drowsy_time_seconds=0.8,
-                 ear_calib_frames=60,
-                 mar_threshold=0.65,
-                 yawn_time_seconds=0.6):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         # MediaPipe face mesh
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
-
-        # Parameters
-        self.ear_smoothing = ear_smoothing
-        self.EAR_THRESHOLD_DEFAULT = ear_threshold_default
-        self.CONSEC_FRAMES = consec_frames_for_blink
-        self.blink_window_seconds = blink_window_seconds
-        self.drowsy_time_seconds = drowsy_time_seconds
-        self.ear_calib_frames = ear_calib_frames
-        self.MAR_THRESHOLD = mar_threshold
-        self.YAWN_TIME = yawn_time_seconds
-
-        # State
-        self.ear_history = deque(maxlen=ear_smoothing)
-        self.blink_timestamps = deque()
-        self.blink_count = 0
-
-        # For blink detection (state machine)
-        self._closed = False
-        self._closure_start_time = None
-        self._last_blink_time = None
-
-        # Calibration
-        self.calib_mode = False
-        self.calib_values = []
-        self.calibrated = False
-        self.baseline_ear = None
-        self.blink_threshold = self.EAR_THRESHOLD_DEFAULT
-        self.drowsy_threshold = self.EAR_THRESHOLD_DEFAULT * 0.5
-
-        # Yawn state
-        self._yawn_start = None
-
-    def start_calibration(self):
-        """Begin calibration — collect ear samples for ear_calib_frames frames"""
-        self.calib_mode = True
-        self.calib_values = []
-        print("Eye calibration started... please look at the camera with eyes open.")
-
-    def calculate_EAR(self, landmarks, eye_indices, image_shape):
-        coords = [(int(landmarks[i].x * image_shape[1]),
-                   int(landmarks[i].y * image_shape[0])) for i in eye_indices]
-        A = np.linalg.norm(np.array(coords[1]) - np.array(coords[5]))  # vertical 1
-        B = np.linalg.norm(np.array(coords[2]) - np.array(coords[4]))  # vertical 2
-        C = np.linalg.norm(np.array(coords[0]) - np.array(coords[3]))  # horizontal
-        if C == 0:
-            return 0.0, coords
-        EAR = (A + B) / (2.0 * C)
-        return EAR, coords
-
-    def calculate_MAR(self, landmarks, image_shape):
-        # Compute simple mouth aspect ratio using top/bottom inner lip and left/right corners
-        try:
-            top = landmarks[self.MOUTH_TOP]
-            bottom = landmarks[self.MOUTH_BOTTOM]
-            left = landmarks[self.MOUTH_LEFT]
-            right = landmarks[self.MOUTH_RIGHT]
-            top_pt = np.array([int(top.x * image_shape[1]), int(top.y * image_shape[0])])
-            bottom_pt = np.array([int(bottom.x * image_shape[1]), int(bottom.y * image_shape[0])])
-            left_pt = np.array([int(left.x * image_shape[1]), int(left.y * image_shape[0])])
-            right_pt = np.array([int(right.x * image_shape[1]), int(right.y * image_shape[0])])
-            ver = np.linalg.norm(top_pt - bottom_pt)
-            hor = np.linalg.norm(left_pt - right_pt)
-            if hor == 0:
-                return 0.0
-            MAR = ver / hor
-            return MAR
-        except Exception:
-            return 0.0
-
-    def _register_blink(self):
-        now = time.time()
-        self.blink_timestamps.append(now)
-        self.blink_count += 1
-        cutoff = now - self.blink_window_seconds
-        while self.blink_timestamps and self.blink_timestamps[0] < cutoff:
-            self.blink_timestamps.popleft()
-
-    def _blink_rate(self):
-        window_count = len(self.blink_timestamps)
-        return (window_count / max(1, self.blink_window_seconds)) * 60.0
-
-    def _smooth_ear(self, ear):
-        self.ear_history.append(ear)
-        return float(np.mean(self.ear_history))
-
-    def process_frame(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.face_mesh = None
+
+    def process_frame(self, frame, rgb=None, timestamp=None):
+        # Callers that already converted the frame can pass the RGB copy in;
+        # `timestamp` is the capture time used by the blink/drowsy/yawn timing
+        if self.face_mesh is None:
+            self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
+        if rgb is None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.face_mesh.process(rgb)
-        info = None
-
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0].landmark
-
-            left_ear, left_pts = self.calculate_EAR(landmarks, self.LEFT_EYE_IDX, frame.shape)
-            right_ear, right_pts = self.calculate_EAR(landmarks, self.RIGHT_EYE_IDX, frame.shape)
-            avg_ear_raw = (left_ear + right_ear) / 2.0
-
-            # calibration
-            if self.calib_mode:
-                self.calib_values.append(avg_ear_raw)
-                cv2.putText(frame, f"Calibrating eyes... ({len(self.calib_values)}/{self.ear_calib_frames})",
-                            (30, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 200), 2)
-                if len(self.calib_values) >= self.ear_calib_frames:
-                    self.baseline_ear = float(np.mean(self.calib_values))
-                    self.blink_threshold = max(0.12, self.baseline_ear * 0.75)
-                    self.drowsy_threshold = max(0.08, self.baseline_ear * 0.45)
-                    self.calibrated = True
-                    self.calib_mode = False
-                    self.ear_history.clear()
-                    print(f"Eye calibration complete. baseline EAR={self.baseline_ear:.3f}, blink_thr={self.blink_threshold:.3f}, drowsy_thr={self.drowsy_threshold:.3f}")
-
-            avg_ear = self._smooth_ear(avg_ear_raw)
-
-            # draw eye contours (safe draw)
-            try:
-                cv2.polylines(frame, [np.array(left_pts, dtype=np.int32)], isClosed=True, color=(0, 255, 0), thickness=1)
-                cv2.polylines(frame, [np.array(right_pts, dtype=np.int32)], isClosed=True, color=(0, 255, 0), thickness=1)
-            except Exception:
-                pass
-
-            # choose thresholds
-            thr = self.blink_threshold if self.calibrated else self.EAR_THRESHOLD_DEFAULT
-            drowsy_thr = self.drowsy_threshold if self.calibrated else (self.EAR_THRESHOLD_DEFAULT * 0.5)
-
-            # BLINK state machine (robust)
-            now = time.time()
-            # if eyes are below blink threshold -> considered closed
-            if avg_ear < thr:
-                if not self._closed:
-                    # start of closure
-                    self._closed = True
-                    self._closure_start_time = now
-                # otherwise we are continuing closure
-            else:
-                # eyes considered open now
-                if self._closed:
-                    # closure ended — measure duration
-                    duration = now - (self._closure_start_time or now)
-                    # typical blink duration is between ~0.05s and 0.4s; adjust as needed
-                    if 0.03 <= duration <= 0.6:
-                        self._register_blink()
-                        self._last_blink_time = now
-                    # reset closure state
-                    self._closed = False
-                    self._closure_start_time = None
-
-            # Drowsiness: if avg_ear below drowsy_thr continuously for > drowsy_time_seconds
-            if avg_ear < drowsy_thr:
-                if not hasattr(self, "_drowsy_start"):
-                    self._drowsy_start = now
-                closure_duration = now - getattr(self, "_drowsy_start", now)
-            else:
-                if hasattr(self, "_drowsy_start"):
-                    delattr(self, "_drowsy_start")
-                closure_duration = 0.0
-
-            # Yawn detection (MAR)
-            mar = self.calculate_MAR(landmarks, frame.shape)
-            yawned = False
-            if mar > self.MAR_THRESHOLD:
-                if self._yawn_start is None:
-                    self._yawn_start = now
-                elif (now - self._yawn_start) >= self.YAWN_TIME:
-                    yawned = True
-            else:
-                self._yawn_start = None
-
-            # blink rate
-            blink_rate = self._blink_rate()
-
-            # Decide status
-            status = "✅ Eyes Normal"
-            color = (0, 255, 0)
-            if closure_duration >= self.drowsy_time_seconds:
-                status = "⚠️ You're getting drowsy"
-                color = (0, 0, 255)
-            elif blink_rate < 10 or blink_rate > 30:
-                status = "⚠️ Eye Strain Detected"
-                color = (0, 0, 255)
-
-            # overlay info
-            cv2.putText(frame, f"EAR: {avg_ear:.2f}", (30, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-            cv2.putText(frame, f"Blinks: {self.blink_count}", (30, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-            cv2.putText(frame, f"Blink Rate: {blink_rate:.1f}/min", (30, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-            if closure_duration > 0:
-                cv2.putText(frame, f"Closure: {closure_duration:.2f}s", (30, 170), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-            if yawned:
-                cv2.putText(frame, "YAWN DETECTED", (30, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0,0,255), 2)
-            cv2.putText(frame, status, (30, 230), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
-
-            info = {
-                "avg_ear": avg_ear,
-                "blink_rate": blink_rate,
-                "blink_count": self.blink_count,
-                "status": status,
-                "color": color,
-                "yawn": yawned
-            }
+        if not results.multi_face_landmarks:
+            return frame, None
+        return self.process_face(frame, results.multi_face_landmarks[0].landmark, timestamp)
+
+    def process_face(self, frame, face_landmarks, timestamp=None):
+        if face_landmarks is None:
+            return frame, None
+        info, left_pts, right_pts = self.process_landmarks(face_landmarks, frame.shape, timestamp)
+        if info is None:
+            return frame, None
+
+        # draw eye contours (safe draw)
+        draw_eye_contours(frame, left_pts, right_pts)
+
+        if self.calib_mode:
+            cv2.putText(frame, f"Calibrating eyes... ({len(self.calib_values)}/{self.ear_calib_frames})",
+                        (30, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 200), 2)
+
+        # overlay info
+        color = info["color"]
+        cv2.putText(frame, f"EAR: {info['avg_ear']:.2f}", (30, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        cv2.putText(frame, f"Blinks: {info['blink_count']}", (30, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        cv2.putText(frame, f"Blink Rate: {info['blink_rate']:.1f}/min", (30, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        if info["closure_duration"] > 0:
+            cv2.putText(frame, f"Closure: {info['closure_duration']:.2f}s", (30, 170), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        if info["yawn"]:
+            cv2.putText(frame, "YAWN DETECTED", (30, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0,0,255), 2)
+        cv2.putText(frame, info["status"], (30, 230), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
 
         return frame, info
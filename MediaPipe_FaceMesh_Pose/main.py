@@ -1,9 +1,14 @@
+import os
+import sys
 import cv2
 import time
-import mediapipe as mp
 from posture_detector import PostureDetector
 from eye_strain_detector import EyeStrainDetector
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.backends import FaceMeshPoseBackend
+from core.drawing import draw_pose
+
 # --------------------------- Initialize Posture Detector ---------------------------
 posture_detector = PostureDetector()
 baseline_metrics = []
@@ -11,10 +16,6 @@ baseline_frames = 50
 frame_count = 0
 baseline_set = False
 
-# For drawing landmarks
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
-
 # --------------------------- Initialize Eye Strain Detector ---------------------------
 eye_detector = EyeStrainDetector(
     ear_smoothing=5,
@@ -43,6 +44,11 @@ session_start = time.time()
 in_break = False
 break_start = None
 
+# --------------------------- Concurrent inference ---------------------------
+# FaceMesh and Pose run at the same time (see FaceMeshPoseBackend); the detectors
+# above only get the landmarks, so they never load models of their own.
+backend = FaceMeshPoseBackend(parallel=True)
+
 cap = cv2.VideoCapture(0)
 cap.set(cv2.CAP_PROP_FPS, 30)  # Set frame rate to avoid lag
 cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Reduce resolution
@@ -63,8 +69,16 @@ while cap.isOpened():
     frame_eye = frame.copy()
     frame_posture = frame.copy()
 
+    # One RGB conversion shared (read-only) by both models
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    # --------------------------- Run both models in parallel ---------------------------
+    # Both results belong to the frame captured at `ts`
+    result = backend.process(rgb_frame, ts)
+    frame_eye, eye_info = eye_detector.process_face(frame_eye, result.face_landmarks, ts)
+    landmarks = result.pose_landmarks
+
     # --------------------------- Process Eye Strain ---------------------------
-    frame_eye, eye_info = eye_detector.process_frame(frame_eye)
 
     if eye_info is not None:
         blink_count = eye_info["blink_count"]
@@ -131,20 +145,9 @@ while cap.isOpened():
                 print("✅ Break complete. Back to work!")
 
     # --------------------------- Process Posture ---------------------------
-    rgb_frame = cv2.cvtColor(frame_posture, cv2.COLOR_BGR2RGB)
-    # landmarks = posture_detector.get_landmarks(rgb_frame)
-    results, landmarks = posture_detector.get_landmarks(rgb_frame)
-
-    if landmarks:
+    if landmarks is not None:
         # Draw skeleton overlay
-        # results = posture_detector.pose.process(rgb_frame)
-        mp_drawing.draw_landmarks(
-            frame_posture,
-            results.pose_landmarks,
-            mp_pose.POSE_CONNECTIONS,
-            mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2),
-            mp_drawing.DrawingSpec(color=(0, 150, 255), thickness=2, circle_radius=2)
-        )
+        draw_pose(frame_posture, landmarks)
 
         metrics = posture_detector.calculate_metrics(landmarks)
 
@@ -178,5 +181,6 @@ while cap.isOpened():
         eye_detector.start_calibration()
         print("Starting eye calibration... look straight with eyes open.")
 
+backend.close()
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
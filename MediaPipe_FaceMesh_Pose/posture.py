@@ -20,11 +20,10 @@ while cap.isOpened():
         break
 
     rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    landmarks = detector.get_landmarks(rgb_frame)
+    results, landmarks = detector.get_landmarks(rgb_frame)
 
     if landmarks:
         # Draw skeleton overlay
-        results = detector.pose.process(rgb_frame)
         mp_drawing.draw_landmarks(
             frame,
             results.pose_landmarks,
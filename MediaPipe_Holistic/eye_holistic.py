@@ -1,3 +1,6 @@
+import argparse
+import os
+import sys
 import cv2
 import time
 import mediapipe as mp
@@ -5,6 +8,13 @@ import numpy as np
 # Import only the eye strain detector
 from eye_strain_detector_holistic import EyeStrainDetector
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.alerts import AlertDispatcher, AlertOverlay, SmartAlerts, add_alert_arguments, sinks_from_args
+
+parser = argparse.ArgumentParser(description="Eye strain monitor (Holistic).")
+add_alert_arguments(parser)
+args = parser.parse_args()
+
 # --------------------------- Initialize Holistic Model ---------------------------
 mp_holistic = mp.solutions.holistic
 # We don't need drawing utils for this one
@@ -31,21 +41,19 @@ eye_detector = EyeStrainDetector(
     yawn_time_seconds=0.6
 )
 
-# --------------------------- Smart alert parameters ---------------------------
-FOCUS_LIMIT = 10.0
-LOW_BLINK_THRESHOLD = 8.0
-LOW_BLINK_SUSTAIN = 60.0
-SESSION_LIMIT = 20 * 60.0
-BREAK_DURATION = 20.0
-ALERT_COOLDOWN = 30.0
-
-# --------------------------- State tracking ---------------------------
-last_blink_time = time.time()
-low_blink_start = None
-last_alert_time = 0
-session_start = time.time()
-in_break = False
-break_start = None
+# --------------------------- Smart alerts ---------------------------
+smart_alerts = SmartAlerts(
+    focus_limit=10.0,
+    low_blink_threshold=8.0,
+    low_blink_sustain=60.0,
+    session_limit=20 * 60.0,
+    break_duration=20.0,
+    alert_cooldown=30.0,
+    now=time.time()
+)
+# Alerts are delivered on background threads; the banner stays up for a few seconds
+alert_dispatcher = AlertDispatcher(sinks_from_args(args))
+alert_overlay = AlertOverlay(duration=5.0)
 
 cap = cv2.VideoCapture(0)
 cap.set(cv2.CAP_PROP_FPS, 30)
@@ -72,7 +80,7 @@ while cap.isOpened():
     if results.face_landmarks:
         # Pass the landmarks to the detector
         eye_info, left_pts, right_pts = eye_detector.process_landmarks(
-            results.face_landmarks.landmark, frame.shape
+            results.face_landmarks.landmark, frame.shape, ts
         )
         
         # Draw eye contours
@@ -113,54 +121,18 @@ while cap.isOpened():
                  cv2.putText(frame, "Press 'E' to calibrate",
                             (30, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 200), 2)
 
-            # Update last blink time
-            if not hasattr(eye_detector, "_last_blink_cache"):
-                eye_detector._last_blink_cache = blink_count
-            if blink_count > eye_detector._last_blink_cache:
-                last_blink_time = ts
-                eye_detector._last_blink_cache = blink_count
-
             # --------------------------- SMART LOGIC ---------------------------
-            alert_reason = None
-            time_since_blink = ts - last_blink_time
-
-            if eye_detector.calibrated and time_since_blink > FOCUS_LIMIT:
-                alert_reason = "Focusing too long without blinking"
-
-            if eye_detector.calibrated and blink_rate < LOW_BLINK_THRESHOLD:
-                if low_blink_start is None:
-                    low_blink_start = ts
-                elif (ts - low_blink_start) > LOW_BLINK_SUSTAIN:
-                    alert_reason = "Low blink rate - possible eye strain"
-            else:
-                low_blink_start = None
-
-            if "drowsy" in eye_status.lower() or yawned:
-                alert_reason = "You look tired — take a break"
-
-            elapsed_session = ts - session_start
-            if not in_break and elapsed_session >= SESSION_LIMIT:
-                in_break = True
-                break_start = ts
-                session_start = ts
-                alert_reason = "20–20–20 Reminder: Look 20 feet away for 20 seconds!"
-
-            if alert_reason and (ts - last_alert_time) > ALERT_COOLDOWN:
-                last_alert_time = ts
-                cv2.rectangle(frame, (0, 0), (frame.shape[1], 40), (0, 0, 255), -1)
-                cv2.putText(frame, f"ALERT: {alert_reason}", (10, 28),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                print("⚠️", alert_reason)
-
-            if in_break:
-                elapsed_break = ts - break_start
-                remaining = max(0, BREAK_DURATION - elapsed_break)
+            alert_reason = smart_alerts.update(eye_info, eye_detector.calibrated, ts)
+            if alert_reason:
+                alert_dispatcher.dispatch(alert_reason, ts)
+                alert_overlay.show(alert_reason, ts)
+
+            remaining = smart_alerts.break_remaining(ts)
+            if remaining is not None:
                 cv2.putText(frame, f"👁️ BREAK TIME: Look away for {remaining:.0f}s",
                             (30, frame.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 200, 255), 2)
-                if elapsed_break >= BREAK_DURATION:
-                    in_break = False
-                    print("✅ Break complete. Back to work!")
 
+    alert_overlay.draw(frame, ts)
 
     # --------------------------- Display Window ---------------------------
     cv2.imshow("Eye Strain Detection (Holistic)", frame)
@@ -171,6 +143,7 @@ while cap.isOpened():
     elif key == ord('e') or key == ord('E'):
         eye_detector.start_calibration()
 
+alert_dispatcher.close()
 holistic.close()
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -1,26 +1,70 @@
+import argparse
+import os
+import sys
 import cv2
 import time
-import mediapipe as mp
-import numpy as np
 # Import the refactored detector classes
-from posture_detector_holistic import PostureDetector
+from posture_detector_holistic import FacePostureDetector, PostureDetector
 from eye_strain_detector_holistic import EyeStrainDetector
 
-# --------------------------- Initialize Holistic Model ---------------------------
-mp_holistic = mp.solutions.holistic
-mp_drawing = mp.solutions.drawing_utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.activity import ActivityGate, PoseChangeGate
+from core.alerts import AlertDispatcher, AlertOverlay, SmartAlerts, add_alert_arguments, sinks_from_args
+from core.backends import BACKENDS, FrameResult, create_backend, full_backends
+from core.backend_select import grab_frames, select_backend
+from core.clips import ClipRecorder
+from core.config import ConfigWatcher, apply_config, backend_kwargs, default_config, rebuild_backend
+from core.drawing import POSTURE_CONNECTIONS, draw_eye_contours, draw_pose
+from core.frame_buffers import FrameBuffers
+from core.frame_quality import FrameQualityGate
+from core.metrics import Metrics
+from core.smoothing import LandmarkSmoother
+from core.snapshot import Checkpointer
+from core.tracing import NO_TRACE, Tracer
 
-# Use fastest settings for real-time
-holistic = mp_holistic.Holistic(
-    static_image_mode=False,
-    model_complexity=0,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    refine_face_landmarks=True 
-)
+parser = argparse.ArgumentParser(description="Posture & eye strain monitor.")
+parser.add_argument("--backend", default="auto", choices=["auto"] + list(BACKENDS),
+                    help="inference backend; 'auto' picks the fastest one on this machine")
+parser.add_argument("--posture-mode", default="pose", choices=["pose", "face"],
+                    help="'face' estimates posture from face landmarks only, so no body model runs")
+parser.add_argument("--camera", type=int, default=0)
+parser.add_argument("--config", metavar="FILE", default=None,
+                    help="detector, alert and model settings (JSON); edits apply while running")
+parser.add_argument("--idle-after", type=float, default=10.0,
+                    help="seconds without a person before dropping to low-power polling")
+parser.add_argument("--no-smoothing", action="store_true",
+                    help="feed raw landmarks to the detectors (no One Euro filter)")
+parser.add_argument("--no-quality-gate", action="store_true",
+                    help="run inference on every frame, even dark, blurred or repeated ones")
+parser.add_argument("--clips", metavar="DIR", default=None,
+                    help="save a short clip around every alert and bad-posture onset to DIR")
+parser.add_argument("--state", metavar="FILE", default=None,
+                    help="resume calibration and alert state from FILE and checkpoint it there")
+parser.add_argument("--checkpoint-every", type=float, default=30.0,
+                    help="seconds between state checkpoints (with --state)")
+parser.add_argument("--trace", metavar="FILE", default=None,
+                    help="write per-frame and alert-delivery latency spans to FILE (Chrome trace JSON)")
+parser.add_argument("--trace-every", type=int, default=30,
+                    help="trace one frame in N (frames that raise an alert are always traced)")
+parser.add_argument("--metrics-port", type=int, default=9108,
+                    help="serve Prometheus metrics on localhost:PORT/metrics (0 = off)")
+add_alert_arguments(parser)
+args = parser.parse_args()
+# Backends that produce every landmark set this mode needs
+usable_backends = full_backends() if args.posture_mode == "pose" else \
+    [name for name, cls in BACKENDS.items() if "face" in cls.provides]
+if args.backend != "auto" and args.backend not in usable_backends:
+    parser.error(f"--posture-mode {args.posture_mode} needs one of: {', '.join(usable_backends)}")
+
+# --------------------------- Settings ---------------------------
+# Thresholds and timings come from one file (defaults in core/config.py) and are reloaded on change
+config_watcher = ConfigWatcher(args.config) if args.config else None
+config = config_watcher.config if config_watcher is not None else default_config()
 
 # --------------------------- Initialize Posture Detector ---------------------------
-posture_detector = PostureDetector()
+# Face mode: head pitch, roll, lean and drop from face landmarks against a calibrated baseline
+posture_detector = FacePostureDetector() if args.posture_mode == "face" else PostureDetector()
+apply_config(config, posture=posture_detector)
 # --- REMOVED Automatic baseline variables ---
 # baseline_metrics = []
 # baseline_frames = 50
@@ -29,77 +73,170 @@ posture_detector = PostureDetector()
 # --- END REMOVED ---
 
 # --------------------------- Initialize Eye Strain Detector ---------------------------
-eye_detector = EyeStrainDetector(
-    ear_smoothing=5,
-    ear_threshold_default=0.21,
-    consec_frames_for_blink=2,
-    blink_window_seconds=60,
-    drowsy_time_seconds=0.8,
-    ear_calib_frames=60,
-    mar_threshold=0.65,
-    yawn_time_seconds=0.6
-)
-
-# --------------------------- Smart alert parameters ---------------------------
-FOCUS_LIMIT = 10.0
-LOW_BLINK_THRESHOLD = 8.0
-LOW_BLINK_SUSTAIN = 60.0
-SESSION_LIMIT = 20 * 60.0
-BREAK_DURATION = 20.0
-ALERT_COOLDOWN = 30.0
+eye_detector = EyeStrainDetector(**config["eye"])
+
+# --------------------------- Smart alerts ---------------------------
+smart_alerts = SmartAlerts(now=time.time(), **config["alerts"])
+# Sampled latency spans from capture to alert delivery, viewable in chrome://tracing or Perfetto
+tracer = Tracer(args.trace, sample_every=args.trace_every) if args.trace else None
+# Alerts are delivered on background threads; the banner stays up for a few seconds
+alert_dispatcher = AlertDispatcher(sinks_from_args(args), tracer=tracer)
+alert_overlay = AlertOverlay(duration=5.0)
+# Compressed pre-roll in memory; clips are encoded and written on background threads
+clips = ClipRecorder(args.clips) if args.clips else None
+
+# --------------------------- Session state ---------------------------
+# Calibration, blink history and alert timers survive restarts and move between hosts
+checkpoints = Checkpointer(args.state, args.checkpoint_every) if args.state else None
+if checkpoints is not None and checkpoints.load(eye=eye_detector, posture=posture_detector, alerts=smart_alerts):
+    if time.time() - checkpoints.restored_at > 60:
+        smart_alerts.user_returned(time.time())  # time the monitor was down counts as a break
 
 # --------------------------- State tracking ---------------------------
-last_blink_time = time.time()
-low_blink_start = None
-last_alert_time = 0
-session_start = time.time()
-in_break = False
-break_start = None
-
-cap = cv2.VideoCapture(0)
+posture = None
+
+# --------------------------- Power saving ---------------------------
+# Idle polling when nobody is at the desk; posture re-evaluated only when the body moves
+activity = ActivityGate(idle_after=args.idle_after)
+posture_gate = PoseChangeGate(points=PoseChangeGate.FACE_POINTS if args.posture_mode == "face" else None)
+
+# Dark, blurred and repeated frames never reach inference or the blink state machine
+frame_quality = None if args.no_quality_gate else FrameQualityGate()
+
+# One Euro filter on the landmarks, so jitter from light models does not flip alerts
+smoother = None if args.no_smoothing else LandmarkSmoother()
+
+# --------------------------- Metrics endpoint ---------------------------
+# The frame loop only records values; the HTTP thread formats them on each scrape
+metrics = Metrics()
+metrics.describe("stage_seconds", "Time per frame spent in each stage of the frame loop.")
+metrics.describe("dropped_frames", "Camera frames missed because the loop fell behind.")
+metrics.describe("alerts", "Alerts raised, by reason.")
+metrics.describe("posture_frames", "Frames per posture verdict.")
+metrics.describe("skipped_frames", "Frames kept from inference by the quality gate, by reason.")
+if args.metrics_port:
+    metrics.serve(args.metrics_port)
+
+cap = cv2.VideoCapture(args.camera)
 cap.set(cv2.CAP_PROP_FPS, 30)
 cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
 cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+frame_interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+
+# --------------------------- Initialize Inference Backend ---------------------------
+# 'auto' uses the cached benchmark for this machine, or measures each backend on a few frames.
+backend_name = args.backend
+if backend_name == "auto":
+    backend_name = select_backend(frames=lambda: grab_frames(cap, 30), names=usable_backends)
+print(f"Using inference backend: {backend_name}")
+model_kwargs = backend_kwargs(backend_name, config)
+backend = create_backend(backend_name, **model_kwargs)
 
 print("Instructions:")
-print(" - Running with optimized Holistic model.")
+print(f" - Running with the '{backend_name}' backend.")
 print(" - Press 'E' to calibrate BOTH posture and eyes.")
 print(" - Press 'Q' or ESC to quit.")
 
+# Preallocated BGR/RGB/overlay buffers reused every frame
+buffers = FrameBuffers()
+prev_ts = None
+
+
+def handle_key(key):
+    """Returns True when the user asked to quit."""
+    global posture
+    if key in [27, ord('q')]:
+        return True
+    elif key == ord('e') or key == ord('E'):
+        # --- UPDATED: Trigger BOTH calibrations ---
+        eye_detector.start_calibration()
+        posture_detector.start_calibration(frames=50) # Use 50 frames
+        posture = None
+        posture_gate.reset()
+        # --- END UPDATED ---
+    return False
+
+
 while cap.isOpened():
-    ret, frame = cap.read()
+    t0 = time.perf_counter()
+    read_start = time.time()
+    ret, frame = buffers.read(cap)
     if not ret:
         break
 
     ts = time.time()
-    
-    # Create copies for separate display windows
-    frame_eye = frame.copy()
-    frame_posture = frame.copy()
+    # --- HOT RELOAD: detectors change in place, the model only if its own settings changed ---
+    changed = config_watcher.poll(ts) if config_watcher is not None else None
+    if changed:
+        config = config_watcher.config
+        apply_config(config, changed, eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+        backend, model_kwargs = rebuild_backend(backend, backend_name, model_kwargs, config)
+    trace = tracer.frame(ts, start=read_start) if tracer is not None else NO_TRACE
+    trace.mark("capture", ts)
+    metrics.observe("stage_seconds", time.perf_counter() - t0, stage="capture")
+    metrics.inc("frames")
+    # Gaps longer than the camera interval mean frames were dropped (not counted while idle)
+    if prev_ts is not None and not activity.idle and ts - prev_ts > 1.5 * frame_interval:
+        metrics.inc("dropped_frames", round((ts - prev_ts) / frame_interval) - 1)
+    prev_ts = ts
+
+    # --- FRAME QUALITY GATE ---
+    quality = frame_quality.check(frame) if frame_quality is not None else None
+    if quality is not None:
+        metrics.inc("skipped_frames", reason=quality)
+    trace.mark("quality gate")
+    if quality == "duplicate":
+        # The camera repeated its last frame: nothing new to infer, detect or show
+        if tracer is not None:
+            tracer.finish(trace)
+        if handle_key(cv2.waitKey(1) & 0xFF):
+            break
+        continue
+
+    # --- SINGLE BACKEND PROCESSING ---
+    if quality is not None:
+        # Too dark or blurred: landmarks would be garbage, so the detectors see no face this frame
+        result = FrameResult(timestamp=ts)
+    elif activity.should_infer(frame, ts):
+        # Read-only RGB buffer shared with inference (no per-frame allocation or copy)
+        rgb_frame = buffers.to_rgb()
+        result = backend.process(rgb_frame, ts)
+        metrics.observe("stage_seconds", result.inference_time, stage="inference")
+        metrics.mark("inference_fps", ts)
+        if smoother is not None:
+            smoother(result)
+        present = result.pose_landmarks is not None or result.face_landmarks is not None
+        if activity.update(present, ts):
+            smart_alerts.user_returned(ts)
+    else:
+        # Idle and nothing moved: skip inference on this frame
+        result = FrameResult(timestamp=ts)
 
-    # --- SINGLE HOLISTIC PROCESSING ---
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = holistic.process(rgb_frame)
+    metrics.set("idle", int(activity.idle))
+    trace.mark("inference")
+    t1 = time.perf_counter()
 
-    # --------------------------- Process Eye Strain (from Holistic) ---------------------------
-    if results.face_landmarks:
+    # Eye window draws on a reused copy; the posture window draws on the captured frame itself
+    frame_eye = buffers.overlay("eye")
+    frame_posture = frame
+
+    # --------------------------- Process Eye Strain ---------------------------
+    if result.face_landmarks is not None:
         # Pass the landmarks to the detector
         eye_info, left_pts, right_pts = eye_detector.process_landmarks(
-            results.face_landmarks.landmark, frame_eye.shape
+            result.face_landmarks, frame_eye.shape, result.timestamp
         )
-        
+
         # Draw eye contours
-        try:
-            cv2.polylines(frame_eye, [np.array(left_pts, dtype=np.int32)], isClosed=True, color=(0, 255, 0), thickness=1)
-            cv2.polylines(frame_eye, [np.array(right_pts, dtype=np.int32)], isClosed=True, color=(0, 255, 0), thickness=1)
-        except Exception:
-            pass
+        draw_eye_contours(frame_eye, left_pts, right_pts)
 
         if eye_info is not None:
             blink_count = eye_info["blink_count"]
             blink_rate = eye_info["blink_rate"]
             eye_status = eye_info["status"]
             yawned = eye_info.get("yawn", False)
+            metrics.set("blink_rate", blink_rate)
+            metrics.set("blink_count", blink_count)
 
             # More Info Display
             cv2.putText(frame_eye, f"Blinks: {blink_count} | Rate: {blink_rate:.1f}/min",
@@ -126,78 +263,47 @@ while cap.isOpened():
                  cv2.putText(frame_eye, "Press 'E' to calibrate",
                             (30, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 200), 2)
 
-            # Update last blink time
-            if not hasattr(eye_detector, "_last_blink_cache"):
-                eye_detector._last_blink_cache = blink_count
-            if blink_count > eye_detector._last_blink_cache:
-                last_blink_time = ts
-                eye_detector._last_blink_cache = blink_count
-
             # --------------------------- SMART LOGIC ---------------------------
-            alert_reason = None
-            time_since_blink = ts - last_blink_time
-
-            if eye_detector.calibrated and time_since_blink > FOCUS_LIMIT:
-                alert_reason = "Focusing too long without blinking"
-
-            if eye_detector.calibrated and blink_rate < LOW_BLINK_THRESHOLD:
-                if low_blink_start is None:
-                    low_blink_start = ts
-                elif (ts - low_blink_start) > LOW_BLINK_SUSTAIN:
-                    alert_reason = "Low blink rate - possible eye strain"
-            else:
-                low_blink_start = None
-
-            if "drowsy" in eye_status.lower() or yawned:
-                alert_reason = "You look tired — take a break"
-
-            elapsed_session = ts - session_start
-            if not in_break and elapsed_session >= SESSION_LIMIT:
-                in_break = True
-                break_start = ts
-                session_start = ts
-                alert_reason = "20–20–20 Reminder: Look 20 feet away for 20 seconds!"
-
-            if alert_reason and (ts - last_alert_time) > ALERT_COOLDOWN:
-                last_alert_time = ts
-                cv2.rectangle(frame_eye, (0, 0), (frame_eye.shape[1], 40), (0, 0, 255), -1)
-                cv2.putText(frame_eye, f"ALERT: {alert_reason}", (10, 28),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                print("⚠️", alert_reason)
-
-            if in_break:
-                elapsed_break = ts - break_start
-                remaining = max(0, BREAK_DURATION - elapsed_break)
+            trace.mark("eye detector")
+            alert_reason = smart_alerts.update(eye_info, eye_detector.calibrated, ts)
+            if alert_reason:
+                if tracer is not None:
+                    tracer.alerted(trace, alert_reason)
+                alert_dispatcher.dispatch(alert_reason, ts)
+                alert_overlay.show(alert_reason, ts)
+                metrics.inc("alerts", reason=alert_reason)
+                if clips is not None:
+                    clips.trigger(alert_reason, ts)
+
+            remaining = smart_alerts.break_remaining(ts)
+            if remaining is not None:
                 cv2.putText(frame_eye, f"👁️ BREAK TIME: Look away for {remaining:.0f}s",
                             (30, frame_eye.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 200, 255), 2)
-                if elapsed_break >= BREAK_DURATION:
-                    in_break = False
-                    print("✅ Break complete. Back to work!")
-
-    # --------------------------- Process Posture (from Holistic) ---------------------------
-    if results.pose_landmarks:
-        # Draw skeleton overlay
-        mp_drawing.draw_landmarks(
-            frame_posture,
-            results.pose_landmarks,
-            mp_holistic.POSE_CONNECTIONS,
-            mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2),
-            mp_drawing.DrawingSpec(color=(0, 150, 255), thickness=2, circle_radius=2)
-        )
+            trace.mark("alert rules")
 
-        # Pass landmarks to detector for calculation
-        metrics = posture_detector.calculate_metrics(results.pose_landmarks.landmark)
+    # --------------------------- Process Posture ---------------------------
+    posture_landmarks = result.face_landmarks if args.posture_mode == "face" else result.pose_landmarks
+    if posture_landmarks is not None:
+        # Draw the skeleton the posture metrics use
+        if args.posture_mode == "pose":
+            draw_pose(frame_posture, posture_landmarks, POSTURE_CONNECTIONS)
 
         # --- UPDATED: Posture Calibration Logic ---
         if posture_detector.calib_mode:
             # We are calibrating, show feedback
-            posture_detector.process_calibration(metrics) # Feed metrics to calibrator
+            posture_metrics = posture_detector.calculate_metrics(posture_landmarks)
+            posture_detector.process_calibration(posture_metrics) # Feed metrics to calibrator
             cv2.putText(frame_posture, f"Calibrating Posture... {len(posture_detector.calib_metrics)}/{posture_detector.calib_frames}",
                         (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
         
         elif posture_detector.baseline is not None:
-            # We are calibrated, detect posture
-            posture = posture_detector.detect_posture(metrics)
+            # We are calibrated, detect posture (only when the upper body moved)
+            if posture is None or posture_gate.moved(posture_landmarks, ts):
+                posture_metrics = posture_detector.calculate_metrics(posture_landmarks)
+                previous, posture = posture, posture_detector.detect_posture(posture_metrics)
+                if clips is not None and "⚠️" in posture and posture != previous:
+                    clips.trigger(posture, ts)
+            metrics.inc("posture_frames", state=posture)
             color = (0, 255, 0) if "✅" in posture else (0, 0, 255)
             cv2.putText(frame_posture, posture, (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
         
@@ -206,21 +312,53 @@ while cap.isOpened():
             cv2.putText(frame_posture, "Press 'E' to calibrate posture",
                         (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 200, 200), 2)
         # --- END UPDATED ---
+        trace.mark("posture detector")
 
 
+    alert_overlay.draw(frame_eye, ts)
+
+    if quality is not None:
+        cv2.putText(frame_posture, f"Frame skipped ({quality})", (30, frame_posture.shape[0] - 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+    if activity.idle:
+        cv2.putText(frame_posture, "Idle - waiting for motion", (30, frame_posture.shape[0] - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
+
+    metrics.set("eye_calibrated", int(eye_detector.calibrated))
+    metrics.set("eye_calibrating", int(eye_detector.calib_mode))
+    metrics.set("posture_calibrated", int(posture_detector.baseline is not None))
+    metrics.set("posture_calibrating", int(posture_detector.calib_mode))
+    metrics.observe("stage_seconds", time.perf_counter() - t1, stage="detectors")
+    if checkpoints is not None:
+        checkpoints.maybe_save(ts, eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+    trace.mark("overlays and metrics")
+
     # --------------------------- Display in Two Windows ---------------------------
+    t2 = time.perf_counter()
+    if clips is not None:
+        clips.add(frame_posture, ts)
     cv2.imshow("Eye Strain Detection (Holistic)", frame_eye)
     cv2.imshow("Posture Detection (Holistic)", frame_posture)
 
-    key = cv2.waitKey(1) & 0xFF
-    if key in [27, ord('q')]:
+    # Longer wait while idle lowers the capture and CPU rate
+    key = cv2.waitKey(activity.poll_delay_ms()) & 0xFF
+    metrics.observe("stage_seconds", time.perf_counter() - t2, stage="display")
+    trace.mark("display")
+    if tracer is not None:
+        tracer.finish(trace)
+    if handle_key(key):
         break
-    elif key == ord('e') or key == ord('E'):
-        # --- UPDATED: Trigger BOTH calibrations ---
-        eye_detector.start_calibration()
-        posture_detector.start_calibration(frames=50) # Use 50 frames
-        # --- END UPDATED ---
 
-holistic.close()
+if frame_quality is not None:
+    print(frame_quality.summary())
+alert_dispatcher.close()
+if tracer is not None:
+    tracer.close()
+if clips is not None:
+    clips.close()
+if checkpoints is not None:
+    checkpoints.close(eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+metrics.close()
+backend.close()
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
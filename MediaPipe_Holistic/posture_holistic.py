@@ -1,3 +1,5 @@
+import os
+import sys
 import cv2
 import time
 import mediapipe as mp
@@ -5,10 +7,13 @@ import numpy as np
 # Import only the posture detector
 from posture_detector_holistic import PostureDetector
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.drawing import POSTURE_CONNECTIONS, draw_pose
+from core.landmarks import as_array
+
 
 # --------------------------- Initialize Holistic Model ---------------------------
 mp_holistic = mp.solutions.holistic
-mp_drawing = mp.solutions.drawing_utils
 
 # Use fastest settings for real-time
 holistic = mp_holistic.Holistic(
@@ -45,17 +50,12 @@ while cap.isOpened():
 
     # --------------------------- Process Posture (from Holistic) ---------------------------
     if results.pose_landmarks:
-        # Draw skeleton overlay
-        mp_drawing.draw_landmarks(
-            frame,
-            results.pose_landmarks,
-            mp_holistic.POSE_CONNECTIONS,
-            mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2),
-            mp_drawing.DrawingSpec(color=(0, 150, 255), thickness=2, circle_radius=2)
-        )
+        # Convert once, then draw the posture skeleton (head, shoulders, hips) in batched calls
+        pose = as_array(results.pose_landmarks)
+        draw_pose(frame, pose, POSTURE_CONNECTIONS)
 
         # Pass landmarks to detector for calculation
-        metrics = posture_detector.calculate_metrics(results.pose_landmarks.landmark)
+        metrics = posture_detector.calculate_metrics(pose)
 
         # --- Posture Calibration & Detection Logic ---
         if posture_detector.calib_mode:
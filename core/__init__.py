@@ -0,0 +1,10 @@
+"""
+Shared detector core used by both pipelines.
+
+The calculators (EyeStrainDetector, PostureDetector) only consume landmark arrays,
+and the inference backends (Holistic, FaceMesh+Pose, ...) only produce them, so any
+backend can feed the same calculators.
+"""
+from core.eye_strain import EyeStrainDetector
+from core.posture import FacePostureDetector, PostureDetector, SidePostureDetector
+from core.backends import BACKENDS, FrameResult, InferenceBackend, create_backend
@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+
+from core.landmarks import as_array
+
+
+class ActivityGate:
+    """
+    Presence / motion gating for an always-on capture loop.
+    - Active: every frame goes to inference.
+    - After `idle_after` seconds without a person in view the gate goes idle: frames
+      are polled at `idle_fps` and only compared with the previous one (mean absolute
+      difference of a tiny grayscale copy); inference runs once every `idle_interval`
+      seconds as a presence check.
+    - Motion above `motion_threshold` (grey levels) or a detected person switches back
+      to active on the same frame.
+    """
+
+    def __init__(self, idle_after=10.0, idle_interval=2.0, idle_fps=5.0, motion_threshold=4.0, size=(64, 48)):
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.idle_fps = idle_fps
+        self.motion_threshold = motion_threshold
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.idle = False
+        self._away = False  # went idle and nobody has been seen since
+        self._last_seen = None
+        self._last_poll = None
+        self._small = np.empty((self.size[1], self.size[0], 3), np.uint8)
+        self._gray = np.empty((self.size[1], self.size[0]), np.uint8)
+        self._prev_gray = None
+
+    def motion(self, bgr):
+        """Mean absolute grey-level change since the previous call (0 on the first call)."""
+        cv2.resize(bgr, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if self._prev_gray is None:
+            self._prev_gray = self._gray.copy()
+            return 0.0
+        score = float(cv2.absdiff(self._gray, self._prev_gray).mean())
+        self._prev_gray, self._gray = self._gray, self._prev_gray
+        return score
+
+    def _wake(self, timestamp):
+        self.idle = False
+        self._prev_gray = None
+        # Grace period: stay active for idle_after seconds even if nobody shows up
+        self._last_seen = timestamp
+        print("✅ Motion detected, back to full rate.")
+
+    def should_infer(self, bgr, timestamp):
+        """True if this frame should go to the inference backend."""
+        if not self.idle:
+            return True
+        if self.motion(bgr) > self.motion_threshold:
+            self._wake(timestamp)
+            return True
+        if self._last_poll is None or timestamp - self._last_poll >= self.idle_interval:
+            self._last_poll = timestamp
+            return True
+        return False
+
+    def update(self, present, timestamp):
+        """
+        Report whether inference found a person on this frame.
+        Returns True when a person is back after an idle period.
+        """
+        if self._last_seen is None:
+            self._last_seen = timestamp
+        if present:
+            self._last_seen = timestamp
+            returned = self._away
+            self._away = False
+            if self.idle:
+                self._wake(timestamp)
+            return returned
+        if not self.idle and timestamp - self._last_seen > self.idle_after:
+            self.idle = True
+            self._away = True
+            self._last_poll = timestamp
+            self._prev_gray = None
+            print(f"💤 Nobody in view for {self.idle_after:.0f}s, polling at {self.idle_fps:.0f} FPS.")
+        return False
+
+    def poll_delay_ms(self):
+        """Delay for cv2.waitKey: lowers the capture rate while idle."""
+        return max(1, int(1000 / self.idle_fps)) if self.idle else 1
+
+
+class PoseChangeGate:
+    """
+    Skips posture evaluation while the upper body has not moved.
+    - Compares head and shoulder landmarks with those at the last evaluation, so slow
+      drift still adds up and triggers a new evaluation.
+    - Re-evaluates at least every `max_age` seconds.
+    """
+
+    # Nose, eyes, shoulders (the points PostureDetector uses)
+    POINTS = [0, 2, 5, 11, 12]
+    # Forehead, nose bridge, nose tip, outer eye corners (for FacePostureDetector)
+    FACE_POINTS = [10, 168, 1, 33, 263]
+
+    def __init__(self, min_shift=0.01, max_age=5.0, points=None):
+        self.min_shift = min_shift
+        self.max_age = max_age
+        self.points = self.POINTS if points is None else points
+        self.reset()
+
+    def reset(self):
+        self._ref = None
+        self._ref_time = None
+
+    def moved(self, pose_landmarks, timestamp):
+        """True if posture should be re-evaluated for these landmarks."""
+        pts = as_array(pose_landmarks)
+        if pts is None:
+            return False
+        pts = pts[self.points, :2]
+        if (self._ref is None or timestamp - self._ref_time >= self.max_age
+                or np.abs(pts - self._ref).max() > self.min_shift):
+            self._ref = pts.copy()
+            self._ref_time = timestamp
+            return True
+        return False
@@ -0,0 +1,408 @@
+"""
+Alert rules and alert delivery.
+
+- SmartAlerts decides when to alert (eye-health rules on capture timestamps).
+- AlertDispatcher delivers alerts to pluggable sinks (console, log file, desktop
+  notification, sound, TCP socket, webhook), each on its own thread with its own
+  rate limit and retries, so delivery never blocks the frame loop.
+- AlertOverlay keeps the alert banner on screen for a few seconds.
+
+Local webhook stub for testing (from the repository root):
+    python -m core.alerts --port 8765
+    python MediaPipe_Holistic/main_holistic.py --webhook http://127.0.0.1:8765/
+"""
+import argparse
+import json
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from core.snapshot import export_fields, import_fields
+
+
+class SmartAlerts:
+    """
+    Eye-health alert rules shared by the frame loops.
+    - Focusing too long without blinking, sustained low blink rate, tiredness
+      (drowsy or yawning) and the 20-20-20 session reminder.
+    - One alert per cooldown period; the 20-20-20 reminder starts a break countdown.
+    - Pure state machine on capture timestamps: it decides, the caller delivers.
+    """
+
+    STATE_FIELDS = ("last_blink_time", "last_blink_count", "low_blink_start", "last_alert_time",
+                    "session_start", "in_break", "break_start")
+    # configure() keyword -> attribute
+    PARAMS = {"focus_limit": "FOCUS_LIMIT", "low_blink_threshold": "LOW_BLINK_THRESHOLD",
+              "low_blink_sustain": "LOW_BLINK_SUSTAIN", "session_limit": "SESSION_LIMIT",
+              "break_duration": "BREAK_DURATION", "alert_cooldown": "ALERT_COOLDOWN"}
+
+    def __init__(self,
+                 focus_limit=10.0,
+                 low_blink_threshold=8.0,
+                 low_blink_sustain=60.0,
+                 session_limit=20 * 60.0,
+                 break_duration=20.0,
+                 alert_cooldown=30.0,
+                 now=0.0):
+        self.configure(focus_limit=focus_limit, low_blink_threshold=low_blink_threshold,
+                       low_blink_sustain=low_blink_sustain, session_limit=session_limit,
+                       break_duration=break_duration, alert_cooldown=alert_cooldown)
+        self.reset(now)
+
+    def configure(self, **params):
+        """Change limits in place (core/config.py hot reload); timers keep running."""
+        unknown = set(params) - set(self.PARAMS)
+        if unknown:
+            raise TypeError(f"SmartAlerts has no parameter(s): {', '.join(sorted(unknown))}")
+        for name, value in params.items():
+            setattr(self, self.PARAMS[name], float(value))
+
+    def reset(self, now):
+        self.last_blink_time = now
+        self.last_blink_count = None
+        self.low_blink_start = None
+        self.last_alert_time = 0
+        self.session_start = now
+        self.in_break = False
+        self.break_start = None
+
+    def get_state(self):
+        """Timers and counters as plain JSON types (see core/snapshot.py)."""
+        return export_fields(self, self.STATE_FIELDS)
+
+    def set_state(self, state):
+        self.reset(0.0)
+        import_fields(self, state, self.STATE_FIELDS)
+
+    def user_returned(self, now):
+        """Time away from the desk counts as a break: restart the blink and session timers."""
+        self.last_blink_time = now
+        self.session_start = now
+
+    def update(self, eye_info, calibrated, ts):
+        """Feed one frame's eye info; returns the alert reason to deliver, or None."""
+        blink_count = eye_info["blink_count"]
+        if self.last_blink_count is None:
+            self.last_blink_count = blink_count
+        if blink_count > self.last_blink_count:
+            self.last_blink_time = ts
+            self.last_blink_count = blink_count
+
+        alert_reason = None
+        time_since_blink = ts - self.last_blink_time
+
+        if calibrated and time_since_blink > self.FOCUS_LIMIT:
+            alert_reason = "Focusing too long without blinking"
+
+        if calibrated and eye_info["blink_rate"] < self.LOW_BLINK_THRESHOLD:
+            if self.low_blink_start is None:
+                self.low_blink_start = ts
+            elif (ts - self.low_blink_start) > self.LOW_BLINK_SUSTAIN:
+                alert_reason = "Low blink rate - possible eye strain"
+        else:
+            self.low_blink_start = None
+
+        if "drowsy" in eye_info["status"].lower() or eye_info.get("yawn", False):
+            alert_reason = "You look tired — take a break"
+
+        elapsed_session = ts - self.session_start
+        if not self.in_break and elapsed_session >= self.SESSION_LIMIT:
+            self.in_break = True
+            self.break_start = ts
+            self.session_start = ts
+            alert_reason = "20–20–20 Reminder: Look 20 feet away for 20 seconds!"
+
+        if alert_reason and (ts - self.last_alert_time) > self.ALERT_COOLDOWN:
+            self.last_alert_time = ts
+            return alert_reason
+        return None
+
+    def break_remaining(self, ts):
+        """Seconds left in the current break, or None when not on a break."""
+        if not self.in_break:
+            return None
+        elapsed_break = ts - self.break_start
+        if elapsed_break >= self.BREAK_DURATION:
+            self.in_break = False
+            print("✅ Break complete. Back to work!")
+        return max(0, self.BREAK_DURATION - elapsed_break)
+
+
+# --------------------------- Delivery ---------------------------
+class AlertSink:
+    """
+    One alert destination. Subclasses implement deliver(alert) and raise on failure.
+    - min_interval: the same reason is sent at most once per this many seconds.
+    - retries / backoff: failed deliveries are retried with exponential backoff.
+    - queue_size: alerts waiting for this sink; extra alerts are dropped, not queued.
+    """
+
+    name = "sink"
+
+    def __init__(self, min_interval=0.0, retries=2, backoff=0.5, queue_size=32):
+        self.min_interval = min_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self._last_sent = {}  # reason -> time
+        self.sent = self.failed = self.dropped = self.limited = 0
+
+    def allow(self, alert):
+        last = self._last_sent.get(alert["reason"])
+        if last is not None and alert["time"] - last < self.min_interval:
+            self.limited += 1
+            return False
+        self._last_sent[alert["reason"]] = alert["time"]
+        return True
+
+    def deliver(self, alert):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(AlertSink):
+    name = "console"
+
+    def deliver(self, alert):
+        print("⚠️", alert["reason"])
+
+
+class LogFileSink(AlertSink):
+    """Appends one JSON line per alert."""
+
+    name = "log"
+
+    def __init__(self, path, **kw):
+        super().__init__(**kw)
+        self.path = path
+
+    def deliver(self, alert):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+class DesktopNotificationSink(AlertSink):
+    """notify-send (Linux) or osascript (macOS)."""
+
+    name = "desktop"
+
+    def __init__(self, title="Posture & Eye Monitor", min_interval=60.0, **kw):
+        super().__init__(min_interval=min_interval, **kw)
+        self.title = title
+
+    def deliver(self, alert):
+        if sys.platform == "darwin":
+            script = f'display notification "{alert["reason"]}" with title "{self.title}"'
+            cmd = ["osascript", "-e", script]
+        else:
+            cmd = ["notify-send", self.title, alert["reason"]]
+        subprocess.run(cmd, check=True, timeout=5, capture_output=True)
+
+
+class SoundSink(AlertSink):
+    """Plays a sound file (paplay / afplay), or rings the terminal bell without one."""
+
+    name = "sound"
+
+    def __init__(self, path=None, min_interval=30.0, **kw):
+        super().__init__(min_interval=min_interval, **kw)
+        self.path = path
+
+    def deliver(self, alert):
+        if self.path is None:
+            sys.stdout.write("\a")
+            sys.stdout.flush()
+            return
+        player = "afplay" if sys.platform == "darwin" else "paplay"
+        subprocess.run([player, self.path], check=True, timeout=10, capture_output=True)
+
+
+class SocketSink(AlertSink):
+    """Sends one JSON line per alert over TCP; reconnects on failure."""
+
+    name = "socket"
+
+    def __init__(self, host, port, timeout=2.0, **kw):
+        super().__init__(**kw)
+        self.address = (host, port)
+        self.timeout = timeout
+        self._sock = None
+
+    def deliver(self, alert):
+        try:
+            if self._sock is None:
+                self._sock = socket.create_connection(self.address, timeout=self.timeout)
+            self._sock.sendall((json.dumps(alert, ensure_ascii=False) + "\n").encode("utf-8"))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class WebhookSink(AlertSink):
+    """POSTs the alert as JSON to `url`."""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=3.0, **kw):
+        super().__init__(**kw)
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, alert):
+        request = urllib.request.Request(self.url, data=json.dumps(alert).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class AlertDispatcher:
+    """
+    Delivers alerts off the frame loop.
+    - dispatch() only puts the alert on each sink's queue and never blocks.
+    - Every sink has its own worker thread, so a slow or failing sink (a webhook that
+      times out, a notification daemon that hangs) delays neither the frame loop nor
+      the other sinks.
+    - Rate limiting and retries are per sink (see AlertSink).
+    - With a `tracer` (core/tracing.py), every delivery reports its queue and delivery
+      time, so alert latency is measured from capture to the user.
+    """
+
+    def __init__(self, sinks=None, tracer=None):
+        self.sinks = list(sinks) if sinks is not None else [ConsoleSink()]
+        self.tracer = tracer
+        self._queues = [queue.Queue(maxsize=s.queue_size) for s in self.sinks]
+        self._threads = [threading.Thread(target=self._worker, args=(s, q), name=f"alerts-{s.name}", daemon=True)
+                         for s, q in zip(self.sinks, self._queues)]
+        for t in self._threads:
+            t.start()
+
+    def dispatch(self, reason, timestamp=None, **details):
+        alert = dict(details, reason=reason, time=time.time() if timestamp is None else timestamp)
+        queued = time.time()
+        for sink, q in zip(self.sinks, self._queues):
+            try:
+                q.put_nowait((alert, queued))
+            except queue.Full:
+                sink.dropped += 1
+
+    def _worker(self, sink, q):
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            alert, queued = item
+            if not sink.allow(alert):
+                continue
+            started = time.time()
+            ok = False
+            for attempt in range(sink.retries + 1):
+                try:
+                    sink.deliver(alert)
+                    sink.sent += 1
+                    ok = True
+                    break
+                except Exception as e:
+                    if attempt == sink.retries:
+                        sink.failed += 1
+                        print(f"⚠️ Alert sink '{sink.name}' failed: {e}")
+                    else:
+                        time.sleep(sink.backoff * 2 ** attempt)
+            if self.tracer is not None:
+                self.tracer.delivered(alert, sink.name, queued, started, time.time(), ok)
+
+    def stats(self):
+        return {s.name: {"sent": s.sent, "failed": s.failed, "dropped": s.dropped, "limited": s.limited}
+                for s in self.sinks}
+
+    def close(self, timeout=2.0):
+        """Flush what is queued (up to `timeout` seconds per sink) and stop the workers."""
+        for q in self._queues:
+            try:
+                q.put(None, timeout=timeout)
+            except Exception:
+                pass
+        for t in self._threads:
+            t.join(timeout)
+        for s in self.sinks:
+            s.close()
+
+
+def sinks_from_args(args):
+    """Sinks for the --alert-* command-line options (see add_alert_arguments)."""
+    sinks = [ConsoleSink()]
+    if args.alert_log:
+        sinks.append(LogFileSink(args.alert_log))
+    if args.notify:
+        sinks.append(DesktopNotificationSink())
+    if args.sound is not None:
+        sinks.append(SoundSink(args.sound or None))
+    if args.alert_socket:
+        host, port = args.alert_socket.rsplit(":", 1)
+        sinks.append(SocketSink(host, int(port)))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    return sinks
+
+
+def add_alert_arguments(parser):
+    parser.add_argument("--alert-log", metavar="PATH", help="append alerts as JSON lines to PATH")
+    parser.add_argument("--notify", action="store_true", help="show alerts as desktop notifications")
+    parser.add_argument("--sound", nargs="?", const="", default=None, metavar="FILE",
+                        help="play FILE (or ring the terminal bell) on alerts")
+    parser.add_argument("--alert-socket", metavar="HOST:PORT", help="send alerts as JSON lines over TCP")
+    parser.add_argument("--webhook", metavar="URL", help="POST alerts as JSON to URL")
+
+
+class AlertOverlay:
+    """Keeps the last alert banner on screen for `duration` seconds instead of one frame."""
+
+    def __init__(self, duration=5.0):
+        self.duration = duration
+        self.reason = None
+        self.until = 0.0
+
+    def show(self, reason, ts):
+        self.reason = reason
+        self.until = ts + self.duration
+
+    def draw(self, frame, ts):
+        import cv2
+        if self.reason is None or ts > self.until:
+            return
+        cv2.rectangle(frame, (0, 0), (frame.shape[1], 40), (0, 0, 255), -1)
+        cv2.putText(frame, f"ALERT: {self.reason}", (10, 28),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+
+def run_stub(port=8765):
+    """Local webhook stub: prints every alert POSTed to it."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            print("Webhook alert:", json.loads(body or b"{}"))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"Webhook stub listening on http://127.0.0.1:{port}/")
+    HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local webhook stub for alert delivery tests.")
+    parser.add_argument("--port", type=int, default=8765)
+    run_stub(parser.parse_args().port)
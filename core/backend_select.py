@@ -0,0 +1,155 @@
+"""
+Picks the fastest inference backend for the current machine.
+
+Each backend is run over the same sample frames and its throughput is recorded.
+Results are cached per hardware fingerprint, so later startups skip the measurement.
+
+Usage (from the repository root):
+    python -m core.backend_select            # benchmark camera frames, print table
+    python -m core.backend_select --refresh  # ignore the cache and measure again
+"""
+import argparse
+import json
+import os
+import platform
+import time
+
+from core.backends import create_backend, full_backends
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "posture_monitor", "backend_bench.json")
+
+
+def hardware_fingerprint():
+    try:
+        import mediapipe as mp
+        mp_version = mp.__version__
+    except ImportError:
+        mp_version = "unknown"
+    return "|".join([
+        platform.node(),
+        platform.machine(),
+        platform.processor() or "cpu",
+        str(os.cpu_count()),
+        f"mediapipe-{mp_version}",
+    ])
+
+
+def benchmark_backend(name, frames, warmup=5, **kwargs):
+    """Run one backend over `frames` (RGB) and return its throughput stats."""
+    backend = create_backend(name, **kwargs)
+    # Frames are replayed with synthetic 30 FPS timestamps so rate-limited stages
+    # (e.g. the cascade's pose update) behave as they would on a live camera.
+    try:
+        for i, frame in enumerate(frames[:warmup]):
+            backend.process(frame, i / 30.0)
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        for i, frame in enumerate(frames):
+            backend.process(frame, (warmup + i) / 30.0)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+    finally:
+        backend.close()
+    return {
+        "fps": len(frames) / elapsed if elapsed > 0 else 0.0,
+        "ms_per_frame": 1000.0 * elapsed / max(1, len(frames)),
+        "cpu_ms_per_frame": 1000.0 * cpu / max(1, len(frames)),
+    }
+
+
+def benchmark_backends(frames, names=None):
+    results = {}
+    for name in names or full_backends():
+        try:
+            results[name] = benchmark_backend(name, frames)
+        except Exception as e:
+            print(f"⚠️ Backend '{name}' failed: {e}")
+    return results
+
+
+def load_cache(cache_path=DEFAULT_CACHE_PATH):
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, cache_path=DEFAULT_CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def select_backend(frames=None, names=None, cache_path=DEFAULT_CACHE_PATH, refresh=False):
+    """
+    Return the name of the fastest backend on this machine.
+    - Uses the cached result for this hardware fingerprint unless `refresh` is set.
+    - Otherwise benchmarks `names` (default: every face + pose backend) on `frames` and
+      stores the result. Other candidate sets are cached under their own key.
+      `frames` may be a callable, so frames are only grabbed on a cache miss.
+    - Falls back to 'holistic' when nothing can be measured.
+    """
+    names = names or full_backends()
+    key = hardware_fingerprint()
+    if sorted(names) != sorted(full_backends()):
+        key += "|" + "+".join(sorted(names))
+    cache = load_cache(cache_path)
+    entry = cache.get(key)
+    if entry and not refresh and entry.get("best") in names:
+        return entry["best"]
+
+    if callable(frames):
+        frames = frames()
+    if not frames:
+        return "holistic"
+
+    print(f"Benchmarking backends on {len(frames)} frames: {', '.join(names)}")
+    results = benchmark_backends(frames, names)
+    if not results:
+        return "holistic"
+
+    best = max(results, key=lambda n: results[n]["fps"])
+    cache[key] = {
+        "best": best,
+        "results": results,
+        "frame_shape": list(frames[0].shape),
+        "measured_at": time.time(),
+    }
+    save_cache(cache, cache_path)
+    for name, r in results.items():
+        print(f"  {name:<16} {r['fps']:6.1f} FPS  ({r['ms_per_frame']:.1f} ms/frame, {r['cpu_ms_per_frame']:.1f} ms CPU)")
+    print(f"✅ Selected backend: {best}")
+    return best
+
+
+def grab_frames(cap, count=30):
+    """Read `count` frames from an open cv2.VideoCapture and return them as RGB."""
+    import cv2
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return frames
+
+
+if __name__ == "__main__":
+    import cv2
+
+    parser = argparse.ArgumentParser(description="Benchmark inference backends on camera frames.")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--refresh", action="store_true", help="ignore cached results")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.camera)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    frames = grab_frames(cap, args.frames)
+    cap.release()
+
+    select_backend(frames, cache_path=args.cache, refresh=args.refresh)
+    print(json.dumps(load_cache(args.cache).get(hardware_fingerprint(), {}), indent=2))
@@ -0,0 +1,345 @@
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from core.landmarks import as_array
+
+
+def _reset_graph(graph):
+    """Drop a MediaPipe solution's tracking state (older releases have no reset())."""
+    if hasattr(graph, "reset"):
+        graph.reset()
+
+
+class FrameResult:
+    """
+    Landmarks produced by one backend call.
+    - face_landmarks: (478, 4) array in FaceMesh layout, or None.
+    - pose_landmarks: (33, 4) array in BlazePose layout, or None.
+    - timestamp: capture time of the frame the landmarks belong to.
+    - inference_time: seconds spent inside the backend.
+    """
+
+    def __init__(self, face_landmarks=None, pose_landmarks=None, timestamp=None, inference_time=0.0):
+        self.face_landmarks = face_landmarks
+        self.pose_landmarks = pose_landmarks
+        self.timestamp = timestamp
+        self.inference_time = inference_time
+
+
+class InferenceBackend:
+    """
+    Base class for inference backends.
+    - Subclasses load their model(s) in __init__ and implement _infer(rgb_frame, timestamp).
+    - The calculators only ever see the FrameResult, so backends are interchangeable.
+    - `provides` lists the landmark sets a backend fills in; single-model backends are
+      meant for one view of a multi-camera setup.
+    - reset() forgets tracking state before an unrelated stream (next file, camera
+      restart), so landmarks from the old one are not carried over.
+    """
+
+    name = None
+    provides = ("face", "pose")
+
+    def process(self, rgb_frame, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        start = time.perf_counter()
+        result = self._infer(rgb_frame, timestamp)
+        result.inference_time = time.perf_counter() - start
+        result.timestamp = timestamp
+        return result
+
+    def _infer(self, rgb_frame, timestamp):
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HolisticBackend(InferenceBackend):
+    """Single mediapipe.solutions.holistic pipeline (pose -> face/hand ROIs)."""
+
+    name = "holistic"
+
+    def __init__(self,
+                 model_complexity=0,
+                 min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5,
+                 refine_face_landmarks=True):
+        import mediapipe as mp
+        self.holistic = mp.solutions.holistic.Holistic(
+            static_image_mode=False,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            refine_face_landmarks=refine_face_landmarks
+        )
+
+    def _infer(self, rgb_frame, timestamp):
+        results = self.holistic.process(rgb_frame)
+        return FrameResult(as_array(results.face_landmarks), as_array(results.pose_landmarks))
+
+    def reset(self):
+        _reset_graph(self.holistic)
+
+    def close(self):
+        self.holistic.close()
+
+
+class FaceMeshPoseBackend(InferenceBackend):
+    """
+    Two independent models: FaceMesh for the face and Pose for the body.
+    - With parallel=True, FaceMesh runs on a worker thread while Pose runs on the
+      calling thread. MediaPipe releases the GIL while a graph runs, so frame latency
+      is the slower of the two models instead of their sum.
+    """
+
+    name = "facemesh_pose"
+
+    def __init__(self,
+                 model_complexity=1,
+                 min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5,
+                 refine_face_landmarks=True,
+                 parallel=True):
+        import mediapipe as mp
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=refine_face_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self._pool = ThreadPoolExecutor(max_workers=1) if parallel else None
+
+    def _infer(self, rgb_frame, timestamp):
+        if self._pool is not None:
+            # Both models only read the frame, so they can share it without a copy
+            face_future = self._pool.submit(self.face_mesh.process, rgb_frame)
+            pose_results = self.pose.process(rgb_frame)
+            face_results = face_future.result()
+        else:
+            face_results = self.face_mesh.process(rgb_frame)
+            pose_results = self.pose.process(rgb_frame)
+        face = face_results.multi_face_landmarks[0] if face_results.multi_face_landmarks else None
+        return FrameResult(as_array(face), as_array(pose_results.pose_landmarks))
+
+    def reset(self):
+        _reset_graph(self.face_mesh)
+        _reset_graph(self.pose)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        self.face_mesh.close()
+        self.pose.close()
+
+
+class CascadeBackend(InferenceBackend):
+    """
+    Pose at a low rate finds the head, FaceMesh runs at full rate on the face crop.
+    - Posture changes slowly, so Pose only runs every 1/pose_hz seconds and its last
+      landmarks are reused in between.
+    - The face crop is taken from the pose head points and only moves when the head
+      has moved noticeably, so FaceMesh can keep tracking inside a stable crop.
+    - No hand models are loaded. Without a pose, FaceMesh falls back to the full frame.
+    """
+
+    name = "cascade"
+
+    # Pose landmarks 0-10: nose, eyes, ears and mouth corners
+    POSE_HEAD_IDX = list(range(11))
+
+    def __init__(self,
+                 pose_hz=3.0,
+                 model_complexity=0,
+                 min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5,
+                 refine_face_landmarks=True,
+                 roi_scale=2.2,
+                 roi_min_size=96):
+        import mediapipe as mp
+        self.pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=refine_face_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.pose_interval = 1.0 / pose_hz if pose_hz > 0 else 0.0
+        self.roi_scale = roi_scale
+        self.roi_min_size = roi_min_size
+
+        self._last_pose_time = None
+        self._pose = None
+        self._roi = None  # (x0, y0, x1, y1) in pixels
+
+    def _head_roi(self, pose, frame_shape):
+        """Square crop around the visible pose head points, or None."""
+        h, w = frame_shape[:2]
+        head = pose[self.POSE_HEAD_IDX]
+        visible = head[head[:, 3] >= 0.5] if head.shape[1] > 3 else head
+        if len(visible) < 3:
+            return None
+        px = visible[:, :2] * (w, h)
+        cx, cy = px.mean(axis=0)
+        size = max(self.roi_min_size, self.roi_scale * np.ptp(px, axis=0).max())
+        x0 = int(max(0, cx - size / 2))
+        y0 = int(max(0, cy - size / 2))
+        x1 = int(min(w, cx + size / 2))
+        y1 = int(min(h, cy + size / 2))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        return (x0, y0, x1, y1)
+
+    def _roi_moved(self, roi):
+        """Hysteresis: keep the old crop unless the head moved or resized noticeably."""
+        if self._roi is None or roi is None:
+            return True
+        old_size = max(self._roi[2] - self._roi[0], self._roi[3] - self._roi[1])
+        new_size = max(roi[2] - roi[0], roi[3] - roi[1])
+        shift = max(abs((roi[0] + roi[2]) - (self._roi[0] + self._roi[2])),
+                    abs((roi[1] + roi[3]) - (self._roi[1] + self._roi[3]))) / 2
+        return shift > 0.15 * old_size or abs(new_size - old_size) > 0.2 * old_size
+
+    def _update_pose(self, rgb_frame):
+        pose_results = self.pose.process(rgb_frame)
+        self._pose = as_array(pose_results.pose_landmarks)
+        roi = self._head_roi(self._pose, rgb_frame.shape) if self._pose is not None else None
+        if self._roi_moved(roi):
+            self._roi = roi
+
+    def _infer(self, rgb_frame, timestamp):
+        # A timestamp before the last pose (replay, new file, camera restart) counts as due
+        if (self._last_pose_time is None or timestamp < self._last_pose_time
+                or timestamp - self._last_pose_time >= self.pose_interval):
+            self._update_pose(rgb_frame)
+            self._last_pose_time = timestamp
+
+        h, w = rgb_frame.shape[:2]
+        if self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            crop = np.ascontiguousarray(rgb_frame[y0:y1, x0:x1])
+        else:
+            x0, y0, x1, y1 = 0, 0, w, h
+            crop = rgb_frame
+
+        face_results = self.face_mesh.process(crop)
+        face = None
+        if face_results.multi_face_landmarks:
+            # Map crop-normalized landmarks back to full-frame normalized coordinates
+            face = as_array(face_results.multi_face_landmarks[0])
+            cw, ch = x1 - x0, y1 - y0
+            face[:, 0] = (x0 + face[:, 0] * cw) / w
+            face[:, 1] = (y0 + face[:, 1] * ch) / h
+            face[:, 2] = face[:, 2] * cw / w
+
+        return FrameResult(face, self._pose)
+
+    def reset(self):
+        _reset_graph(self.pose)
+        _reset_graph(self.face_mesh)
+        self._last_pose_time = None
+        self._pose = None
+        self._roi = None
+
+    def close(self):
+        self.pose.close()
+        self.face_mesh.close()
+
+
+class FaceMeshBackend(InferenceBackend):
+    """FaceMesh only: a front camera that just watches the eyes."""
+
+    name = "facemesh"
+    provides = ("face",)
+
+    def __init__(self,
+                 min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5,
+                 refine_face_landmarks=True):
+        import mediapipe as mp
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=refine_face_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+    def _infer(self, rgb_frame, timestamp):
+        face_results = self.face_mesh.process(rgb_frame)
+        face = face_results.multi_face_landmarks[0] if face_results.multi_face_landmarks else None
+        return FrameResult(as_array(face), None)
+
+    def reset(self):
+        _reset_graph(self.face_mesh)
+
+    def close(self):
+        self.face_mesh.close()
+
+
+class PoseBackend(InferenceBackend):
+    """Pose only: a side camera that just watches the posture."""
+
+    name = "pose"
+    provides = ("pose",)
+
+    def __init__(self,
+                 model_complexity=1,
+                 min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self.pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+    def _infer(self, rgb_frame, timestamp):
+        pose_results = self.pose.process(rgb_frame)
+        return FrameResult(None, as_array(pose_results.pose_landmarks))
+
+    def reset(self):
+        _reset_graph(self.pose)
+
+    def close(self):
+        self.pose.close()
+
+
+# Registry of available backends. New backends only need an entry here.
+BACKENDS = {
+    HolisticBackend.name: HolisticBackend,
+    FaceMeshPoseBackend.name: FaceMeshPoseBackend,
+    CascadeBackend.name: CascadeBackend,
+    FaceMeshBackend.name: FaceMeshBackend,
+    PoseBackend.name: PoseBackend,
+}
+
+
+def full_backends():
+    """Names of the backends that produce both face and pose landmarks."""
+    return [name for name, cls in BACKENDS.items() if set(cls.provides) >= {"face", "pose"}]
+
+
+def create_backend(name, **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,248 @@
+"""
+Batch processing of recorded sessions for audits.
+
+- Every video under the input directory is one task. Tasks are sharded over a
+  process pool; each worker process owns its own backend (Holistic by default).
+  The backend is reset() before every file, so tracking state from the previous
+  recording (whose timestamps also started at 0) is never carried over.
+- Each file gets fresh EyeStrainDetector / PostureDetector state. Both are
+  calibrated on the first frames of the file, since nobody is there to press 'E'.
+- The result for a file is written to <out>/results/ as soon as the file is done.
+  Re-running the same command skips files that already have a successful result,
+  so an interrupted run resumes where it stopped and failed files are retried.
+- All per-file results are merged into <out>/summary.json.
+
+Usage (from the repository root):
+    python -m core.batch recordings/ --out audit/ --workers 8
+    python -m core.batch recordings/ --out audit/ --shard 0/2   # first half, e.g. on another host
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+from core.backends import create_backend, full_backends
+from core.eye_strain import EyeStrainDetector
+from core.posture import PostureDetector
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Per-worker state, created once by _init_worker
+_backend = None
+_options = None
+
+
+def find_videos(root):
+    videos = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(videos)
+
+
+def result_path(out_dir, rel_path):
+    digest = hashlib.sha1(rel_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(out_dir, "results", f"{digest}.json")
+
+
+def is_done(out_dir, rel_path):
+    """True if the file already has a successful checkpoint (failed files are retried)."""
+    try:
+        with open(result_path(out_dir, rel_path)) as f:
+            return json.load(f).get("status") == "ok"
+    except (OSError, ValueError):
+        return False
+
+
+def _write_json(path, data):
+    # Write then rename, so a crash never leaves a half-written checkpoint
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _init_worker(backend_name, options):
+    global _backend, _options
+    import cv2
+    # One process per core: keep OpenCV from starting its own thread pool in every worker
+    cv2.setNumThreads(1)
+    _backend = create_backend(backend_name)
+    _options = options
+
+
+def process_video(path, backend, calib_frames=60, eye_kwargs=None):
+    """Run one recording through the backend and the calculators; return its summary."""
+    import cv2
+
+    eye_detector = EyeStrainDetector(**dict(eye_kwargs or {}, ear_calib_frames=calib_frames or 60))
+    posture_detector = PostureDetector()
+    if calib_frames:
+        eye_detector.start_calibration()
+        posture_detector.start_calibration(frames=calib_frames)
+
+    # The worker's backend was used for other files; their timestamps overlap this one's
+    backend.reset()
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"cannot open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = face_frames = pose_frames = 0
+    yawns = 0
+    yawning = False
+    drowsy_seconds = 0.0
+    posture_seconds = {}
+    last_ts = None
+    start = time.perf_counter()
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        # Timestamps come from the video, not the wall clock, so results do not
+        # depend on how fast this machine processes the file.
+        ts = frames / fps
+        dt = 0.0 if last_ts is None else ts - last_ts
+        last_ts = ts
+        frames += 1
+
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        result = backend.process(rgb_frame, ts)
+
+        if result.face_landmarks is not None:
+            eye_info, _, _ = eye_detector.process_landmarks(result.face_landmarks, frame.shape, ts)
+            if eye_info is not None:
+                face_frames += 1
+                if "drowsy" in eye_info["status"].lower():
+                    drowsy_seconds += dt
+                if eye_info["yawn"] and not yawning:
+                    yawns += 1
+                yawning = eye_info["yawn"]
+
+        if result.pose_landmarks is not None:
+            pose_frames += 1
+            metrics = posture_detector.calculate_metrics(result.pose_landmarks)
+            if posture_detector.calib_mode:
+                posture_detector.process_calibration(metrics)
+            elif posture_detector.baseline is not None:
+                posture = posture_detector.detect_posture(metrics)
+                posture_seconds[posture] = posture_seconds.get(posture, 0.0) + dt
+
+    cap.release()
+    if frames == 0:
+        # Reported as failed (and retried next run) rather than checkpointed as an empty success
+        raise IOError(f"no decodable frames in {path}")
+    elapsed = time.perf_counter() - start
+    duration = frames / fps
+    face_minutes = face_frames / fps / 60.0
+    return {
+        "frames": frames,
+        "duration_seconds": duration,
+        "face_frames": face_frames,
+        "pose_frames": pose_frames,
+        "blink_count": eye_detector.blink_count,
+        "blinks_per_minute": eye_detector.blink_count / face_minutes if face_minutes > 0 else 0.0,
+        "drowsy_seconds": drowsy_seconds,
+        "yawns": yawns,
+        "eye_baseline_ear": eye_detector.baseline_ear,
+        "posture_baseline": posture_detector.baseline,
+        "posture_seconds": posture_seconds,
+        "processing_seconds": elapsed,
+        "processing_fps": frames / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def _run_task(task):
+    rel_path, root, out_dir = task
+    try:
+        summary = process_video(os.path.join(root, rel_path), _backend, **_options)
+        summary["status"] = "ok"
+    except Exception as e:
+        summary = {"status": "error", "error": repr(e)}
+    summary["file"] = rel_path
+    summary["worker_pid"] = os.getpid()
+    _write_json(result_path(out_dir, rel_path), summary)
+    return summary
+
+
+def merge_results(out_dir, files):
+    """Combine the per-file checkpoints for `files` into one summary dict."""
+    results = []
+    for rel_path in files:
+        try:
+            with open(result_path(out_dir, rel_path)) as f:
+                results.append(json.load(f))
+        except (OSError, ValueError):
+            pass
+    ok = [r for r in results if r.get("status") == "ok"]
+    total_minutes = sum(r["duration_seconds"] for r in ok) / 60.0
+    posture_seconds = {}
+    for r in ok:
+        for state, seconds in r["posture_seconds"].items():
+            posture_seconds[state] = posture_seconds.get(state, 0.0) + seconds
+    return {
+        "files": len(files),
+        "processed": len(ok),
+        "failed": [r["file"] for r in results if r.get("status") != "ok"],
+        "missing": len(files) - len(results),
+        "total_minutes": total_minutes,
+        "total_blinks": sum(r["blink_count"] for r in ok),
+        "total_drowsy_seconds": sum(r["drowsy_seconds"] for r in ok),
+        "total_yawns": sum(r["yawns"] for r in ok),
+        "posture_seconds": posture_seconds,
+        "per_file": sorted(results, key=lambda r: r["file"]),
+    }
+
+
+def run_batch(root, out_dir, workers=None, backend="holistic", shard=(0, 1), calib_frames=60):
+    os.makedirs(os.path.join(out_dir, "results"), exist_ok=True)
+    index, count = shard
+    files = [f for i, f in enumerate(find_videos(root)) if i % count == index]
+    pending = [f for f in files if not is_done(out_dir, f)]
+    print(f"{len(files)} files in shard {index}/{count}, {len(files) - len(pending)} already done, {len(pending)} to process")
+
+    if pending:
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        options = {"calib_frames": calib_frames}
+        tasks = [(f, root, out_dir) for f in pending]
+        start = time.perf_counter()
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(backend, options)) as pool:
+            for done, summary in enumerate(pool.imap_unordered(_run_task, tasks, chunksize=1), 1):
+                if summary["status"] == "ok":
+                    print(f"[{done}/{len(pending)}] {summary['file']}: {summary['frames']} frames, "
+                          f"{summary['processing_fps']:.1f} FPS")
+                else:
+                    print(f"[{done}/{len(pending)}] ⚠️ {summary['file']}: {summary['error']}")
+        print(f"Processed {len(pending)} files in {time.perf_counter() - start:.1f}s with {workers} workers")
+
+    summary = merge_results(out_dir, files)
+    _write_json(os.path.join(out_dir, "summary.json" if count == 1 else f"summary_shard{index}.json"), summary)
+    return summary
+
+
+def parse_shard(value):
+    index, count = (int(v) for v in value.split("/"))
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard must be i/n with 0 <= i < n")
+    return index, count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process a directory of recorded sessions.")
+    parser.add_argument("input", help="directory with recordings (searched recursively)")
+    parser.add_argument("--out", required=True, help="output directory for checkpoints and summary")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--backend", default="holistic", choices=full_backends())
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="process only shard i of n, e.g. 0/4")
+    parser.add_argument("--calib-frames", type=int, default=60, help="frames used to calibrate each file (0 = off)")
+    args = parser.parse_args()
+
+    summary = run_batch(args.input, args.out, args.workers, args.backend, args.shard, args.calib_frames)
+    print(f"✅ {summary['processed']}/{summary['files']} files, {summary['total_minutes']:.1f} min, "
+          f"{summary['total_blinks']} blinks, {summary['total_yawns']} yawns")
+    if summary["failed"]:
+        print("⚠️ Failed:", ", ".join(summary["failed"]))
@@ -0,0 +1,92 @@
+"""
+Blink, drowsy and yawn decisions of EyeStrainDetector across frame rates.
+
+The same scripted session (blinks, one long eye closure and one yawn) is sampled
+at 10-60 FPS and fed to EyeStrainDetector.process_landmarks with capture
+timestamps. With time-based smoothing and interpolated threshold crossings the
+blink count, the drowsy alert delay and the yawn alert delay should barely move
+with the frame rate.
+
+Usage (from the repository root):
+    python -m core.bench_fps
+    python -m core.bench_fps --fps 10 15 30 60 --seconds 180
+"""
+import argparse
+import numpy as np
+
+from core.eye_strain import EyeStrainDetector
+from core.bench_resolution import OPEN_EAR, eye_landmarks, scripted_ear
+
+WIDTH, HEIGHT = 640, 480
+OPEN_MAR, YAWN_MAR = 0.3, 0.9
+
+
+def session(seconds, fps, seed):
+    """Per-frame (t, ear, mar) plus the event ground truth."""
+    rng = np.random.default_rng(seed)
+    t, ear, blinks = scripted_ear(seconds, fps, rng, closed_ear=(0.03, 0.12))
+
+    # One long closure (drowsy) and one yawn; blinks too close to the closure are removed
+    closure = (seconds * 0.5, seconds * 0.5 + 1.5)
+    yawn = (seconds * 0.75, seconds * 0.75 + 2.5)
+    kept = []
+    for b in blinks:
+        if b[1] < closure[0] - 0.5 or b[0] > closure[1] + 0.5:
+            kept.append(b)
+        else:
+            ear[(t >= b[0]) & (t <= b[1])] = OPEN_EAR
+    ear[(t >= closure[0]) & (t <= closure[1])] = 0.04
+
+    ramp = np.clip(np.minimum(t - yawn[0], yawn[1] - t) / 0.4, 0.0, 1.0)
+    mar = OPEN_MAR + (YAWN_MAR - OPEN_MAR) * ramp
+    return t, ear, mar, {"blinks": kept, "closure": closure, "yawn": yawn}
+
+
+def mouth_landmarks(pts, mar):
+    """Write the four MAR landmarks into `pts` (mouth width 0.08 frame widths)."""
+    d = EyeStrainDetector
+    cx, cy, half_w = 0.5, 0.45, 0.04
+    pts[d.MOUTH_LEFT, :2] = (cx - half_w, cy * WIDTH / HEIGHT)
+    pts[d.MOUTH_RIGHT, :2] = (cx + half_w, cy * WIDTH / HEIGHT)
+    pts[d.MOUTH_TOP, :2] = (cx, (cy - mar * half_w) * WIDTH / HEIGHT)
+    pts[d.MOUTH_BOTTOM, :2] = (cx, (cy + mar * half_w) * WIDTH / HEIGHT)
+    return pts
+
+
+def run_fps(fps, seconds, seed):
+    t, ear, mar, truth = session(seconds, fps, seed)
+    rng = np.random.default_rng(seed + 1)
+    detector = EyeStrainDetector()
+    drowsy_at = yawn_at = None
+    for ti, e, m in zip(t, ear, mar):
+        lm = mouth_landmarks(eye_landmarks(e, WIDTH, HEIGHT, rng), m)
+        info, _, _ = detector.process_landmarks(lm, (HEIGHT, WIDTH, 3), ti)
+        if drowsy_at is None and "drowsy" in info["status"].lower():
+            drowsy_at = ti
+        if yawn_at is None and info["yawn"]:
+            yawn_at = ti
+    return {
+        "fps": fps,
+        "blinks_true": len(truth["blinks"]),
+        "blinks_detected": detector.blink_count,
+        "drowsy_delay": None if drowsy_at is None else drowsy_at - truth["closure"][0],
+        "yawn_delay": None if yawn_at is None else yawn_at - truth["yawn"][0],
+    }
+
+
+def fmt(value):
+    return "   -" if value is None else f"{value:5.2f}s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EyeStrainDetector decisions vs frame rate.")
+    parser.add_argument("--fps", type=float, nargs="+", default=[10, 15, 20, 30, 45, 60])
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'FPS':>5} {'blinks':>12} {'drowsy delay':>13} {'yawn delay':>11}")
+    for fps in args.fps:
+        r = run_fps(fps, args.seconds, args.seed)
+        print(f"{r['fps']:5.0f} {r['blinks_detected']:5d} / {r['blinks_true']:<4d} "
+              f"{fmt(r['drowsy_delay']):>13} {fmt(r['yawn_delay']):>11}")
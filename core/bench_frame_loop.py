@@ -0,0 +1,92 @@
+"""
+Allocation churn and time of the capture/convert/copy part of the frame loop.
+
+Compares the old loop (cap.read() + cvtColor + two frame.copy() calls, four new
+frames per iteration) with FrameBuffers (everything reused). Frames come from a
+temporary video, so cap.read() behaves like a real capture. Inference is left out
+so that only the frame-handling overhead is measured.
+
+Usage (from the repository root):
+    python -m core.bench_frame_loop
+    python -m core.bench_frame_loop --width 1280 --height 720 --frames 600
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from core.frame_buffers import FrameBuffers
+
+
+def make_video(path, width, height, frames):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (width, height))
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(frames):
+        writer.write(np.roll(base, i, axis=1))
+    writer.release()
+
+
+def legacy_step(cap, state):
+    ret, frame = cap.read()
+    if not ret:
+        return False
+    frame_eye = frame.copy()
+    frame_posture = frame.copy()
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return True
+
+
+def buffered_step(cap, buffers):
+    ret, frame = buffers.read(cap)
+    if not ret:
+        return False
+    rgb_frame = buffers.to_rgb()
+    frame_eye = buffers.overlay("eye")
+    frame_posture = frame
+    return True
+
+
+def measure(path, step, state):
+    cap = cv2.VideoCapture(path)
+    step(cap, state)  # first frame allocates the buffers
+    peaks = []
+    elapsed = 0.0
+    tracemalloc.start()
+    while True:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        if not step(cap, state):
+            break
+        elapsed += time.perf_counter() - start
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    cap.release()
+    return {
+        "frames": len(peaks),
+        "alloc_mb_per_frame": float(np.mean(peaks)) / 1e6 if peaks else 0.0,
+        "ms_per_frame": 1000.0 * elapsed / max(1, len(peaks)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frame-loop allocation churn: legacy vs FrameBuffers.")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.avi")
+        make_video(path, args.width, args.height, args.frames)
+        frame_mb = args.width * args.height * 3 / 1e6
+        print(f"{args.width}x{args.height}, one frame = {frame_mb:.2f} MB")
+        print(f"{'loop':<10} {'peak new MB/frame':>18} {'ms/frame':>9}")
+        for name, step, state in (("legacy", legacy_step, None), ("buffered", buffered_step, FrameBuffers())):
+            r = measure(path, step, state)
+            print(f"{name:<10} {r['alloc_mb_per_frame']:18.2f} {r['ms_per_frame']:9.2f}")
@@ -0,0 +1,245 @@
+"""
+Detection accuracy versus CPU cost over model settings, on labeled recordings.
+
+Every clip needs a label file next to it with the same name and a .json extension:
+    {"events": [{"kind": "blink", "start": 12.40, "end": 12.62},
+                {"kind": "slouch", "start": 40.0, "end": 75.5}],
+     "kinds": ["blink", "yawn", "slouch"],     # optional: event types that were labeled
+     "calib_seconds": 3.0}                     # optional: good posture, eyes open
+Kinds are blink, closure (eyes shut long enough to count as drowsy), yawn, slouch,
+tilt and forward. Without "kinds", the kinds that occur in "events" are scored.
+Both detectors calibrate on the first calib_seconds of each clip, as in core/batch.py.
+
+Every combination of --complexity, --refine, --width and --fps is run over every clip:
+  - frames are resized and dropped to the target rate before timing starts, as if the
+    camera had delivered them that way;
+  - CPU time (time.process_time, all threads) is measured around the backend and the
+    detectors, and each clip gets a fresh backend;
+  - detections are scored with core.synthetic.match_events. Accuracy is the lowest F1
+    over the scored kinds, so a setting cannot hide missed yawns behind good blink
+    numbers.
+The report is a table of precision/recall per kind next to CPU time, with the Pareto
+frontier marked: settings where no other setting is both cheaper and at least as
+accurate. It also names the cheapest setting that meets --bar.
+--out is merged, not overwritten: results are stored under the machine's hardware
+fingerprint and the backend, so running the same command on each hardware class
+collects their recommendations in one file.
+
+Usage (from the repository root):
+    python -m core.bench_pareto recordings/ --out pareto.json
+    python -m core.bench_pareto recordings/ --complexity 0 1 --width 640 320 --fps 30 15 --bar 0.9
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import time
+
+from core.backend_select import hardware_fingerprint
+from core.backends import create_backend, full_backends
+from core.batch import _write_json, find_videos
+from core.config import backend_kwargs
+from core.eye_strain import EyeStrainDetector
+from core.posture import PostureDetector
+from core.synthetic import POSTURE_VERDICTS, _rising_edges, match_events, merge_scores
+
+KINDS = ("blink", "closure", "yawn") + tuple(POSTURE_VERDICTS)
+
+# Event matching tolerance per kind, in seconds (as in core/synthetic.py)
+SLACK = {"blink": 0.2, "closure": 1.0, "yawn": 1.0, "slouch": 3.0, "tilt": 3.0, "forward": 3.0}
+
+
+def load_labels(video_path):
+    label_path = os.path.splitext(video_path)[0] + ".json"
+    with open(label_path, encoding="utf-8") as f:
+        labels = json.load(f)
+    unknown = {e["kind"] for e in labels["events"]} - set(KINDS)
+    if unknown:
+        raise ValueError(f"{label_path}: unknown event kind(s) {', '.join(sorted(unknown))}")
+    labels.setdefault("kinds", sorted({e["kind"] for e in labels["events"]}))
+    labels.setdefault("calib_seconds", 3.0)
+    return labels
+
+
+def evaluate_clip(path, labels, backend, width, fps):
+    """Scores per kind plus CPU seconds and frame count for one clip at one setting."""
+    import cv2
+    import numpy as np
+
+    eye_detector = EyeStrainDetector()
+    posture_detector = PostureDetector()
+    cap = cv2.VideoCapture(path)
+    src_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    step = src_fps / fps if fps < src_fps else 1.0
+    next_kept = 0.0
+    calib_frames = max(1, int(labels["calib_seconds"] * min(fps, src_fps)))
+
+    times, blinks, drowsy, yawn, verdicts = [], [], [], [], []
+    cpu = 0.0
+    index = kept = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        eye_detector.start_calibration()
+        posture_detector.start_calibration(frames=calib_frames)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            index += 1
+            if index - 1 < next_kept - 1e-6:
+                continue  # dropped to reach the target frame rate
+            next_kept += step
+            ts = (index - 1) / src_fps
+            if frame.shape[1] != width:
+                frame = cv2.resize(frame, (width, round(frame.shape[0] * width / frame.shape[1])),
+                                   interpolation=cv2.INTER_AREA)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+            start = time.process_time()
+            result = backend.process(rgb, ts)
+            info = None
+            count = eye_detector.blink_count
+            if result.face_landmarks is not None:
+                info, _, _ = eye_detector.process_landmarks(result.face_landmarks, frame.shape, ts)
+            verdict = None
+            if result.pose_landmarks is not None:
+                metrics = posture_detector.calculate_metrics(result.pose_landmarks)
+                if posture_detector.calib_mode:
+                    posture_detector.process_calibration(metrics)
+                elif posture_detector.baseline is not None:
+                    verdict = posture_detector.detect_posture(metrics)
+            cpu += time.process_time() - start
+
+            kept += 1
+            times.append(ts)
+            if eye_detector.blink_count > count:
+                blinks.append(eye_detector.blink_timestamps[-1])
+            drowsy.append(info is not None and "drowsy" in info["status"].lower())
+            yawn.append(info is not None and info["yawn"])
+            verdicts.append(verdict)
+    cap.release()
+
+    t = np.array(times)
+    detected = {"blink": blinks, "closure": _rising_edges(t, drowsy), "yawn": _rising_edges(t, yawn)}
+    for kind, text in POSTURE_VERDICTS.items():
+        detected[kind] = _rising_edges(t, [v == text for v in verdicts])
+    truth = {}
+    for e in labels["events"]:
+        truth.setdefault(e["kind"], []).append((e["start"], e["end"]))
+    scores = {kind: match_events(detected[kind], truth.get(kind, []), slack=SLACK[kind])
+              for kind in labels["kinds"]}
+    return scores, cpu, kept, index / src_fps
+
+
+def f1(score):
+    p, r = score["precision"], score["recall"]
+    return 2 * p * r / (p + r) if p + r > 0 else 0.0
+
+
+def pareto_front(rows, cost="cpu_ms_per_second", accuracy="accuracy"):
+    """Rows not beaten on both cost and accuracy, cheapest first."""
+    front = []
+    for row in sorted(rows, key=lambda r: (r[cost], -r[accuracy])):
+        if not front or row[accuracy] > front[-1][accuracy]:
+            front.append(row)
+    return front
+
+
+def run(root, backend="holistic", complexities=(0, 1), refines=(True, False), widths=(640, 480, 320),
+        rates=(30, 15, 10)):
+    clips = [(os.path.join(root, rel), load_labels(os.path.join(root, rel))) for rel in find_videos(root)]
+    if not clips:
+        raise SystemExit(f"⚠️ No videos under {root}")
+    rows = []
+    for complexity, refine in itertools.product(complexities, refines):
+        # Settings the backend does not take (e.g. refinement for a pose-only model) are not varied
+        kwargs = backend_kwargs(backend, {"model": {"model_complexity": complexity,
+                                                    "refine_face_landmarks": refine}})
+        if any(r["model"] == kwargs for r in rows):
+            continue
+        for width, fps in itertools.product(widths, rates):
+            all_scores, cpu, frames, seconds = [], 0.0, 0, 0.0
+            for path, labels in clips:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    model = create_backend(backend, **kwargs)
+                try:
+                    scores, clip_cpu, clip_frames, clip_seconds = evaluate_clip(path, labels, model, width, fps)
+                finally:
+                    model.close()
+                all_scores.append(scores)
+                cpu += clip_cpu
+                frames += clip_frames
+                seconds += clip_seconds
+            scores = merge_scores(all_scores)
+            f1s = {kind: f1(s) for kind, s in scores.items()}
+            row = {"model": kwargs, "width": width, "fps": fps,
+                   "cpu_ms_per_frame": 1000 * cpu / frames if frames else 0.0,
+                   "cpu_ms_per_second": 1000 * cpu / seconds if seconds else 0.0,
+                   "accuracy": min(f1s.values()) if f1s else 0.0,
+                   "mean_f1": sum(f1s.values()) / len(f1s) if f1s else 0.0,
+                   "scores": scores}
+            rows.append(row)
+            print(f"  {_describe(row)}: {row['cpu_ms_per_second']:.0f} CPU ms/s, min F1 {row['accuracy']:.2f}")
+    return rows
+
+
+def save_report(path, fingerprint, backend, report):
+    """Store `report` under path[fingerprint][backend], keeping other machines' results."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        print(f"⚠️ {path} is not a results file from this script, starting a new one")
+        data = {}
+    data.setdefault(fingerprint, {})[backend] = report
+    _write_json(path, data)
+    return data
+
+
+def _describe(row):
+    model = ", ".join(f"{k}={v}" for k, v in row["model"].items()) or "defaults"
+    return f"{model}, {row['width']} px, {row['fps']:g} FPS"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy-versus-cost Pareto frontier on labeled clips.")
+    parser.add_argument("root", help="directory of clips, each with a <clip>.json label file")
+    parser.add_argument("--backend", default="holistic", choices=full_backends())
+    parser.add_argument("--complexity", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--refine", type=int, nargs="+", default=[1, 0], help="refine_face_landmarks: 1 and/or 0")
+    parser.add_argument("--width", type=int, nargs="+", default=[640, 480, 320])
+    parser.add_argument("--fps", type=float, nargs="+", default=[30, 15, 10])
+    parser.add_argument("--bar", type=float, default=0.9, help="minimum F1 every event kind must reach")
+    parser.add_argument("--out", default="pareto.json")
+    args = parser.parse_args()
+
+    print(f"Running {args.backend} over the settings grid...")
+    rows = run(args.root, args.backend, args.complexity, [bool(r) for r in args.refine], args.width, args.fps)
+    front = pareto_front(rows)
+    meeting = [r for r in front if r["accuracy"] >= args.bar]
+    recommended = meeting[0] if meeting else None
+
+    kinds = sorted({kind for r in rows for kind in r["scores"]})
+    print(f"\n{'setting':<64} {'ms/frame':>9} {'ms/s':>7} " + " ".join(f"{k + ' P/R':>13}" for k in kinds)
+          + f" {'min F1':>7}  frontier")
+    for row in sorted(rows, key=lambda r: r["cpu_ms_per_second"]):
+        scores = row["scores"]
+        print(f"{_describe(row):<64} {row['cpu_ms_per_frame']:9.1f} {row['cpu_ms_per_second']:7.0f} "
+              + " ".join(f"{scores[k]['precision']:8.2f}/{scores[k]['recall']:.2f}" for k in kinds)
+              + f" {row['accuracy']:7.2f}" + ("  *" if row in front else ""))
+    if recommended is not None:
+        print(f"\n✅ Cheapest setting with F1 >= {args.bar} on every kind: {_describe(recommended)} "
+              f"({recommended['cpu_ms_per_second']:.0f} CPU ms per second of video)")
+    else:
+        print(f"\n⚠️ No setting reaches F1 >= {args.bar} on every kind")
+
+    fingerprint = hardware_fingerprint()
+    data = save_report(args.out, fingerprint, args.backend,
+                       {"bar": args.bar, "measured_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "results": rows, "frontier": front, "recommended": recommended})
+    print(f"Results for {fingerprint} written to {args.out} ({len(data)} machine(s) in the file)")
@@ -0,0 +1,156 @@
+"""
+Blink-detection accuracy versus input resolution.
+
+A scripted eye-openness signal (open-eye jitter plus blinks with known start/end
+times) is rendered as FaceMesh eye landmarks at several resolutions. EAR is then
+computed two ways:
+  - float: EyeStrainDetector.calculate_EAR (float pixels, aspect-corrected)
+  - int:   the previous implementation, which rounded landmarks to whole pixels
+Blinks are counted as below-threshold runs of the smoothed EAR and matched
+against the ground truth. As in EyeStrainDetector, the threshold is 0.75 x the
+EAR measured over a calibration period with open eyes (or a fixed --threshold).
+
+Usage (from the repository root):
+    python -m core.bench_resolution
+    python -m core.bench_resolution --seconds 300 --threshold 0.21
+"""
+import argparse
+import numpy as np
+
+from core.eye_strain import EyeStrainDetector
+
+RESOLUTIONS = [(1280, 720), (960, 540), (640, 480), (480, 360), (320, 240), (240, 180), (160, 120)]
+
+# Eye geometry in frame-width units (same camera field of view at every resolution)
+EYE_WIDTH = 0.045
+EYE_CENTERS = [(0.45, 0.30), (0.55, 0.30)]
+OPEN_EAR = 0.30
+# Many natural blinks are incomplete, so the lowest EAR of a blink varies
+CLOSED_EAR = (0.05, 0.20)
+CALIB_SECONDS = 2.0
+
+
+def scripted_ear(seconds, fps, rng, blink_every=(2.0, 6.0), blink_len=(0.08, 0.35), closed_ear=CLOSED_EAR):
+    """True per-frame EAR plus the ground-truth blink intervals (start, end) in seconds."""
+    t = np.arange(int(seconds * fps)) / fps
+    ear = np.full(len(t), OPEN_EAR)
+    blinks = []
+    start = CALIB_SECONDS + rng.uniform(*blink_every)
+    while start < seconds - 1.0:
+        length = rng.uniform(*blink_len)
+        blinks.append((start, start + length))
+        # Smooth dip: closes fast, reopens a little slower
+        phase = (t - start) / length
+        inside = (phase >= 0) & (phase <= 1)
+        depth = np.sin(np.pi * phase[inside]) ** 0.6
+        ear[inside] = OPEN_EAR - (OPEN_EAR - rng.uniform(*closed_ear)) * depth
+        start += length + rng.uniform(*blink_every)
+    return t, ear, blinks
+
+
+def eye_landmarks(ear, width, height, rng, noise=0.0006):
+    """
+    Place both eyes' six EAR landmarks in a 478-point array (normalized coordinates).
+    `noise` is landmark jitter in frame-width units, like a landmark model's output noise.
+    """
+    pts = np.zeros((478, 4))
+    half_h = ear * EYE_WIDTH / 2.0
+    for (cx, cy), idx in zip(EYE_CENTERS, [EyeStrainDetector.LEFT_EYE_IDX, EyeStrainDetector.RIGHT_EYE_IDX]):
+        # p1 corner, p2/p3 upper lid, p4 corner, p5/p6 lower lid (EAR landmark order)
+        local = np.array([
+            (-EYE_WIDTH / 2, 0.0),
+            (-EYE_WIDTH / 6, -half_h),
+            (EYE_WIDTH / 6, -half_h),
+            (EYE_WIDTH / 2, 0.0),
+            (EYE_WIDTH / 6, half_h),
+            (-EYE_WIDTH / 6, half_h),
+        ])
+        local += rng.normal(0.0, noise, local.shape)
+        # width units -> normalized x/y (y is relative to the frame height)
+        pts[idx, 0] = cx + local[:, 0]
+        pts[idx, 1] = (cy + local[:, 1]) * width / height
+    return pts
+
+
+def legacy_int_ear(landmarks, indices, shape):
+    coords = [(int(landmarks[i, 0] * shape[1]), int(landmarks[i, 1] * shape[0])) for i in indices]
+    A = np.linalg.norm(np.array(coords[1]) - np.array(coords[5]))
+    B = np.linalg.norm(np.array(coords[2]) - np.array(coords[4]))
+    C = np.linalg.norm(np.array(coords[0]) - np.array(coords[3]))
+    return 0.0 if C == 0 else (A + B) / (2.0 * C)
+
+
+def detect_blinks(t, ear, threshold, smoothing=5):
+    """Below-threshold runs of the moving-average EAR, as (start, end) times."""
+    smoothed = np.convolve(ear, np.ones(smoothing) / smoothing)[:len(ear)]
+    smoothed[:smoothing - 1] = ear[:smoothing - 1]
+    closed = smoothed < threshold
+    edges = np.diff(closed.astype(int), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return [(t[s], t[e]) for s, e in zip(starts, ends)]
+
+
+def score(detected, truth, slack=0.2):
+    """Precision/recall of detected runs against ground-truth blink intervals."""
+    matched = set()
+    tp = 0
+    for ds, de in detected:
+        for i, (ts, te) in enumerate(truth):
+            if i not in matched and ds <= te + slack and de >= ts - slack:
+                matched.add(i)
+                tp += 1
+                break
+    precision = tp / len(detected) if detected else 1.0
+    recall = tp / len(truth) if truth else 1.0
+    return precision, recall
+
+
+def run(seconds=120.0, fps=30.0, threshold=None, seed=0):
+    rng = np.random.default_rng(seed)
+    t, true_ear, blinks = scripted_ear(seconds, fps, rng)
+    detector = EyeStrainDetector()
+    rows = []
+    for width, height in RESOLUTIONS:
+        shape = (height, width, 3)
+        float_ear = np.empty(len(t))
+        int_ear = np.empty(len(t))
+        for i, e in enumerate(true_ear):
+            lm = eye_landmarks(e, width, height, rng)
+            l, _ = detector.calculate_EAR(lm, detector.LEFT_EYE_IDX, shape)
+            r, _ = detector.calculate_EAR(lm, detector.RIGHT_EYE_IDX, shape)
+            float_ear[i] = (l + r) / 2.0
+            int_ear[i] = (legacy_int_ear(lm, detector.LEFT_EYE_IDX, shape) +
+                          legacy_int_ear(lm, detector.RIGHT_EYE_IDX, shape)) / 2.0
+        open_mask = true_ear >= OPEN_EAR
+        calib_mask = t < CALIB_SECONDS
+        for name, ear in (("float", float_ear), ("int", int_ear)):
+            thr = threshold if threshold is not None else max(0.12, 0.75 * ear[calib_mask].mean())
+            p, r = score(detect_blinks(t, ear, thr), blinks)
+            rows.append({
+                "resolution": f"{width}x{height}",
+                "method": name,
+                "open_ear_mean": float(ear[open_mask].mean()),
+                "open_ear_std": float(ear[open_mask].std()),
+                "threshold": thr,
+                "precision": p,
+                "recall": r,
+            })
+    return rows, len(blinks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blink accuracy vs input resolution (float vs int EAR).")
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="fixed EAR threshold (default: calibrated per run)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, n_blinks = run(args.seconds, args.fps, args.threshold, args.seed)
+    print(f"{n_blinks} ground-truth blinks")
+    print(f"{'resolution':<11} {'method':<6} {'open EAR':>9} {'std':>7} {'thr':>6} {'precision':>10} {'recall':>7}")
+    for r in rows:
+        print(f"{r['resolution']:<11} {r['method']:<6} {r['open_ear_mean']:9.3f} {r['open_ear_std']:7.3f} "
+              f"{r['threshold']:6.3f} {r['precision']:10.2f} {r['recall']:7.2f}")
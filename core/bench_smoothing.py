@@ -0,0 +1,98 @@
+"""
+Alert noise from landmark jitter, with and without the One Euro smoothing stage.
+
+Landmarks from the light models (model_complexity=0, low input resolution) jitter
+from frame to frame. Two scripted sessions are replayed with Gaussian landmark
+noise added, once raw and once through core.smoothing.LandmarkSmoother:
+  - posture: 40 s of good posture close to the "forward head" threshold, then 20 s
+    of forward head. Reports how often the verdict flips, the share of wrong frames
+    and how long the real change took to show.
+  - blinks: the bench_fps eye session. Reports detected vs true blinks.
+
+Usage (from the repository root):
+    python -m core.bench_smoothing
+    python -m core.bench_smoothing --noise 0.005 0.01 0.02
+"""
+import argparse
+import numpy as np
+
+from core.backends import FrameResult
+from core.bench_fps import HEIGHT, WIDTH, mouth_landmarks, session
+from core.bench_resolution import eye_landmarks
+from core.eye_strain import EyeStrainDetector
+from core.posture import PostureDetector
+from core.smoothing import LandmarkSmoother
+
+FPS = 30.0
+GOOD = "✅ Good posture"
+
+
+def pose_landmarks(head_offset):
+    """Upright upper body with the nose `head_offset` to the side of the shoulder center."""
+    pts = np.zeros((33, 4))
+    pts[:, 3] = 1.0
+    pts[PostureDetector.NOSE, :2] = (0.5 + head_offset, 0.40)
+    pts[PostureDetector.LEFT_EYE, :2] = (0.47 + head_offset, 0.37)
+    pts[PostureDetector.RIGHT_EYE, :2] = (0.53 + head_offset, 0.37)
+    pts[PostureDetector.LEFT_SHOULDER, :2] = (0.62, 0.60)
+    pts[PostureDetector.RIGHT_SHOULDER, :2] = (0.38, 0.60)
+    return pts
+
+
+def run_posture(noise, smooth, seconds=60.0, change_at=40.0, seed=0):
+    rng = np.random.default_rng(seed)
+    detector = PostureDetector()
+    detector.baseline = detector.calculate_metrics(pose_landmarks(0.0))
+    smoother = LandmarkSmoother()
+    flips = wrong = 0
+    previous = detected_at = None
+    t = np.arange(int(seconds * FPS)) / FPS
+    for ti in t:
+        forward = ti >= change_at
+        pts = pose_landmarks(0.08 if forward else 0.035)
+        pts[:, :2] += rng.normal(0.0, noise, (33, 2))
+        result = FrameResult(pose_landmarks=pts, timestamp=ti)
+        if smooth:
+            smoother(result)
+        verdict = detector.detect_posture(detector.calculate_metrics(result.pose_landmarks))
+        flips += previous is not None and verdict != previous
+        previous = verdict
+        wrong += (verdict == GOOD) == forward
+        if forward and detected_at is None and verdict != GOOD:
+            detected_at = ti
+    return {
+        "flips": flips,
+        "wrong": wrong / len(t),
+        "delay": None if detected_at is None else detected_at - change_at,
+    }
+
+
+def run_blinks(noise, smooth, seconds=120.0, seed=0):
+    t, ear, mar, truth = session(seconds, FPS, seed)
+    rng = np.random.default_rng(seed + 1)
+    detector = EyeStrainDetector()
+    smoother = LandmarkSmoother()
+    for ti, e, m in zip(t, ear, mar):
+        lm = mouth_landmarks(eye_landmarks(e, WIDTH, HEIGHT, rng, noise=noise), m)
+        result = FrameResult(face_landmarks=lm, timestamp=ti)
+        if smooth:
+            smoother(result)
+        detector.process_landmarks(result.face_landmarks, (HEIGHT, WIDTH, 3), ti)
+    return {"blinks_true": len(truth["blinks"]), "blinks_detected": detector.blink_count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alert noise with and without landmark smoothing.")
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.002, 0.005, 0.01],
+                        help="landmark jitter (std, normalized units)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'noise':>6} {'smoothing':<9} {'flips':>6} {'wrong':>7} {'delay':>7} {'blinks':>9}")
+    for noise in args.noise:
+        for smooth in (False, True):
+            p = run_posture(noise, smooth, seed=args.seed)
+            b = run_blinks(noise, smooth, seed=args.seed)
+            delay = "     -" if p["delay"] is None else f"{p['delay']:5.2f}s"
+            print(f"{noise:6.3f} {'on' if smooth else 'off':<9} {p['flips']:6d} {p['wrong']:6.1%} {delay:>7} "
+                  f"{b['blinks_detected']:4d}/{b['blinks_true']:<4d}")
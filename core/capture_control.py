@@ -0,0 +1,168 @@
+"""
+Closed-loop capture control: the inference host tells each camera what to send.
+
+- Every stream has a ladder of capture settings (width, fps, JPEG quality), best first.
+  Eye-strain streams never drop below 15 FPS: blinks last 100-400 ms, so fewer frames
+  miss them. Posture changes over seconds, so posture-only streams go down to 2 FPS.
+- The host measures, per stream, inference and JPEG-decode seconds per frame. It also
+  measures its backlog: how long frames wait for a free inference slot.
+- plan() predicts the host load of every combination one step at a time. While the
+  prediction is over budget it steps down the stream that saves the most, posture
+  streams first. Eye streams are only throttled once every posture stream is at its
+  floor. A growing backlog shrinks the budget and an idle host grows it back, so
+  errors in the cost estimate are corrected by measurement.
+- A stream declared "auto" counts as an eye stream while a face is seen and falls back
+  to the posture ladder after `face_timeout` seconds without one.
+
+Control messages are plain dicts: {"width", "fps", "quality", "profile", "level", "version"}.
+core/cluster.py sends them back with every frame result; StreamClient and the demo's
+simulated devices honour them (apply_control() sets a real camera).
+"""
+import threading
+import time
+
+import cv2
+
+# (width, fps, JPEG quality), best first
+LADDERS = {
+    "eyes": [(640, 30, 80), (640, 24, 75), (480, 20, 70), (480, 15, 65)],
+    "posture": [(640, 15, 75), (480, 10, 70), (320, 5, 60), (320, 3, 55), (256, 2, 50)],
+}
+
+PURPOSES = ("auto", "eyes", "posture")
+
+
+def apply_control(cap, control):
+    """Ask a cv2.VideoCapture for the commanded size and rate (height follows 4:3)."""
+    cap.set(cv2.CAP_PROP_FPS, control["fps"])
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, control["width"])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, control["width"] * 3 // 4)
+
+
+def fit_frame(bgr, control):
+    """Downscale a frame to the commanded width, keeping its aspect ratio (never upscales)."""
+    if control is None or bgr.shape[1] <= control["width"]:
+        return bgr
+    width = control["width"]
+    height = max(2, round(bgr.shape[0] * width / bgr.shape[1]))
+    return cv2.resize(bgr, (width, height), interpolation=cv2.INTER_AREA)
+
+
+class CaptureController:
+    """
+    Per-stream capture settings for one inference host.
+    - capacity: cores available for inference; target: share of them to plan for.
+    - max_backlog: mean wait for an inference slot (seconds) above which the budget shrinks.
+    """
+
+    def __init__(self, capacity=1, target=0.8, max_backlog=0.1, face_timeout=10.0, alpha=0.2):
+        self.capacity = capacity
+        self.target = target
+        self.max_backlog = max_backlog
+        self.face_timeout = face_timeout
+        self.alpha = alpha
+        self.budget = capacity * target
+        self.backlog = 0.0
+        self.predicted = 0.0
+        self.streams = {}
+        self.version = 0
+        self._lock = threading.Lock()  # frames are observed on server threads, plan() runs on another
+
+    def _ema(self, old, new):
+        return new if old is None else (1 - self.alpha) * old + self.alpha * new
+
+    def observe(self, stream, ts, infer_time, decode_time, wait, width, purpose="auto", face_seen=True):
+        """Record one processed frame of `stream` (width = decoded frame width)."""
+        with self._lock:
+            self._observe(stream, ts, infer_time, decode_time, wait, width, purpose, face_seen)
+
+    def _observe(self, stream, ts, infer_time, decode_time, wait, width, purpose, face_seen):
+        s = self.streams.get(stream)
+        if s is None:
+            s = self.streams[stream] = {"purpose": purpose, "level": 0, "infer": None, "decode": None,
+                                        "width": width, "last_face": ts, "frames": 0}
+        s["purpose"] = purpose
+        s["infer"] = self._ema(s["infer"], infer_time)
+        # Decode time scales with pixels, i.e. width squared at a fixed aspect ratio
+        s["decode"] = self._ema(s["decode"], decode_time / max(1, width) ** 2)
+        s["width"] = width
+        s["frames"] += 1
+        if face_seen:
+            s["last_face"] = ts
+        self.backlog = self._ema(self.backlog, wait)
+
+    def forget(self, stream):
+        with self._lock:
+            self.streams.pop(stream, None)
+
+    def profile(self, stream, now=None):
+        s = self.streams[stream]
+        if s["purpose"] != "auto":
+            return s["purpose"]
+        now = time.time() if now is None else now
+        return "eyes" if now - s["last_face"] < self.face_timeout else "posture"
+
+    def _cost(self, s, ladder, level):
+        """Predicted cores used by a stream at a ladder level."""
+        width, fps, _ = ladder[level]
+        return fps * ((s["infer"] or 0.0) + (s["decode"] or 0.0) * width ** 2)
+
+    def plan(self, now=None):
+        """Recompute every stream's level; returns True if any command changed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._plan(now)
+
+    def _plan(self, now):
+        if self.backlog > self.max_backlog:
+            self.budget = max(0.1 * self.capacity, self.budget * 0.85)
+        else:
+            self.budget = min(self.capacity * self.target, self.budget * 1.05)
+
+        ladders = {stream: LADDERS[self.profile(stream, now)] for stream in self.streams}
+        levels = {stream: 0 for stream in self.streams}
+        total = sum(self._cost(self.streams[st], ladders[st], 0) for st in self.streams)
+        while total > self.budget:
+            best = None
+            for stream, s in self.streams.items():
+                ladder, level = ladders[stream], levels[stream]
+                if level + 1 >= len(ladder):
+                    continue
+                saving = self._cost(s, ladder, level) - self._cost(s, ladder, level + 1)
+                # Posture streams give way first; within a profile, the biggest saving wins
+                key = (ladder is LADDERS["posture"], saving)
+                if best is None or key > best[0]:
+                    best = (key, stream, saving)
+            if best is None:
+                break  # everything at its floor: the host needs another node
+            levels[best[1]] += 1
+            total -= best[2]
+
+        changed = False
+        for stream, s in self.streams.items():
+            profile = "eyes" if ladders[stream] is LADDERS["eyes"] else "posture"
+            if s["level"] != levels[stream] or s.get("profile") != profile:
+                s["level"], s["profile"] = levels[stream], profile
+                changed = True
+        if changed:
+            self.version += 1
+        self.predicted = total
+        return changed
+
+    def command(self, stream):
+        with self._lock:
+            return self._command(stream)
+
+    def _command(self, stream):
+        s = self.streams.get(stream)
+        if s is None or "profile" not in s:
+            return None
+        width, fps, quality = LADDERS[s["profile"]][s["level"]]
+        return {"width": width, "fps": fps, "quality": quality, "profile": s["profile"],
+                "level": s["level"], "version": self.version}
+
+    def status(self):
+        with self._lock:
+            return {"budget": round(self.budget, 3), "backlog": round(self.backlog, 4),
+                    "predicted": round(self.predicted, 3),
+                    "streams": {st: self._command(st) for st in self.streams}}
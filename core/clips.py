@@ -0,0 +1,178 @@
+"""
+Alert-triggered clip capture from a compressed in-memory pre-roll.
+
+- The frame loop hands every frame to add(): at most `fps` frames per second are
+  downscaled into a small copy and queued; nothing else happens on the frame loop.
+- A compressor thread JPEG-encodes the queued frames into a ring capped at
+  `max_bytes`, holding the last `pre_seconds` of video.
+- trigger(reason, ts) opens a clip: the pre-roll plus the frames of the next
+  `post_seconds`. Another alert while a clip is open extends it (up to `max_seconds`).
+- A writer thread decodes the closed clip and writes it with cv2.VideoWriter, so file
+  I/O never touches the frame loop. If either queue is full, frames or clips are
+  dropped and counted, never waited for.
+
+Usage:
+    clips = ClipRecorder("clips")
+    clips.add(frame, ts)              # every frame
+    clips.trigger("Possible hunchback detected", ts)
+    clips.close()                     # flushes the open clip
+"""
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from core.metrics import label_value
+
+
+def clip_name(reason, ts):
+    """20261019-101500_possible-hunchback-detected"""
+    slug = re.sub(r"[^a-z0-9]+", "-", label_value(reason).lower()).strip("-")[:40] or "alert"
+    return time.strftime("%Y%m%d-%H%M%S", time.localtime(ts)) + "_" + slug
+
+
+class ClipRecorder:
+    """
+    Bounded JPEG pre-roll ring plus background encoding of alert clips.
+    - Memory is capped by `max_bytes` for the ring and by `max_seconds` per clip; the
+      frame loop only pays for one small resize per recorded frame.
+    - Files go to `directory` as <time>_<reason><ext>, written with `fourcc`.
+    """
+
+    def __init__(self, directory="clips", pre_seconds=5.0, post_seconds=3.0, fps=10.0, width=320,
+                 quality=70, max_bytes=8 * 1024 * 1024, max_seconds=30.0, fourcc="mp4v", ext=".mp4"):
+        self.directory = directory
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.width = width
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.fourcc = fourcc
+        self.ext = ext
+
+        self._lock = threading.Lock()
+        self._ring = deque()       # (ts, jpeg bytes)
+        self._ring_bytes = 0
+        self._clip = None          # {"name", "start", "end", "frames": [(ts, jpeg)]}
+        self._last_add = None
+        self._raw = queue.Queue(maxsize=8)
+        self._clips = queue.Queue(maxsize=4)
+        self.stats = {"frames": 0, "dropped_frames": 0, "clips": 0, "dropped_clips": 0, "failed_clips": 0}
+        self.written = []
+        self._compressor = threading.Thread(target=self._compress_loop, name="clip-compressor", daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, name="clip-writer", daemon=True)
+        self._compressor.start()
+        self._writer.start()
+
+    # --- frame loop ---
+    def add(self, bgr, ts):
+        """Offer a frame; keeps at most `fps` per second. Never blocks."""
+        # 5% slack so a 30 FPS camera gives every third frame at fps=10, not every fourth
+        if self._last_add is not None and ts - self._last_add < 0.95 / self.fps:
+            return
+        self._last_add = ts
+        h, w = bgr.shape[:2]
+        size = (self.width, max(2, round(h * self.width / w)) // 2 * 2)
+        try:
+            self._raw.put_nowait((ts, cv2.resize(bgr, size, interpolation=cv2.INTER_AREA)))
+        except queue.Full:
+            self.stats["dropped_frames"] += 1
+
+    def trigger(self, reason, ts):
+        """Start a clip around `ts`, or extend the open one."""
+        with self._lock:
+            if self._clip is not None:
+                self._clip["end"] = min(ts + self.post_seconds, self._clip["start"] + self.max_seconds)
+                return
+            start = ts - self.pre_seconds
+            self._clip = {"name": clip_name(reason, ts), "start": start, "end": ts + self.post_seconds,
+                          "frames": [f for f in self._ring if f[0] >= start]}
+
+    # --- background ---
+    def _compress_loop(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while True:
+            item = self._raw.get()
+            if item is None:
+                break
+            ts, small = item
+            ok, jpeg = cv2.imencode(".jpg", small, params)
+            if not ok:
+                continue
+            jpeg = jpeg.tobytes()
+            with self._lock:
+                self.stats["frames"] += 1
+                self._ring.append((ts, jpeg))
+                self._ring_bytes += len(jpeg)
+                while self._ring and (self._ring_bytes > self.max_bytes or self._ring[0][0] < ts - self.pre_seconds):
+                    self._ring_bytes -= len(self._ring.popleft()[1])
+                if self._clip is not None:
+                    self._clip["frames"].append((ts, jpeg))
+                    if ts >= self._clip["end"]:
+                        self._close_clip()
+
+    def _close_clip(self):
+        # Called with the lock held
+        clip, self._clip = self._clip, None
+        try:
+            self._clips.put_nowait(clip)
+        except queue.Full:
+            self.stats["dropped_clips"] += 1
+
+    def _write_loop(self):
+        while True:
+            clip = self._clips.get()
+            if clip is None:
+                break
+            try:
+                self.written.append(self._write(clip))
+                self.stats["clips"] += 1
+            except Exception as e:
+                self.stats["failed_clips"] += 1
+                print(f"⚠️ Could not write clip {clip['name']}: {e}")
+
+    def _write(self, clip):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, clip["name"] + self.ext)
+        frames = clip["frames"]
+        # Play back at the rate frames were actually kept (the frame loop may be slower than fps)
+        span = frames[-1][0] - frames[0][0] if frames else 0.0
+        fps = (len(frames) - 1) / span if span > 0 else self.fps
+        writer = None
+        try:
+            for _, jpeg in frames:
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), fps,
+                                             (frame.shape[1], frame.shape[0]))
+                    if not writer.isOpened():
+                        raise OSError(f"VideoWriter could not open {path} with {self.fourcc}")
+                writer.write(frame)
+        finally:
+            if writer is not None:
+                writer.release()
+        print(f"🎬 Clip saved: {path} ({len(frames)} frames)")
+        return path
+
+    def memory(self):
+        """Bytes of JPEG data held in the pre-roll ring and the open clip."""
+        with self._lock:
+            open_bytes = sum(len(j) for _, j in self._clip["frames"]) if self._clip else 0
+            return self._ring_bytes + open_bytes
+
+    def close(self, timeout=10.0):
+        """Write the open clip (cut short) and stop both threads."""
+        self._raw.put(None)
+        self._compressor.join(timeout)
+        with self._lock:
+            if self._clip is not None and self._clip["frames"]:
+                self._close_clip()
+        self._clips.put(None)
+        self._writer.join(timeout)
@@ -0,0 +1,784 @@
+"""
+Multi-node inference cluster: device streams spread over several inference hosts.
+
+- Coordinator: registry of nodes plus a consistent-hash ring (HashRing). A stream is
+  routed to the node that owns its hash, so its detector state stays on one node.
+  Nodes that join, stop sending heartbeats or report overload change the ring, and
+  only the streams on the affected arcs move.
+- InferenceNode: runs a backend + EyeStrainDetector / PostureDetector / SmartAlerts
+  per stream and checkpoints each stream's state (core/snapshot.py) to the
+  coordinator. A node that receives a stream it has not seen claims it from the
+  coordinator before the first frame. The coordinator has the previous owner release
+  the stream and hand over its final state, so a moved stream resumes from its last
+  frame (calibration, blink history and timers), not from an older periodic checkpoint.
+- StreamClient: the device side. Sends JPEG frames to the node from the coordinator's
+  route and re-routes when that node is gone or says the stream moved.
+- Capture control (core/capture_control.py): every frame result carries the width, FPS
+  and JPEG quality the node wants next from that device, planned from the node's
+  measured per-stream cost and backlog. StreamClient applies them.
+
+Everything is HTTP + JSON from the standard library, so local processes can stand in
+for hosts and capacity grows by starting another node.
+
+Usage (from the repository root):
+    python -m core.cluster coordinator --port 9200
+    python -m core.cluster node --coordinator http://127.0.0.1:9200 --port 9201
+    python -m core.cluster stream --coordinator http://127.0.0.1:9200 --stream desk-1 --camera 0
+    python -m core.cluster demo --nodes 3 --streams 9 --video recording.mp4
+"""
+import argparse
+import bisect
+import hashlib
+import http.client
+import json
+import multiprocessing
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from core.capture_control import PURPOSES, CaptureController, apply_control, fit_frame
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+def _quote(stream):
+    """A stream id as one URL path segment (ids may contain spaces, '%', '&' or '/')."""
+    return urllib.parse.quote(stream, safe="")
+
+
+def _request(url, data=None, method=None, headers=None, timeout=5.0):
+    """(status, body bytes); HTTP errors return their status instead of raising."""
+    request = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def _post_json(url, obj, timeout=5.0):
+    status, body = _request(url, json.dumps(obj).encode("utf-8"), headers={"Content-Type": "application/json"},
+                            timeout=timeout)
+    return status, (json.loads(body) if body else None)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to `server.app.handle(method, path, query, headers, body)`."""
+
+    def _dispatch(self, method):
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, payload = self.server.app.handle(method, path, params, self.headers, body)
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream" if isinstance(payload, bytes)
+                         else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(app, host, port):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.app = app
+    threading.Thread(target=server.serve_forever, name=type(app).__name__, daemon=True).start()
+    return server
+
+
+# --------------------------- Consistent hashing ---------------------------
+class HashRing:
+    """
+    Consistent-hash ring with weighted virtual nodes.
+    - Each node gets round(vnodes * weight) points; lowering a node's weight hands a
+      share of its streams to the others and moves nothing else.
+    """
+
+    def __init__(self, weights=None, vnodes=64):
+        self.vnodes = vnodes
+        self.weights = {}
+        self._keys = []
+        self._owners = []
+        for node, weight in (weights or {}).items():
+            self.weights[node] = weight
+        self._build()
+
+    def _build(self):
+        points = sorted((_hash(f"{node}#{i}"), node) for node, weight in self.weights.items()
+                        for i in range(max(1, round(self.vnodes * weight))))
+        self._keys = [p[0] for p in points]
+        self._owners = [p[1] for p in points]
+
+    def set(self, node, weight=1.0):
+        self.weights[node] = weight
+        self._build()
+
+    def remove(self, node):
+        if self.weights.pop(node, None) is not None:
+            self._build()
+
+    def lookup(self, key):
+        if not self._keys:
+            return None
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[i]
+
+
+# --------------------------- Coordinator ---------------------------
+class Coordinator:
+    """
+    Node registry, stream routing and a checkpoint store for stream state.
+    - Nodes heartbeat every second with their load; a node silent for `node_timeout`
+      seconds leaves the ring.
+    - A node whose load stays above `overload` loses ring weight (streams move away);
+      below `underload` it gets weight back. Every ring change bumps `version`.
+    - The state store holds the newest snapshot per stream, so a moved stream resumes.
+    - GET /state/<stream>?node=<name> is a claim. If another live node holds the stream,
+      it is asked to release it first (POST /release/<stream> on that node), and the
+      final snapshot it returns is stored and handed to the claimant.
+
+    HTTP: POST /heartbeat, GET /route?stream=, PUT|GET /state/<stream>, GET /status
+    """
+
+    def __init__(self, node_timeout=3.0, overload=0.9, underload=0.6, min_weight=0.25, vnodes=64):
+        self.node_timeout = node_timeout
+        self.overload = overload
+        self.underload = underload
+        self.min_weight = min_weight
+        self.ring = HashRing(vnodes=vnodes)
+        self.nodes = {}    # name -> {"url", "load", "streams", "seen"}
+        self.states = {}   # stream -> snapshot bytes
+        self.owners = {}   # stream -> node that last claimed it
+        self.version = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _change(self):
+        self.version += 1
+
+    def heartbeat(self, report, now=None):
+        now = time.time() if now is None else now
+        name = report["node"]
+        with self._lock:
+            self.expire(now)
+            node = self.nodes.get(name)
+            if node is None:
+                node = self.nodes[name] = {"url": report["url"], "load": 0.0, "streams": [], "seen": now}
+                self.ring.set(name, 1.0)
+                self._change()
+                print(f"✅ Node {name} joined at {report['url']}")
+            node.update(url=report["url"], load=float(report.get("load", 0.0)),
+                        streams=list(report.get("streams", [])), seen=now)
+            for stream in node["streams"]:
+                # Claims are newer than heartbeats; these only fill in after a coordinator restart
+                if self.owners.get(stream) not in self.nodes:
+                    self.owners[stream] = name
+            weight = self.ring.weights[name]
+            if node["load"] > self.overload and weight > self.min_weight:
+                self.ring.set(name, max(self.min_weight, weight * 0.8))
+                self._change()
+                print(f"⚠️ Node {name} overloaded ({node['load']:.2f}), weight {self.ring.weights[name]:.2f}")
+            elif node["load"] < self.underload and weight < 1.0:
+                self.ring.set(name, min(1.0, weight * 1.25))
+                self._change()
+            return self._table()
+
+    def expire(self, now=None):
+        """Drop nodes that stopped sending heartbeats (called with the lock held)."""
+        now = time.time() if now is None else now
+        for name in [n for n, node in self.nodes.items() if now - node["seen"] > self.node_timeout]:
+            del self.nodes[name]
+            self.ring.remove(name)
+            self._change()
+            print(f"⚠️ Node {name} left (no heartbeat for {self.node_timeout:.0f}s)")
+
+    def _table(self):
+        return {"version": self.version,
+                "nodes": {n: {"url": node["url"], "weight": self.ring.weights[n]} for n, node in self.nodes.items()}}
+
+    def route(self, stream):
+        with self._lock:
+            self.expire()
+            node = self.ring.lookup(stream)
+            if node is None:
+                return None
+            return {"stream": stream, "node": node, "url": self.nodes[node]["url"], "version": self.version}
+
+    def claim(self, stream, node):
+        """Final state of `stream` for `node`, released by its previous owner if that one is alive."""
+        with self._lock:
+            previous = self.owners.get(stream)
+            url = self.nodes[previous]["url"] if previous != node and previous in self.nodes else None
+            self.owners[stream] = node
+        if url is not None:
+            try:
+                status, data = _request(f"{url}/release/{_quote(stream)}", b"", method="POST", timeout=3.0)
+            except OSError:
+                status = None  # the previous owner is gone: its last checkpoint is all there is
+            if status == 200:
+                with self._lock:
+                    self.states[stream] = data
+        with self._lock:
+            return self.states.get(stream)
+
+    def status(self):
+        with self._lock:
+            self.expire()
+            return {"version": self.version, "stored_states": len(self.states),
+                    "nodes": {n: {"url": node["url"], "load": node["load"], "weight": self.ring.weights[n],
+                                  "streams": sorted(node["streams"])} for n, node in self.nodes.items()}}
+
+    def handle(self, method, path, params, headers, body):
+        if method == "POST" and path == "/heartbeat":
+            return 200, self.heartbeat(json.loads(body))
+        if method == "GET" and path == "/route":
+            route = self.route(params.get("stream", ""))
+            return (200, route) if route else (503, {"error": "no inference nodes"})
+        if path.startswith("/state/"):
+            stream = path[len("/state/"):]
+            if method == "PUT":
+                with self._lock:
+                    self.states[stream] = body
+                return 200, {"stream": stream}
+            if "node" in params:
+                data = self.claim(stream, params["node"])
+            else:
+                with self._lock:
+                    data = self.states.get(stream)
+            return (200, data) if data is not None else (404, {"error": "no state"})
+        if method == "GET" and path == "/status":
+            return 200, self.status()
+        return 404, {"error": "not found"}
+
+    def serve(self, port=9200, host="127.0.0.1"):
+        self._server = _serve(self, host, port)
+        print(f"Coordinator at http://{host}:{self._server.server_address[1]}")
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+# --------------------------- Inference node ---------------------------
+class StreamSession:
+    """Backend and detector state for one device stream on a node."""
+
+    def __init__(self, backend_name):
+        from core.alerts import SmartAlerts
+        from core.backends import create_backend
+        from core.eye_strain import EyeStrainDetector
+        from core.posture import PostureDetector
+        from core.smoothing import LandmarkSmoother
+        # One backend and smoother per stream: the models track landmarks from frame to frame
+        self.backend = create_backend(backend_name)
+        self.smoother = LandmarkSmoother()
+        self.eye = EyeStrainDetector()
+        self.posture = PostureDetector()
+        self.alerts = SmartAlerts(now=time.time())
+        self.lock = threading.Lock()
+        self.final = None  # last snapshot, set when the node lets the stream go
+        self.restored_at = None  # saved_at of the snapshot this session resumed from
+        self.face_seen = False
+        self.last_seen = time.time()
+        self.last_checkpoint = 0.0
+
+    def components(self):
+        return {"eye": self.eye, "posture": self.posture, "alerts": self.alerts}
+
+    def process(self, bgr, ts, command=None):
+        import cv2
+        if command == "calibrate":
+            self.eye.start_calibration()
+            self.posture.start_calibration(frames=50)
+        result = self.backend.process(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), ts)
+        self.smoother(result)
+        self.face_seen = result.face_landmarks is not None
+        out = {"ts": ts, "inference_time": result.inference_time, "eye": None, "posture": None,
+               "alert": None, "break_remaining": None}
+        if result.face_landmarks is not None:
+            info, _, _ = self.eye.process_landmarks(result.face_landmarks, bgr.shape, ts)
+            if info is not None:
+                out["eye"] = info
+                out["alert"] = self.alerts.update(info, self.eye.calibrated, ts)
+                out["break_remaining"] = self.alerts.break_remaining(ts)
+        if result.pose_landmarks is not None:
+            metrics = self.posture.calculate_metrics(result.pose_landmarks)
+            if self.posture.calib_mode:
+                self.posture.process_calibration(metrics)
+                out["posture"] = "Calibrating Posture..."
+            elif self.posture.baseline is not None:
+                out["posture"] = self.posture.detect_posture(metrics)
+        return out
+
+    def close(self):
+        self.backend.close()
+
+
+class InferenceNode:
+    """
+    One inference host. Streams are created on first frame and dropped when the ring
+    moves them elsewhere, another node claims them or they go quiet for
+    `stream_timeout` seconds; all paths take a final snapshot first.
+    - load = inference seconds per second over the last few seconds, divided by
+      `capacity` (the cores this node may use). At most `capacity` frames run inference
+      at once; the time frames wait for a slot is the backlog the capture controller
+      steers by.
+
+    HTTP: POST /frame/<stream> (JPEG body; X-Timestamp, X-Route-Version, X-Command, X-Purpose),
+          POST /release/<stream> (from the coordinator), GET /status
+    """
+
+    def __init__(self, name, coordinator, backend="holistic", capacity=None, checkpoint_every=5.0,
+                 stream_timeout=30.0, heartbeat_every=1.0):
+        self.name = name
+        self.coordinator = coordinator.rstrip("/")
+        self.backend_name = backend
+        self.capacity = capacity or os.cpu_count() or 1
+        self.checkpoint_every = checkpoint_every
+        self.stream_timeout = stream_timeout
+        self.heartbeat_every = heartbeat_every
+        self.url = None
+        self.urls = {}  # node name -> URL, from the coordinator's routing table
+        self.sessions = {}
+        self._released = set()  # streams handed to another node; refused until the next routing table
+        self.ring = HashRing()
+        self.version = -1
+        self._busy = deque()  # (end time, inference seconds)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self.capture = CaptureController(self.capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+        self.processed = 0
+        self.restored = 0
+
+    # --- routing ---
+    def owns(self, stream, route_version):
+        """Accept if our ring says so, or if the client's route is newer than our ring."""
+        if stream in self._released:
+            return False
+        owner = self.ring.lookup(stream)
+        return owner is None or owner == self.name or route_version > self.version
+
+    def _apply_table(self, table):
+        if table["version"] == self.version:
+            return
+        self.ring = HashRing({n: node["weight"] for n, node in table["nodes"].items()})
+        self.version = table["version"]
+        self.urls = {n: node["url"] for n, node in table["nodes"].items()}
+        self._released.clear()
+        with self._lock:
+            moved = [s for s in self.sessions if self.ring.lookup(s) != self.name]
+        for stream in moved:
+            self._drop(stream, "moved")
+
+    # --- sessions ---
+    def _session(self, stream):
+        with self._lock:
+            session = self.sessions.get(stream)
+            if session is not None:
+                return session
+            session = self.sessions[stream] = StreamSession(self.backend_name)
+            session.lock.acquire()  # other frames of this stream wait for the restored state
+        try:
+            status, data = _request(f"{self.coordinator}/state/{_quote(stream)}?"
+                                    + urllib.parse.urlencode({"node": self.name}))
+            if status == 200:
+                from core.snapshot import loads, restore
+                try:
+                    snap = loads(data)
+                    restore(snap, **session.components())
+                    session.restored_at = snap["saved_at"]
+                    self.restored += 1
+                    print(f"[{self.name}] resumed stream {stream} from its checkpoint "
+                          f"({time.time() - snap['saved_at']:.1f}s old)")
+                except ValueError as e:
+                    print(f"⚠️ [{self.name}] could not restore {stream}: {e}")
+        finally:
+            session.lock.release()
+        return session
+
+    def _checkpoint(self, stream, session, now, push=True):
+        from core.snapshot import dumps, snapshot
+        data = dumps(snapshot(now, **session.components()))
+        session.last_checkpoint = now
+        if push:
+            try:
+                _request(f"{self.coordinator}/state/{_quote(stream)}", data, method="PUT")
+            except OSError as e:
+                print(f"⚠️ [{self.name}] checkpoint of {stream} failed: {e}")
+        return data
+
+    def _drop(self, stream, why, push=True):
+        """Close a stream after a final snapshot; returns it (None if the stream is not here)."""
+        with self._lock:
+            session = self.sessions.get(stream)
+        if session is None:
+            return None
+        with session.lock:
+            # Waits for a frame in progress; a concurrent drop finds the snapshot already taken
+            if session.final is None:
+                session.final = self._checkpoint(stream, session, time.time(), push)
+                session.close()
+                with self._lock:
+                    if self.sessions.get(stream) is session:
+                        del self.sessions[stream]
+                self.capture.forget(stream)
+                print(f"[{self.name}] released stream {stream} ({why})")
+        return session.final
+
+    def release(self, stream):
+        """The coordinator gives `stream` to another node: hand over its final state."""
+        self._released.add(stream)
+        return self._drop(stream, "claimed by another node", push=False)
+
+    def load(self, now=None, window=3.0):
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._busy and self._busy[0][0] < now - window:
+                self._busy.popleft()
+            busy = sum(d for _, d in self._busy)
+        return busy / window / self.capacity
+
+    def process(self, stream, jpeg, ts, route_version=0, command=None, purpose="auto"):
+        import cv2
+        if not self.owns(stream, route_version):
+            # Push the final checkpoint before telling the client, so the new owner resumes from it
+            self._drop(stream, "moved")
+            owner = self.ring.lookup(stream)
+            return 409, {"error": "stream moved", "node": owner, "url": self.urls.get(owner)}
+        start = time.perf_counter()
+        bgr = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        if bgr is None:
+            return 400, {"error": "not a JPEG frame"}
+        decoded = time.perf_counter()
+        session = self._session(stream)
+        with session.lock:
+            if session.final is not None:
+                return 409, {"error": "stream moved", "node": None, "url": None}  # released meanwhile
+            with self._slots:
+                wait = time.perf_counter() - decoded
+                out = session.process(bgr, ts, command)
+            self.capture.observe(stream, ts, out["inference_time"], decoded - start, wait, bgr.shape[1],
+                                 purpose if purpose in PURPOSES else "auto", session.face_seen)
+            session.last_seen = time.time()
+            if session.last_seen - session.last_checkpoint >= self.checkpoint_every:
+                self._checkpoint(stream, session, session.last_seen)
+        with self._lock:
+            self._busy.append((time.time(), out["inference_time"]))
+            self.processed += 1
+        control = self.capture.command(stream)
+        if control is None:
+            self.capture.plan()  # new stream: give it a command right away
+            control = self.capture.command(stream)
+        out.update(stream=stream, node=self.name, control=control)
+        return 200, out
+
+    def handle(self, method, path, params, headers, body):
+        if method == "POST" and path.startswith("/frame/"):
+            return self.process(path[len("/frame/"):], body, float(headers.get("X-Timestamp") or time.time()),
+                                int(headers.get("X-Route-Version") or 0), headers.get("X-Command"),
+                                headers.get("X-Purpose") or "auto")
+        if method == "POST" and path.startswith("/release/"):
+            data = self.release(path[len("/release/"):])
+            return (200, data) if data is not None else (404, {"error": "stream not here"})
+        if method == "GET" and path == "/status":
+            return 200, {"node": self.name, "load": self.load(), "streams": sorted(self.sessions),
+                         "processed": self.processed, "restored": self.restored, "version": self.version,
+                         "restored_at": {st: sess.restored_at for st, sess in list(self.sessions.items())
+                                         if sess.restored_at is not None},
+                         "capture": self.capture.status()}
+        return 404, {"error": "not found"}
+
+    # --- lifecycle ---
+    def _heartbeat_loop(self):
+        while not self._stop.is_set():
+            now = time.time()
+            for stream in [s for s, sess in list(self.sessions.items()) if now - sess.last_seen > self.stream_timeout]:
+                self._drop(stream, "idle")
+            self.capture.plan(now)
+            try:
+                status, table = _post_json(f"{self.coordinator}/heartbeat",
+                                           {"node": self.name, "url": self.url, "load": self.load(now),
+                                            "streams": sorted(self.sessions)}, timeout=2.0)
+                if status == 200:
+                    self._apply_table(table)
+            except OSError as e:
+                print(f"⚠️ [{self.name}] coordinator unreachable: {e}")
+            self._stop.wait(self.heartbeat_every)
+
+    def serve(self, port=0, host="127.0.0.1"):
+        self._server = _serve(self, host, port)
+        self.url = f"http://{host}:{self._server.server_address[1]}"
+        threading.Thread(target=self._heartbeat_loop, name="heartbeat", daemon=True).start()
+        print(f"Inference node {self.name} at {self.url}")
+        return self.url
+
+    def close(self):
+        self._stop.set()
+        for stream in list(self.sessions):
+            self._drop(stream, "shutdown")
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+# --------------------------- Device side ---------------------------
+class StreamClient:
+    """
+    Sends one device's frames to whichever node owns the stream.
+    - purpose: "eyes", "posture" (posture-only camera) or "auto" (decided by the node).
+    - `control` is the node's latest capture command: frames are downscaled to its width
+      and encoded at its quality; callers pace frames by `interval` and may pass it to
+      apply_control() for a real camera.
+    """
+
+    def __init__(self, coordinator, stream, purpose="auto", quality=80, timeout=5.0):
+        self.coordinator = coordinator.rstrip("/")
+        self.stream = stream
+        self.purpose = purpose
+        self.quality = quality
+        self.timeout = timeout
+        self.route = None
+        self.control = None
+        self.reroutes = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    @property
+    def interval(self):
+        """Seconds between frames the node asked for (None before the first command)."""
+        return 1.0 / self.control["fps"] if self.control else None
+
+    def _reroute(self):
+        status, route = _request(f"{self.coordinator}/route?{urllib.parse.urlencode({'stream': self.stream})}", timeout=self.timeout)
+        self.route = json.loads(route) if status == 200 else None
+        self.reroutes += 1
+        return self.route
+
+    def send(self, bgr, ts=None, command=None, attempts=3):
+        """Result dict from the owning node, or None if no node could take the frame."""
+        import cv2
+        ts = time.time() if ts is None else ts
+        quality = self.control["quality"] if self.control else self.quality
+        ok, jpeg = cv2.imencode(".jpg", fit_frame(bgr, self.control), [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            return None
+        jpeg = jpeg.tobytes()
+        for _ in range(attempts):
+            if self.route is None and self._reroute() is None:
+                time.sleep(0.2)
+                continue
+            headers = {"X-Timestamp": repr(ts), "X-Route-Version": str(self.route["version"]),
+                       "X-Purpose": self.purpose, "Content-Type": "image/jpeg"}
+            if command:
+                headers["X-Command"] = command
+            try:
+                status, body = _request(f"{self.route['url']}/frame/{_quote(self.stream)}", jpeg,
+                                        headers=headers, timeout=self.timeout)
+            except (OSError, http.client.HTTPException):
+                status, body = None, None  # node is gone (maybe mid-reply): ask the coordinator again
+            if status == 200:
+                self.frames_sent += 1
+                self.bytes_sent += len(jpeg)
+                out = json.loads(body)
+                self.control = out.get("control") or self.control
+                return out
+            self.route = None
+        return None
+
+
+# --------------------------- CLI / local demo ---------------------------
+def node_main(name, coordinator, port=0, backend="holistic", capacity=None):
+    node = InferenceNode(name, coordinator, backend, capacity)
+    node.serve(port)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.close()
+
+
+def _read_frames(video, count=60, size=(640, 480)):
+    import cv2
+    cap = cv2.VideoCapture(video)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, size))
+    cap.release()
+    return frames
+
+
+def demo(nodes=3, streams=9, seconds=12.0, fps=5.0, video=0, backend="holistic", port=9200):
+    """
+    Local cluster: a coordinator, `nodes` node processes and `streams` simulated devices
+    (every third one a posture-only camera). Devices start at 640 px and `fps`, then
+    follow the capture commands of whichever node serves them.
+    One node is stopped after a third of the run and a new one joins after two thirds;
+    prints where every stream ran and what each device ended up sending.
+    """
+    coordinator = Coordinator()
+    port = coordinator.serve(port)
+    url = f"http://127.0.0.1:{port}"
+    ctx = multiprocessing.get_context("spawn")
+    procs = {}
+
+    def start(name):
+        procs[name] = ctx.Process(target=node_main, args=(name, url, 0, backend, 1), daemon=True)
+        procs[name].start()
+
+    for i in range(nodes):
+        start(f"node-{i}")
+    frames = _read_frames(video)
+    if not frames:
+        raise SystemExit(f"⚠️ No frames from {video}")
+    while len(coordinator.status()["nodes"]) < nodes:
+        time.sleep(0.2)
+
+    history = {f"desk-{i}": [] for i in range(streams)}
+    clients = {stream: StreamClient(url, stream, purpose="posture" if i % 3 == 2 else "eyes")
+               for i, stream in enumerate(history)}
+    stop = threading.Event()
+
+    def device(stream):
+        client = clients[stream]
+        i = 0
+        while not stop.is_set():
+            sent = time.time()
+            out = client.send(frames[i % len(frames)], command="calibrate" if i == 0 else None)
+            if out is not None and (not history[stream] or history[stream][-1][0] != out["node"]):
+                history[stream].append((out["node"], round(time.time() - start_time, 1)))
+            i += 1
+            stop.wait(max(0.0, (client.interval or 1.0 / fps) - (time.time() - sent)))
+
+    start_time = time.time()
+    threads = [threading.Thread(target=device, args=(s,), daemon=True) for s in history]
+    for t in threads:
+        t.start()
+    time.sleep(seconds / 3)
+    print("⚠️ Stopping node-0")
+    procs["node-0"].terminate()
+    time.sleep(seconds / 3)
+    print(f"✅ Adding node-{nodes}")
+    start(f"node-{nodes}")
+    time.sleep(seconds / 3)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    print("\nStream placement (node, seconds since start):")
+    for stream, moves in history.items():
+        print(f"  {stream}: " + " -> ".join(f"{n} @{t}s" for n, t in moves))
+    print("\nDevice output (commanded width/FPS/quality, frames and kbit/s actually sent):")
+    for stream, client in clients.items():
+        c = client.control or {}
+        print(f"  {stream} [{client.purpose}]: {c.get('width')} px, {c.get('fps')} FPS, q{c.get('quality')} | "
+              f"{client.frames_sent / seconds:.1f} FPS, {client.bytes_sent * 8 / 1000 / seconds:.0f} kbit/s")
+    status = coordinator.status()
+    print(f"\nRing version {status['version']}, {status['stored_states']} stream checkpoints")
+    for name, node in sorted(status["nodes"].items()):
+        print(f"  {name}: load {node['load']:.2f}, weight {node['weight']:.2f}, streams {node['streams']}")
+    for p in procs.values():
+        p.terminate()
+    coordinator.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sticky multi-node inference cluster.")
+    sub = parser.add_subparsers(dest="role", required=True)
+    p = sub.add_parser("coordinator")
+    p.add_argument("--port", type=int, default=9200)
+    p.add_argument("--host", default="127.0.0.1")
+    p = sub.add_parser("node")
+    p.add_argument("--coordinator", required=True)
+    p.add_argument("--name", default=None)
+    p.add_argument("--port", type=int, default=0)
+    p.add_argument("--backend", default="holistic")
+    p.add_argument("--capacity", type=int, default=None, help="cores this node may use (default: all)")
+    p = sub.add_parser("stream")
+    p.add_argument("--coordinator", required=True)
+    p.add_argument("--stream", required=True)
+    p.add_argument("--camera", default="0", help="camera index or a video file")
+    p.add_argument("--purpose", choices=PURPOSES, default="auto",
+                   help="posture: throttled hard when the host is busy; eyes: kept at 15+ FPS")
+    p.add_argument("--fps", type=float, default=15.0, help="frame rate until the node sends a command")
+    p = sub.add_parser("demo")
+    p.add_argument("--nodes", type=int, default=3)
+    p.add_argument("--streams", type=int, default=9)
+    p.add_argument("--seconds", type=float, default=12.0)
+    p.add_argument("--fps", type=float, default=5.0)
+    p.add_argument("--video", default="0", help="frames for every simulated device")
+    p.add_argument("--backend", default="holistic")
+    p.add_argument("--port", type=int, default=9200)
+    args = parser.parse_args()
+
+    if args.role == "coordinator":
+        Coordinator().serve(args.port, args.host)
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+    elif args.role == "node":
+        node_main(args.name or f"node-{os.getpid()}", args.coordinator, args.port, args.backend, args.capacity)
+    elif args.role == "stream":
+        import cv2
+        cap = cv2.VideoCapture(int(args.camera) if args.camera.isdigit() else args.camera)
+        client = StreamClient(args.coordinator, args.stream, purpose=args.purpose)
+        print("Sending frames; the first frame starts calibration. Ctrl+C to stop.")
+        first = True
+        applied = None
+        try:
+            while True:
+                sent = time.time()
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out = client.send(frame, command="calibrate" if first else None)
+                first = False
+                if out is not None:
+                    eye = out["eye"]["status"] if out["eye"] else "no face"
+                    print(f"[{out['node']}] {eye} | {out['posture'] or 'no pose'}"
+                          + (f" | ALERT: {out['alert']}" if out["alert"] else ""))
+                control = client.control
+                if control is not None and (control["width"], control["fps"]) != applied:
+                    apply_control(cap, control)
+                    applied = (control["width"], control["fps"])
+                    print(f"Capture set to {control['width']} px at {control['fps']} FPS ({control['profile']})")
+                time.sleep(max(0.0, (client.interval or 1.0 / args.fps) - (time.time() - sent)))
+        except KeyboardInterrupt:
+            pass
+        cap.release()
+    else:
+        demo(args.nodes, args.streams, args.seconds, args.fps,
+             int(args.video) if args.video.isdigit() else args.video, args.backend, args.port)
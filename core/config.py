@@ -0,0 +1,224 @@
+"""
+Runtime configuration: detector, alert and model settings in one JSON file, hot-reloaded.
+
+- Sections:
+  - "eye": EyeStrainDetector parameters.
+  - "alerts": SmartAlerts limits.
+  - "posture", "side_posture", "face_posture": the detect_posture() thresholds of each
+    posture detector (their LIMITS).
+  - "model": backend keyword arguments such as model_complexity or
+    refine_face_landmarks.
+- A file only needs the settings it changes. Everything else keeps the defaults below,
+  which are taken from the constructors, so the two cannot drift apart.
+- ConfigWatcher.poll() checks the file's modification time at most once per `interval`
+  from the frame loop. It returns the sections that changed. A file that does not
+  parse or validate is reported and ignored, and the running settings stay in force.
+- apply_config() changes detectors and alerts in place with configure(). Calibration,
+  blink history and timers are kept. Only a change in the active backend's
+  keyword arguments (backend_kwargs()) needs a new model. rebuild_backend() builds it
+  before closing the old one, and keeps the old one if the new settings fail.
+
+Usage (from the repository root):
+    python -m core.config --write config.json   # all defaults, ready to edit
+    python -m core.config config.json           # validate, show non-default settings
+"""
+import argparse
+import copy
+import inspect
+import json
+import os
+import time
+
+from core.alerts import SmartAlerts
+from core.backends import BACKENDS
+from core.eye_strain import EyeStrainDetector
+from core.posture import FacePostureDetector, PostureDetector, SidePostureDetector
+
+
+def _constructor_defaults(cls, skip=()):
+    return {name: p.default for name, p in inspect.signature(cls.__init__).parameters.items()
+            if name != "self" and name not in skip and p.default is not inspect.Parameter.empty}
+
+
+DEFAULTS = {
+    "eye": _constructor_defaults(EyeStrainDetector),
+    "alerts": _constructor_defaults(SmartAlerts, skip=("now",)),
+    PostureDetector.CONFIG_SECTION: dict(PostureDetector.LIMITS),
+    SidePostureDetector.CONFIG_SECTION: dict(SidePostureDetector.LIMITS),
+    FacePostureDetector.CONFIG_SECTION: dict(FacePostureDetector.LIMITS),
+    "model": {},  # empty: each backend's own defaults
+}
+
+# Keyword arguments any backend accepts, with the default of the first backend that has it
+MODEL_PARAMS = {}
+for _cls in BACKENDS.values():
+    for _name, _default in _constructor_defaults(_cls).items():
+        MODEL_PARAMS.setdefault(_name, _default)
+
+
+# Allowed (min, max) of model settings; values outside fail in the model constructor
+MODEL_RANGES = {
+    "model_complexity": (0, 2),
+    "min_detection_confidence": (0.0, 1.0),
+    "min_tracking_confidence": (0.0, 1.0),
+}
+
+
+def default_config():
+    return copy.deepcopy(DEFAULTS)
+
+
+def _check_value(section, key, value, default):
+    number = isinstance(value, (int, float)) and not isinstance(value, bool)
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif default is None:
+        ok = value is None or number
+    elif isinstance(default, (int, float)):
+        ok = number
+    else:
+        ok = isinstance(value, type(default))
+    if not ok:
+        raise ValueError(f"{section}.{key} must be like {default!r}, got {value!r}")
+    if section == "model" and key in MODEL_RANGES:
+        low, high = MODEL_RANGES[key]
+        if isinstance(low, int) and value != int(value):
+            raise ValueError(f"{section}.{key} must be a whole number, got {value!r}")
+        if not low <= value <= high:
+            raise ValueError(f"{section}.{key} must be between {low} and {high}, got {value!r}")
+
+
+def validate(config):
+    """Full config (defaults + `config`); ValueError on an unknown key or a wrong type."""
+    if not isinstance(config, dict):
+        raise ValueError("Config must be a JSON object of sections")
+    merged = default_config()
+    for section, values in config.items():
+        if section not in DEFAULTS:
+            raise ValueError(f"Unknown config section '{section}' (known: {', '.join(DEFAULTS)})")
+        if not isinstance(values, dict):
+            raise ValueError(f"Config section '{section}' must be an object")
+        known = MODEL_PARAMS if section == "model" else DEFAULTS[section]
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown setting {section}.{key} (known: {', '.join(known)})")
+            _check_value(section, key, value, known[key])
+            merged[section][key] = value
+    return merged
+
+
+def load_config(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return validate(json.load(f))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}")
+
+
+def changed_sections(old, new):
+    return {section for section in new if old.get(section) != new[section]}
+
+
+def backend_kwargs(name, config):
+    """The "model" settings the backend `name` accepts (others are for other backends)."""
+    accepted = inspect.signature(BACKENDS[name].__init__).parameters
+    return {key: value for key, value in config["model"].items() if key in accepted}
+
+
+def rebuild_backend(backend, name, kwargs, config):
+    """
+    (backend, kwargs) for the reloaded `config`: a new backend if its model settings
+    changed. The new one is built before the old one is closed; if it fails, the
+    running backend and its settings are kept.
+    """
+    from core.backends import create_backend
+    new_kwargs = backend_kwargs(name, config)
+    if new_kwargs == kwargs:
+        return backend, kwargs
+    try:
+        new_backend = create_backend(name, **new_kwargs)
+    except Exception as e:
+        print(f"⚠️ Keeping the running '{name}' model, {new_kwargs} failed: {e}")
+        return backend, kwargs
+    backend.close()
+    print(f"✅ Rebuilt the '{name}' backend with {new_kwargs}")
+    return new_backend, new_kwargs
+
+
+def apply_config(config, sections=None, eye=None, posture=None, alerts=None):
+    """configure() each given component whose section is in `sections` (default: all)."""
+    sections = set(DEFAULTS) if sections is None else sections
+    if eye is not None and "eye" in sections:
+        eye.configure(**config["eye"])
+    if posture is not None and posture.CONFIG_SECTION in sections:
+        posture.configure(**config[posture.CONFIG_SECTION])
+    if alerts is not None and "alerts" in sections:
+        alerts.configure(**config["alerts"])
+
+
+class ConfigWatcher:
+    """
+    Hot reload of a config file.
+    - The file is loaded (and must be valid) at construction.
+    - poll() costs one os.stat per `interval` seconds; after a change it reloads and
+      returns the changed section names (an empty set otherwise).
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.config = load_config(path)
+        self._stamp = self._stat()
+        self._next_check = 0.0
+        self.reloads = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def poll(self, now=None):
+        now = time.time() if now is None else now
+        if now < self._next_check:
+            return set()
+        self._next_check = now + self.interval
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return set()
+        self._stamp = stamp  # a bad file is reported once, not on every poll
+        try:
+            config = load_config(self.path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Keeping current settings, {self.path} was not applied: {e}")
+            return set()
+        changed = changed_sections(self.config, config)
+        self.config = config
+        if changed:
+            self.reloads += 1
+            print(f"✅ Reloaded {self.path}: {', '.join(sorted(changed))}")
+        return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write or check a monitor config file.")
+    parser.add_argument("path")
+    parser.add_argument("--write", action="store_true", help="write the defaults to PATH")
+    args = parser.parse_args()
+
+    if args.write:
+        config = default_config()  # "model" stays empty: defaults differ per backend
+        with open(args.path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        print(f"✅ Defaults written to {args.path}")
+    else:
+        try:
+            config = load_config(args.path)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"⚠️ {e}")
+        print(f"✅ {args.path} is valid")
+        for section, values in config.items():
+            for key, value in values.items():
+                if value != DEFAULTS[section].get(key, MODEL_PARAMS.get(key)):
+                    print(f"  {section}.{key} = {value!r}")
@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+
+# Same topology as mediapipe.solutions.pose.POSE_CONNECTIONS
+POSE_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+]
+
+
+# Head, shoulders and hips: the points PostureDetector / SidePostureDetector measure
+POSTURE_POINTS = set(range(13)) | {23, 24}
+POSTURE_CONNECTIONS = [(a, b) for a, b in POSE_CONNECTIONS if a in POSTURE_POINTS and b in POSTURE_POINTS]
+
+_edge_cache = {}
+
+
+def _edges(connections):
+    """(endpoint index array (E, 2), point index array) for a connection list, cached per list."""
+    key = id(connections)
+    cached = _edge_cache.get(key)
+    if cached is None or cached[0] is not connections:
+        edges = np.asarray(connections, dtype=np.intp).reshape(-1, 2)
+        cached = _edge_cache[key] = (connections, edges, np.unique(edges))
+    return cached[1], cached[2]
+
+
+def draw_pose(frame, pose_landmarks, connections=POSE_CONNECTIONS,
+              point_color=(0, 255, 255), line_color=(0, 150, 255),
+              thickness=2, radius=2, min_visibility=0.5):
+    """
+    Draw a pose skeleton from an (N, 4) landmark array, like mp_drawing.draw_landmarks.
+    - Landmarks are converted to pixels once; all bones are one cv2.polylines call and
+      all joints a second one (zero-length segments drawn as round dots).
+    - Pass connections=POSTURE_CONNECTIONS to draw only what the posture metrics use.
+    """
+    if pose_landmarks is None:
+        return
+    h, w = frame.shape[:2]
+    pts = pose_landmarks
+    edges, points = _edges(connections)
+    px = (pts[:, :2] * (w, h)).astype(np.int32)
+    visible = pts[:, 3] >= min_visibility if pts.shape[1] > 3 else np.ones(len(pts), dtype=bool)
+
+    bones = px[edges[visible[edges].all(axis=1)]]
+    if len(bones):
+        cv2.polylines(frame, bones, isClosed=False, color=line_color, thickness=thickness)
+    joints = px[points[visible[points]]]
+    if len(joints):
+        cv2.polylines(frame, np.repeat(joints[:, None], 2, axis=1), isClosed=False,
+                      color=point_color, thickness=2 * radius + thickness)
+
+
+def draw_eye_contours(frame, left_pts, right_pts, color=(0, 255, 0)):
+    """Both eye contours in one cv2.polylines call."""
+    if len(left_pts) == 0 or len(right_pts) == 0:
+        return
+    try:
+        contours = np.asarray([left_pts, right_pts], dtype=np.int32)
+    except ValueError:
+        return  # malformed points: skip the overlay for this frame
+    cv2.polylines(frame, contours, isClosed=True, color=color, thickness=1)
@@ -0,0 +1,294 @@
+import numpy as np
+import time
+from collections import deque
+
+from core.landmarks import as_array
+from core.snapshot import export_fields, import_fields
+
+
+class EyeStrainDetector:
+    """
+    Shared eye strain calculator used by every backend.
+    - Does NOT run its own MediaPipe model.
+    - Receives face landmarks (478-point FaceMesh layout) from any backend.
+    - Performs calculations (EAR, MAR, blinks, drowsiness, yawns) on those landmarks.
+    - All timing uses the frame's capture timestamp, EAR smoothing is a time-constant
+      filter and threshold crossings are interpolated between frames, so decisions
+      do not depend on the frame rate.
+    """
+
+    # FaceMesh landmark indices (MediaPipe)
+    LEFT_EYE_IDX = [33, 160, 158, 133, 153, 144]
+    RIGHT_EYE_IDX = [362, 385, 387, 263, 373, 380]
+    # approximate mouth indices for MAR (inner upper, inner lower, left corner, right corner)
+    MOUTH_TOP = 13
+    MOUTH_BOTTOM = 14
+    MOUTH_LEFT = 78
+    MOUTH_RIGHT = 308
+
+    # Per-person state saved by get_state(); everything else is configuration
+    STATE_FIELDS = ("_ear_filtered", "_ear_time", "_prev_ear", "_prev_mar", "blink_timestamps", "blink_count",
+                    "_closed", "_closure_start_time", "_last_blink_time", "_drowsy_start",
+                    "calib_mode", "calib_values", "calibrated", "baseline_ear", "blink_threshold",
+                    "drowsy_threshold", "_yawn_start")
+    # Constructor parameters, changeable at runtime with configure()
+    PARAMS = ("ear_smoothing", "ear_threshold_default", "consec_frames_for_blink", "blink_window_seconds",
+              "drowsy_time_seconds", "ear_calib_frames", "mar_threshold", "yawn_time_seconds",
+              "ear_tau_seconds", "max_gap_seconds")
+
+    def __init__(self,
+                 ear_smoothing=5,
+                 ear_threshold_default=0.21,
+                 consec_frames_for_blink=2,
+                 blink_window_seconds=60,
+                 drowsy_time_seconds=0.8,
+                 ear_calib_frames=60,
+                 mar_threshold=0.65,
+                 yawn_time_seconds=0.6,
+                 ear_tau_seconds=None,
+                 max_gap_seconds=0.5):
+        self.params = {}
+        self.configure(ear_smoothing=ear_smoothing, ear_threshold_default=ear_threshold_default,
+                       consec_frames_for_blink=consec_frames_for_blink, blink_window_seconds=blink_window_seconds,
+                       drowsy_time_seconds=drowsy_time_seconds, ear_calib_frames=ear_calib_frames,
+                       mar_threshold=mar_threshold, yawn_time_seconds=yawn_time_seconds,
+                       ear_tau_seconds=ear_tau_seconds, max_gap_seconds=max_gap_seconds)
+        self.reset()
+
+    def configure(self, **params):
+        """
+        Change constructor parameters in place (core/config.py hot reload).
+        Calibration, blink history and state machines are kept; an uncalibrated
+        detector picks up a new default threshold right away.
+        """
+        unknown = set(params) - set(self.PARAMS)
+        if unknown:
+            raise TypeError(f"EyeStrainDetector has no parameter(s): {', '.join(sorted(unknown))}")
+        self.params.update(params)
+        p = self.params
+
+        self.ear_smoothing = p["ear_smoothing"]
+        # EAR low-pass time constant; by default it matches the delay of an
+        # `ear_smoothing`-frame moving average at 30 FPS.
+        self.ear_tau = p["ear_tau_seconds"] if p["ear_tau_seconds"] is not None else \
+            max(0.0, (self.ear_smoothing - 1) / 2.0 / 30.0)
+        # Gaps longer than this (face lost, dropped frames) restart the filter
+        self.max_gap = p["max_gap_seconds"]
+        self.EAR_THRESHOLD_DEFAULT = p["ear_threshold_default"]
+        self.CONSEC_FRAMES = p["consec_frames_for_blink"]
+        self.blink_window_seconds = p["blink_window_seconds"]
+        self.drowsy_time_seconds = p["drowsy_time_seconds"]
+        self.ear_calib_frames = p["ear_calib_frames"]
+        self.MAR_THRESHOLD = p["mar_threshold"]
+        self.YAWN_TIME = p["yawn_time_seconds"]
+
+        if getattr(self, "calibrated", True) is False:
+            self.blink_threshold = self.EAR_THRESHOLD_DEFAULT
+            self.drowsy_threshold = self.EAR_THRESHOLD_DEFAULT * 0.5
+
+    def reset(self):
+        """Clear all per-person state (rates, state machines, calibration); parameters are kept."""
+        # State
+        self._ear_filtered = None
+        self._ear_time = None
+        self._prev_ear = None  # (timestamp, smoothed EAR) of the previous frame
+        self._prev_mar = None  # (timestamp, MAR) of the previous frame
+        self.blink_timestamps = deque()
+        self.blink_count = 0
+
+        # For blink detection (state machine)
+        self._closed = False
+        self._closure_start_time = None
+        self._last_blink_time = None
+        self._drowsy_start = None
+
+        # Calibration
+        self.calib_mode = False
+        self.calib_values = []
+        self.calibrated = False
+        self.baseline_ear = None
+        self.blink_threshold = self.EAR_THRESHOLD_DEFAULT
+        self.drowsy_threshold = self.EAR_THRESHOLD_DEFAULT * 0.5
+
+        # Yawn state
+        self._yawn_start = None
+
+    def get_state(self):
+        """Per-person state as plain JSON types (see core/snapshot.py)."""
+        return export_fields(self, self.STATE_FIELDS)
+
+    def set_state(self, state):
+        """Restore get_state() output; fields missing from `state` keep their reset() value."""
+        self.reset()
+        import_fields(self, state, self.STATE_FIELDS)
+
+    def start_calibration(self):
+        """Begin calibration — collect ear samples for ear_calib_frames frames"""
+        self.calib_mode = True
+        self.calib_values = []
+        print("Eye calibration started... please look at the camera with eyes open.")
+
+    def _to_pixels(self, landmarks, indices, image_shape):
+        """
+        Float pixel coordinates for the given landmarks.
+        Normalized x and y are relative to different frame sides, so scaling by (w, h)
+        corrects the aspect ratio. No rounding: at low resolutions the eye is only a
+        few pixels tall and int() quantization would swamp the blink signal.
+        """
+        pts = as_array(landmarks)
+        return pts[indices, :2] * (image_shape[1], image_shape[0])
+
+    def calculate_EAR(self, landmarks, eye_indices, image_shape):
+        # EAR is a ratio of distances, so it is independent of the frame resolution
+        # and the same thresholds hold at 320x240 and at 1280x720.
+        coords = self._to_pixels(landmarks, eye_indices, image_shape)
+        # vertical 1, vertical 2, horizontal
+        A, B, C = np.linalg.norm(coords[[1, 2, 0]] - coords[[5, 4, 3]], axis=1)
+        if C == 0:
+            return 0.0, coords
+        EAR = (A + B) / (2.0 * C)
+        return float(EAR), coords
+
+    def calculate_MAR(self, landmarks, image_shape):
+        # Compute simple mouth aspect ratio using top/bottom inner lip and left/right corners
+        try:
+            idx = [self.MOUTH_TOP, self.MOUTH_BOTTOM, self.MOUTH_LEFT, self.MOUTH_RIGHT]
+            top_pt, bottom_pt, left_pt, right_pt = self._to_pixels(landmarks, idx, image_shape)
+            ver = np.linalg.norm(top_pt - bottom_pt)
+            hor = np.linalg.norm(left_pt - right_pt)
+            if hor == 0:
+                return 0.0
+            MAR = ver / hor
+            return float(MAR)
+        except Exception:
+            return 0.0
+
+    def _register_blink(self, when):
+        self.blink_timestamps.append(when)
+        self.blink_count += 1
+
+    def _blink_rate(self, now):
+        # Drop blinks that left the window, so the rate also decays while no blinks happen
+        cutoff = now - self.blink_window_seconds
+        while self.blink_timestamps and self.blink_timestamps[0] < cutoff:
+            self.blink_timestamps.popleft()
+        window_count = len(self.blink_timestamps)
+        return (window_count / max(1, self.blink_window_seconds)) * 60.0
+
+    def _smooth_ear(self, ear, now):
+        """Exponential low-pass with time constant ear_tau, weighted by the real frame interval."""
+        if self._ear_filtered is None or now - self._ear_time > self.max_gap or self.ear_tau <= 0:
+            self._ear_filtered = ear
+        else:
+            alpha = 1.0 - np.exp(-max(0.0, now - self._ear_time) / self.ear_tau)
+            self._ear_filtered += alpha * (ear - self._ear_filtered)
+        self._ear_time = now
+        return float(self._ear_filtered)
+
+    def _crossing_time(self, prev, value, now, threshold):
+        """Time at which the signal crossed `threshold`, interpolated from the previous frame."""
+        if prev is None:
+            return now
+        t0, v0 = prev
+        if v0 == value or now - t0 > self.max_gap:
+            return now
+        frac = min(max((threshold - v0) / (value - v0), 0.0), 1.0)
+        return t0 + frac * (now - t0)
+
+    def process_landmarks(self, landmarks, image_shape, timestamp=None):
+        """
+        Takes face landmarks from a backend and performs calculations.
+        Does not run its own model or draw on the frame.
+        `timestamp` is the capture time of the frame (defaults to now).
+        Returns (info, left_pts, right_pts); info is None if the landmarks are unusable.
+        """
+        now = time.time() if timestamp is None else timestamp
+        try:
+            landmarks = as_array(landmarks)
+            left_ear, left_pts = self.calculate_EAR(landmarks, self.LEFT_EYE_IDX, image_shape)
+            right_ear, right_pts = self.calculate_EAR(landmarks, self.RIGHT_EYE_IDX, image_shape)
+            avg_ear_raw = (left_ear + right_ear) / 2.0
+        except Exception as e:
+            # print(f"Error calculating EAR: {e}")
+            return None, [], []
+
+        # --- Calibration ---
+        if self.calib_mode:
+            self.calib_values.append(avg_ear_raw)
+            if len(self.calib_values) >= self.ear_calib_frames:
+                self.baseline_ear = float(np.mean(self.calib_values))
+                self.blink_threshold = max(0.12, self.baseline_ear * 0.75)
+                self.drowsy_threshold = max(0.08, self.baseline_ear * 0.45)
+                self.calibrated = True
+                self.calib_mode = False
+                self._ear_filtered = None
+                print(f"Eye calibration complete. baseline EAR={self.baseline_ear:.3f}, blink_thr={self.blink_threshold:.3f}, drowsy_thr={self.drowsy_threshold:.3f}")
+
+        avg_ear = self._smooth_ear(avg_ear_raw, now)
+
+        # Thresholds
+        thr = self.blink_threshold if self.calibrated else self.EAR_THRESHOLD_DEFAULT
+        drowsy_thr = self.drowsy_threshold if self.calibrated else (self.EAR_THRESHOLD_DEFAULT * 0.5)
+
+        # --- Blink State Machine ---
+        # Closure start/end are the interpolated threshold crossings, not the frame times
+        if avg_ear < thr:
+            if not self._closed:
+                self._closed = True
+                self._closure_start_time = self._crossing_time(self._prev_ear, avg_ear, now, thr)
+        else:
+            if self._closed:
+                end = self._crossing_time(self._prev_ear, avg_ear, now, thr)
+                duration = end - (self._closure_start_time or end)
+                # typical blink duration is between ~0.05s and 0.4s; adjust as needed
+                if 0.03 <= duration <= 0.6:
+                    self._register_blink(end)
+                    self._last_blink_time = end
+                self._closed = False
+                self._closure_start_time = None
+
+        # --- Drowsiness ---
+        if avg_ear < drowsy_thr:
+            if self._drowsy_start is None:
+                self._drowsy_start = self._crossing_time(self._prev_ear, avg_ear, now, drowsy_thr)
+            closure_duration = now - self._drowsy_start
+        else:
+            self._drowsy_start = None
+            closure_duration = 0.0
+        self._prev_ear = (now, avg_ear)
+
+        # --- Yawn Detection ---
+        mar = self.calculate_MAR(landmarks, image_shape)
+        yawned = False
+        if mar > self.MAR_THRESHOLD:
+            if self._yawn_start is None:
+                self._yawn_start = self._crossing_time(self._prev_mar, mar, now, self.MAR_THRESHOLD)
+            if (now - self._yawn_start) >= self.YAWN_TIME:
+                yawned = True
+        else:
+            self._yawn_start = None
+        self._prev_mar = (now, mar)
+
+        # --- Status ---
+        blink_rate = self._blink_rate(now)
+        status = "✅ Eyes Normal"
+        color = (0, 255, 0)
+        if closure_duration >= self.drowsy_time_seconds:
+            status = "⚠️ You're getting drowsy"
+            color = (0, 0, 255)
+        elif blink_rate < 10 and self.calibrated: # Only show strain if calibrated
+            status = "⚠️ Low Blink Rate"
+            color = (0, 165, 255) # Orange
+
+        # --- Return all info ---
+        info = {
+            "avg_ear": avg_ear,
+            "blink_rate": blink_rate,
+            "blink_count": self.blink_count,
+            "status": status,
+            "color": color,
+            "yawn": yawned,
+            "closure_duration": closure_duration
+        }
+
+        return info, left_pts, right_pts
@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+
+
+class FrameBuffers:
+    """
+    Reusable buffers for one capture loop, so steady-state frames allocate nothing.
+    - read(cap) decodes into the same BGR buffer every frame (cap.read(frame)).
+    - to_rgb() converts into a preallocated RGB buffer (cvtColor dst=) and marks it
+      read-only, so MediaPipe takes it by reference instead of copying.
+    - overlay(name) copies the BGR frame into a named, preallocated buffer for drawing.
+    Buffers are reallocated only when the frame size changes. Every buffer is
+    overwritten on the next frame: copy anything that must outlive the iteration.
+    """
+
+    def __init__(self):
+        self.bgr = None
+        self.rgb = None
+        self._overlays = {}
+
+    def read(self, cap):
+        ret, frame = cap.read(self.bgr) if self.bgr is not None else cap.read()
+        if not ret:
+            return False, None
+        if frame is not self.bgr:
+            # First frame or the size changed: OpenCV allocated a new buffer
+            self.bgr = frame
+            self.rgb = np.empty_like(frame)
+            self._overlays = {}
+        return True, frame
+
+    def to_rgb(self):
+        self.rgb.flags.writeable = True
+        cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        self.rgb.flags.writeable = False
+        return self.rgb
+
+    def overlay(self, name):
+        buf = self._overlays.get(name)
+        if buf is None:
+            buf = self._overlays[name] = np.empty_like(self.bgr)
+        np.copyto(buf, self.bgr)
+        return buf
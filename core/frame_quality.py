@@ -0,0 +1,99 @@
+import zlib
+
+import cv2
+import numpy as np
+
+
+class FrameQualityGate:
+    """
+    Cheap pre-inference check that keeps unusable frames away from the detectors.
+    - Works on a small grayscale copy (`size`), so it costs well under a millisecond.
+    - "dark" / "bright": mean luminance outside [min_brightness, max_brightness].
+    - "flat":      almost no contrast (covered lens, camera still adjusting exposure).
+    - "blurred":   Laplacian variance below `blur_ratio` times its running average on
+                   accepted frames (motion blur), or below `min_sharpness`. Motion blur
+                   lasts a fraction of a second; after `rebaseline_after` blurred frames in
+                   a row the scene itself has changed (camera moved, lighting), so the
+                   average is rebuilt from the current frames.
+    - "duplicate": same CRC32 of the small copy as the previous frame. Many webcams
+                   ignore CAP_PROP_FPS and hand back repeated frames.
+    check() returns None for a usable frame, else the reason; counts are kept per reason.
+    """
+
+    REASONS = ("dark", "bright", "flat", "blurred", "duplicate")
+
+    def __init__(self, min_brightness=35, max_brightness=235, min_contrast=8.0, min_sharpness=5.0,
+                 blur_ratio=0.35, warmup=15, rebaseline_after=30, size=(160, 120)):
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.min_contrast = min_contrast
+        self.min_sharpness = min_sharpness
+        self.blur_ratio = blur_ratio
+        self.warmup = warmup
+        self.rebaseline_after = rebaseline_after
+        self.size = size
+        self._small = np.empty((size[1], size[0], 3), np.uint8)
+        self._gray = np.empty((size[1], size[0]), np.uint8)
+        self._lap = np.empty((size[1], size[0]), np.float32)
+        self.reset()
+
+    def reset(self):
+        self.counts = {reason: 0 for reason in self.REASONS}
+        self.checked = 0
+        self._prev_hash = None
+        self._sharpness_avg = None
+        self._accepted = 0
+        self._blurred_run = 0
+        self.rebaselines = 0
+        self.last = {}
+
+    def check(self, bgr):
+        """None if the frame is worth running inference on, else the reason it is not."""
+        self.checked += 1
+        cv2.resize(bgr, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        frame_hash = zlib.crc32(self._gray)
+        duplicate = frame_hash == self._prev_hash
+        self._prev_hash = frame_hash
+        if duplicate:
+            return self._reject("duplicate")
+
+        mean, std = cv2.meanStdDev(self._gray)
+        cv2.Laplacian(self._gray, cv2.CV_32F, dst=self._lap)
+        sharpness = float(self._lap.var())
+        self.last = {"brightness": float(mean[0, 0]), "contrast": float(std[0, 0]), "sharpness": sharpness}
+
+        if self.last["brightness"] < self.min_brightness:
+            return self._reject("dark")
+        if self.last["brightness"] > self.max_brightness:
+            return self._reject("bright")
+        if self.last["contrast"] < self.min_contrast:
+            return self._reject("flat")
+        if sharpness < self.min_sharpness:
+            return self._reject("blurred")
+        if self._accepted >= self.warmup and sharpness < self.blur_ratio * self._sharpness_avg:
+            self._blurred_run += 1
+            if self._blurred_run < self.rebaseline_after:
+                return self._reject("blurred")
+            # Blurred for too long to be motion: this is the new scene, warm up on it again
+            self._sharpness_avg = None
+            self._accepted = 0
+            self.rebaselines += 1
+        self._blurred_run = 0
+
+        # Running average over accepted frames only, so a burst of blur does not lower the bar
+        self._accepted += 1
+        alpha = max(0.05, 1.0 / self._accepted)
+        self._sharpness_avg = sharpness if self._sharpness_avg is None else \
+            (1 - alpha) * self._sharpness_avg + alpha * sharpness
+        return None
+
+    def _reject(self, reason):
+        self.counts[reason] += 1
+        return reason
+
+    def summary(self):
+        skipped = sum(self.counts.values())
+        parts = ", ".join(f"{reason} {n}" for reason, n in self.counts.items() if n)
+        return f"Frame quality: {skipped}/{self.checked} frames skipped" + (f" ({parts})" if parts else "")
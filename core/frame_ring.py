@@ -0,0 +1,79 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class FrameRing:
+    """
+    Fixed-size ring of BGR frames in shared memory: one writer process, any number of readers.
+    - The writer decodes straight into a slot (begin_write / commit), then publishes
+      the slot's sequence number and capture timestamp.
+    - Readers take the newest sequence number and check it again after using the
+      slot (seqlock), so a frame overwritten while it was read is detected and skipped.
+    - Other processes attach with spec(): only (shape, slots, name) is pickled, never frames.
+    """
+
+    def __init__(self, shape, slots=8, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self._owner = name is None
+        frame_bytes = int(np.prod(self.shape))
+        # Header after the frames, 8-byte aligned: sequence numbers, timestamps, latest sequence
+        offset = (slots * frame_bytes + 7) // 8 * 8
+        size = offset + slots * 16 + 8
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size)
+        buf = self.shm.buf
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, buffer=buf)
+        self._seq = np.ndarray(slots, np.int64, buffer=buf, offset=offset)
+        self._ts = np.ndarray(slots, np.float64, buffer=buf, offset=offset + slots * 8)
+        self._latest = np.ndarray(1, np.int64, buffer=buf, offset=offset + slots * 16)
+        if self._owner:
+            self._seq[:] = -1
+            self._latest[0] = -1
+        # A restarted writer continues after the last published frame
+        self.next_seq = int(self._latest[0]) + 1
+
+    def spec(self):
+        return self.shape, self.slots, self.shm.name
+
+    @classmethod
+    def attach(cls, spec):
+        shape, slots, name = spec
+        return cls(shape, slots, name)
+
+    # --- writer ---
+    def begin_write(self):
+        """The slot array to decode the next frame into."""
+        slot = self.next_seq % self.slots
+        self._seq[slot] = -1  # readers must not trust this slot until commit()
+        return self.frames[slot]
+
+    def commit(self, timestamp):
+        slot = self.next_seq % self.slots
+        self._ts[slot] = timestamp
+        self._seq[slot] = self.next_seq
+        self._latest[0] = self.next_seq
+        self.next_seq += 1
+        return self.next_seq - 1
+
+    # --- readers ---
+    def latest(self):
+        return int(self._latest[0])
+
+    def get(self, seq):
+        """(frame view, timestamp) for `seq`, or (None, None) if it is gone."""
+        slot = seq % self.slots
+        if seq < 0 or self._seq[slot] != seq:
+            return None, None
+        return self.frames[slot], float(self._ts[slot])
+
+    def valid(self, seq):
+        """True if `seq` was not overwritten since get(); check after using the view."""
+        return self._seq[seq % self.slots] == seq
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.frames = self._seq = self._ts = self._latest = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
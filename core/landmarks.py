@@ -0,0 +1,16 @@
+import numpy as np
+
+
+def as_array(landmarks):
+    """
+    Convert MediaPipe landmarks to an (N, 4) float array of x, y, z, visibility.
+    - Accepts a NormalizedLandmarkList, its `.landmark` field, or an array.
+    - Arrays are passed through unchanged, so calculators can call this freely.
+    """
+    if landmarks is None:
+        return None
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    if hasattr(landmarks, "landmark"):
+        landmarks = landmarks.landmark
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float64)
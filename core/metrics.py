@@ -0,0 +1,177 @@
+"""
+Prometheus-style metrics for the monitoring process.
+
+- The frame loop records values with O(1) calls (inc / set / observe / mark) under
+  a short lock; nothing is formatted or sorted on the frame loop.
+- A daemon thread serves GET /metrics in the Prometheus text format. Quantiles and
+  rates are computed on the scrape thread from a copy of the recent samples, so a
+  scrape never blocks or slows the frame loop.
+- Serves on 127.0.0.1 by default: put a local agent or reverse proxy in front of it
+  to collect from a fleet.
+
+Usage:
+    metrics = Metrics()
+    metrics.serve(9108)
+    metrics.observe("stage_seconds", 0.012, stage="inference")
+    curl localhost:9108/metrics
+"""
+import threading
+import time
+import unicodedata
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def label_value(text):
+    """Label value without emoji: status strings carry prefixes like "✅ Good posture"."""
+    text = "".join(c for c in str(text) if unicodedata.category(c) not in ("So", "Mn", "Cf", "Cc")).strip()
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe metric store with a Prometheus text renderer.
+    - inc():     counter (monotonic total)
+    - set():     gauge (last value)
+    - observe(): summary over the last `window` samples (quantiles, _sum, _count)
+    - mark():    event rate per second over the last `rate_seconds`
+    Metric names get the `prefix`; labels are keyword arguments.
+    """
+
+    def __init__(self, prefix="posture_monitor_", window=1000, rate_seconds=10.0):
+        self.prefix = prefix
+        self.window = window
+        self.rate_seconds = rate_seconds
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}  # key -> [deque of samples, sum, count]
+        self._rates = {}      # key -> deque of event times
+        self._help = {}
+        self._server = None
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, label_value(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = [deque(maxlen=self.window), 0.0, 0]
+            summary[0].append(value)
+            summary[1] += value
+            summary[2] += 1
+
+    def mark(self, name, timestamp=None, **labels):
+        key = self._key(name, labels)
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            events = self._rates.get(key)
+            if events is None:
+                events = self._rates[key] = deque()
+            events.append(now)
+            while events[0] < now - self.rate_seconds:
+                events.popleft()
+
+    def render(self):
+        """Prometheus text exposition of every metric (runs on the scrape thread)."""
+        # Copy under the lock, format outside it
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {k: (list(v[0]), v[1], v[2]) for k, v in self._summaries.items()}
+            rates = {k: list(v) for k, v in self._rates.items()}
+
+        now = time.time()
+        lines = []
+        seen = set()
+
+        def header(name, kind, sample=None):
+            # HELP/TYPE must name the sample (text format 0.0.4), e.g. frames_total for a counter
+            sample = sample or name
+            if sample not in seen:
+                seen.add(sample)
+                if name in self._help:
+                    lines.append(f"# HELP {self.prefix}{sample} {self._help[name]}")
+                lines.append(f"# TYPE {self.prefix}{sample} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter", f"{name}_total")
+            lines.append(f"{self.prefix}{name}_total{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{self.prefix}{name}{_format_labels(labels)} {float(value)}")
+        for (name, labels), events in sorted(rates.items()):
+            header(name, "gauge")
+            recent = [t for t in events if t >= now - self.rate_seconds]
+            span = (recent[-1] - recent[0]) if len(recent) > 1 else 0.0
+            rate = (len(recent) - 1) / span if span > 0 else 0.0
+            lines.append(f"{self.prefix}{name}{_format_labels(labels)} {rate}")
+        for (name, labels), (samples, total, count) in sorted(summaries.items()):
+            header(name, "summary")
+            if samples:
+                for q, v in zip(QUANTILES, np.quantile(samples, QUANTILES)):
+                    lines.append(f"{self.prefix}{name}{_format_labels(labels + (('quantile', str(q)),))} {float(v)}")
+            lines.append(f"{self.prefix}{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.prefix}{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """Start the /metrics server on a daemon thread. Returns False if the port is taken."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # keep scrapes out of the terminal
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint disabled: {e}")
+            return False
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        print(f"Metrics at http://{host}:{self._server.server_address[1]}/metrics")
+        return True
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
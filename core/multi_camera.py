@@ -0,0 +1,397 @@
+"""
+Multi-camera monitor: a front camera for the eyes, a side camera for the posture.
+
+- Every camera gets its own capture process (decoding into its own FrameRing) and its
+  own inference process, so the models run in parallel; --pin puts inference i on core i.
+- Each camera only runs the model its view needs (front: FaceMesh, side: Pose by
+  default), so accuracy improves without a heavier model on one stream.
+- Results are aligned by capture timestamp (TimestampAligner): every frame of the
+  eye camera is paired with the nearest frame of each other camera within a tolerance.
+- The fused frame takes eye metrics from the eye camera and posture metrics from the
+  first posture camera that sees a pose. A "front" camera uses the frontal
+  PostureDetector, any other camera the SidePostureDetector.
+
+The cameras are not hardware-synchronized: all capture processes stamp frames with the
+same host clock, so the pairing skew is at most about half a frame interval.
+
+Usage (from the repository root):
+    python -m core.multi_camera --camera front=0 --camera side=1 --pin
+    python -m core.multi_camera --camera front=0 --camera side=1 --backend side=holistic
+"""
+import argparse
+import multiprocessing
+import queue
+import time
+from collections import deque
+
+import numpy as np
+
+from core.alerts import add_alert_arguments, sinks_from_args
+from core.backends import BACKENDS
+from core.pipeline import _draw, _pin, capture_main
+
+DEFAULT_BACKENDS = {"front": "facemesh", "side": "pose"}
+
+
+def parse_pairs(specs, convert=str):
+    """["front=0", "side=video.mp4"] -> {"front": 0, "side": "video.mp4"}"""
+    pairs = {}
+    for spec in specs or []:
+        role, sep, value = spec.partition("=")
+        if not sep or not role:
+            raise ValueError(f"Expected role=value, got '{spec}'")
+        pairs[role] = convert(value)
+    return pairs
+
+
+def _source(value):
+    return int(value) if value.isdigit() else value
+
+
+# --------------------------- Inference (one per camera) ---------------------------
+def camera_inference_main(role, ring_spec, backend_name, results, stop, smoothing=True, core=None):
+    import cv2
+    from core.backends import create_backend
+    from core.frame_ring import FrameRing
+    from core.smoothing import LandmarkSmoother
+    _pin(core)
+    cv2.setNumThreads(1)
+    ring = FrameRing.attach(ring_spec)
+    backend = create_backend(backend_name)
+    smoother = LandmarkSmoother() if smoothing else None
+    rgb = np.empty(ring.shape, np.uint8)
+    last_seq = -1
+
+    try:
+        while not stop.is_set():
+            seq = ring.latest()
+            if seq == last_seq:
+                time.sleep(0.002)
+                continue
+            frame, ts = ring.get(seq)
+            if frame is None:
+                continue
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            if not ring.valid(seq):
+                continue
+            last_seq = seq
+
+            result = backend.process(rgb, ts)
+            if smoother is not None:
+                smoother(result)
+            try:
+                results.put_nowait({"camera": role, "seq": seq, "ts": ts,
+                                    "face": result.face_landmarks, "pose": result.pose_landmarks,
+                                    "inference_time": result.inference_time})
+            except queue.Full:
+                pass  # fusion is behind: the next frame supersedes this one
+    finally:
+        backend.close()
+        ring.close()
+
+
+# --------------------------- Alignment ---------------------------
+class TimestampAligner:
+    """
+    Pairs the results of several cameras by capture timestamp.
+    - `reference` is the camera every fused frame is built around (the eye camera:
+      blinks need its full frame rate).
+    - A reference result is released once every other camera has a result at or after
+      its timestamp (nothing closer can arrive), or after `max_wait` seconds.
+    - Each other camera contributes its nearest result within `tolerance` seconds,
+      or None. One side frame can serve several front frames when rates differ.
+    """
+
+    def __init__(self, cameras, reference, tolerance=0.05, max_wait=0.2, maxlen=64):
+        self.reference = reference
+        self.others = [c for c in cameras if c != reference]
+        self.tolerance = tolerance
+        self.max_wait = max_wait
+        self.buffers = {c: deque(maxlen=maxlen) for c in cameras}
+        self.matched = {c: 0 for c in self.others}
+        self.fused = 0
+        self.skew = {c: 0.0 for c in self.others}
+
+    def add(self, result):
+        buf = self.buffers[result["camera"]]
+        if buf and result["ts"] < buf[-1]["ts"]:
+            return  # a restarted camera replayed an old frame
+        buf.append(result)
+
+    def _nearest(self, camera, ts):
+        best = None
+        for r in self.buffers[camera]:
+            if abs(r["ts"] - ts) <= self.tolerance and (best is None or abs(r["ts"] - ts) < abs(best["ts"] - ts)):
+                best = r
+        return best
+
+    def pop(self, now=None):
+        """Fused frames ready at `now`: dicts of camera -> result (or None), oldest first."""
+        now = time.time() if now is None else now
+        ready = []
+        refs = self.buffers[self.reference]
+        while refs:
+            ts = refs[0]["ts"]
+            waiting = any(not self.buffers[c] or self.buffers[c][-1]["ts"] < ts for c in self.others)
+            if waiting and now - ts < self.max_wait:
+                break
+            fused = {self.reference: refs.popleft()}
+            for c in self.others:
+                fused[c] = self._nearest(c, ts)
+                if fused[c] is not None:
+                    self.matched[c] += 1
+                    self.skew[c] = fused[c]["ts"] - ts
+                # Older frames can not be the nearest match for any later reference frame
+                buf = self.buffers[c]
+                while len(buf) > 1 and buf[1]["ts"] <= ts:
+                    buf.popleft()
+            self.fused += 1
+            ready.append(fused)
+        return ready
+
+
+# --------------------------- Fusion ---------------------------
+class FusionMonitor:
+    """
+    Detectors and alert rules for one user seen by several cameras.
+    - Eye metrics come from `eye_camera`, posture from the first camera in
+      `posture_cameras` that has a pose in the fused frame.
+    - Each posture camera keeps its own detector and baseline: a front and a side
+      view do not share metric definitions, and a fallback view is ready when the
+      preferred one loses the person.
+    """
+
+    def __init__(self, eye_camera, posture_cameras, image_shape, now=None):
+        from core.alerts import SmartAlerts
+        from core.eye_strain import EyeStrainDetector
+        from core.posture import PostureDetector, SidePostureDetector
+        self.eye_camera = eye_camera
+        self.posture_cameras = list(posture_cameras)
+        self.image_shape = image_shape
+        aspect = image_shape[1] / image_shape[0]
+        self.eye_detector = EyeStrainDetector()
+        self.posture_detectors = {c: PostureDetector() if c == "front" else SidePostureDetector(aspect)
+                                  for c in self.posture_cameras}
+        self.smart_alerts = SmartAlerts(now=time.time() if now is None else now)
+
+    def start_calibration(self):
+        self.eye_detector.start_calibration()
+        for detector in self.posture_detectors.values():
+            detector.start_calibration(frames=50)
+
+    def _posture(self, camera, pose):
+        detector = self.posture_detectors[camera]
+        metrics = detector.calculate_metrics(pose)
+        if detector.calib_mode:
+            detector.process_calibration(metrics)
+            return f"Calibrating Posture ({camera})... {len(detector.calib_metrics)}/{detector.calib_frames}"
+        if detector.baseline is not None:
+            return detector.detect_posture(metrics)
+        return "Press 'E' to calibrate posture"
+
+    def update(self, fused):
+        """One fused frame -> result dict in the format core.pipeline._draw expects."""
+        front = fused[self.eye_camera]
+        ts = front["ts"]
+        out = {"ts": ts, "seqs": {c: r["seq"] for c, r in fused.items() if r is not None},
+               "eye_info": None, "eye_pts": ([], []), "eye_text": None,
+               "pose": None, "posture": None, "posture_camera": None,
+               "alert": None, "break_remaining": None}
+
+        if front["face"] is not None:
+            eye_info, left_pts, right_pts = self.eye_detector.process_landmarks(front["face"], self.image_shape, ts)
+            out["eye_info"], out["eye_pts"] = eye_info, (left_pts, right_pts)
+            if eye_info is not None:
+                if self.eye_detector.calib_mode:
+                    out["eye_text"] = f"Calibrating Eyes... {len(self.eye_detector.calib_values)}/{self.eye_detector.ear_calib_frames}"
+                elif not self.eye_detector.calibrated:
+                    out["eye_text"] = "Press 'E' to calibrate"
+                out["alert"] = self.smart_alerts.update(eye_info, self.eye_detector.calibrated, ts)
+                out["break_remaining"] = self.smart_alerts.break_remaining(ts)
+
+        # Every camera with a pose is evaluated, so fallback views keep calibrating too
+        for camera in self.posture_cameras:
+            r = fused.get(camera)
+            if r is not None and r["pose"] is not None:
+                posture = self._posture(camera, r["pose"])
+                if out["posture_camera"] is None:
+                    out["pose"], out["posture_camera"], out["posture"] = r["pose"], camera, posture
+        return out
+
+
+# --------------------------- Supervisor ---------------------------
+class MultiCamera:
+    """
+    Starts a capture and an inference process per camera, fuses their results and
+    shows one window per camera.
+    - Crashed capture or inference processes are restarted; detector state lives in
+      this process, so it survives.
+    - With show=False nothing is drawn and the fused status is printed once a second.
+    """
+
+    def __init__(self, cameras, backends=None, eye_camera="front", posture_cameras=("side", "front"),
+                 size=(640, 480), slots=4, pin=False, smoothing=True, tolerance=0.05, sinks=None, show=True):
+        from core.alerts import AlertDispatcher, AlertOverlay
+        from core.frame_ring import FrameRing
+        if eye_camera not in cameras:
+            raise ValueError(f"Eye camera '{eye_camera}' is not one of: {', '.join(cameras)}")
+        backends = dict(backends or {})
+        self.ctx = multiprocessing.get_context("spawn")
+        self.stop = self.ctx.Event()
+        self.results = self.ctx.Queue(maxsize=8 * len(cameras))
+        self.rings = {c: FrameRing((size[1], size[0], 3), slots) for c in cameras}
+        self._targets = {}
+        for i, (camera, source) in enumerate(cameras.items()):
+            backend = backends.get(camera, DEFAULT_BACKENDS.get(camera, "holistic"))
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown backend '{backend}' for camera '{camera}'")
+            spec = self.rings[camera].spec()
+            # Inference i on core i; the light capture processes share the core after them
+            self._targets[f"capture:{camera}"] = (capture_main, (spec, source, self.stop,
+                                                                  len(cameras) if pin else None))
+            self._targets[f"inference:{camera}"] = (camera_inference_main, (camera, spec, backend, self.results,
+                                                                            self.stop, smoothing, i if pin else None))
+        self.processes = {}
+        self.restarts = {name: 0 for name in self._targets}
+
+        posture_cameras = [c for c in posture_cameras if c in cameras]
+        self.aligner = TimestampAligner(list(cameras), eye_camera, tolerance)
+        self.fusion = FusionMonitor(eye_camera, posture_cameras, (size[1], size[0], 3))
+        self.show = show
+        self.alert_dispatcher = AlertDispatcher(sinks)
+        self.alert_overlay = AlertOverlay(duration=5.0)
+        self.frames = {c: np.empty(ring.shape, np.uint8) for c, ring in self.rings.items()}
+
+    def _start(self, name):
+        target, args = self._targets[name]
+        p = self.ctx.Process(target=target, args=args, name=name, daemon=True)
+        p.start()
+        self.processes[name] = p
+
+    def _supervise(self):
+        for name, p in self.processes.items():
+            if not p.is_alive() and not self.stop.is_set():
+                self.restarts[name] += 1
+                print(f"⚠️ {name} process exited (code {p.exitcode}), restarting "
+                      f"(restart #{self.restarts[name]})")
+                self._start(name)
+
+    def _display(self, res):
+        import cv2
+        for camera, ring in self.rings.items():
+            seq = res["seqs"].get(camera, ring.latest())
+            frame, _ = ring.get(seq)
+            if frame is None:
+                seq = ring.latest()
+                frame, _ = ring.get(seq)
+                if frame is None:
+                    continue
+            np.copyto(self.frames[camera], frame)
+        posture_frame = self.frames[res["posture_camera"] or self.fusion.eye_camera]
+        _draw(self.frames[self.fusion.eye_camera], posture_frame, res)
+        self.alert_overlay.draw(self.frames[self.fusion.eye_camera], res["ts"])
+        for camera, frame in self.frames.items():
+            skew = self.aligner.skew.get(camera)
+            if skew is not None:
+                cv2.putText(frame, f"Sync: {skew * 1000:+.0f} ms", (30, frame.shape[0] - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+            cv2.imshow(f"Camera: {camera}", frame)
+        key = cv2.waitKey(1) & 0xFF
+        if key in [27, ord('q')]:
+            self.stop.set()
+        elif key == ord('e') or key == ord('E'):
+            self.fusion.start_calibration()
+
+    def _print_status(self, res):
+        info = res["eye_info"]
+        eyes = f"EAR {info['avg_ear']:.2f} {info['status']}" if info is not None else "no face"
+        skew = ", ".join(f"{c} {s * 1000:+.0f} ms" for c, s in self.aligner.skew.items())
+        print(f"[{time.strftime('%H:%M:%S', time.localtime(res['ts']))}] {eyes} | "
+              f"{res['posture'] or 'no pose'} ({res['posture_camera'] or '-'}) | sync {skew}")
+
+    def run(self, duration=None, check_every=0.5):
+        for name in self._targets:
+            self._start(name)
+        start = last_check = last_print = time.time()
+        try:
+            while not self.stop.is_set():
+                try:
+                    self.aligner.add(self.results.get(timeout=0.05))
+                    while True:
+                        self.aligner.add(self.results.get_nowait())
+                except queue.Empty:
+                    pass
+
+                res = None
+                for fused in self.aligner.pop():
+                    res = self.fusion.update(fused)
+                    if res["alert"]:
+                        self.alert_dispatcher.dispatch(res["alert"], res["ts"])
+                        self.alert_overlay.show(res["alert"], res["ts"])
+
+                now = time.time()
+                if res is not None:
+                    if self.show:
+                        self._display(res)
+                    elif now - last_print >= 1.0:
+                        self._print_status(res)
+                        last_print = now
+                if now - last_check >= check_every:
+                    self._supervise()
+                    last_check = now
+                if duration is not None and now - start >= duration:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        return self.stats()
+
+    def stats(self):
+        return {"fused": self.aligner.fused, "matched": dict(self.aligner.matched),
+                "restarts": dict(self.restarts)}
+
+    def close(self):
+        self.stop.set()
+        for p in self.processes.values():
+            p.join(timeout=3)
+            if p.is_alive():
+                p.terminate()
+        self.processes = {}
+        self.alert_dispatcher.close()
+        if self.show:
+            import cv2
+            cv2.destroyAllWindows()
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Posture & eye strain monitor fused from several cameras.")
+    parser.add_argument("--camera", action="append", required=True,
+                        help="role=source, e.g. front=0 or side=side.mp4 (repeat per camera)")
+    parser.add_argument("--backend", action="append", default=[],
+                        help="role=backend per camera (default: front=facemesh, side=pose, others holistic)")
+    parser.add_argument("--eyes", default="front", help="camera whose face drives the eye metrics")
+    parser.add_argument("--posture", default="side,front",
+                        help="cameras for posture, in order of preference")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="max capture-time skew to pair frames (s)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--pin", action="store_true", help="pin each camera's inference to its own core")
+    parser.add_argument("--no-smoothing", action="store_true")
+    parser.add_argument("--headless", action="store_true", help="print the fused status instead of showing windows")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    add_alert_arguments(parser)
+    args = parser.parse_args()
+
+    print("Instructions:")
+    print(" - Press 'E' to calibrate BOTH posture and eyes.")
+    print(" - Press 'Q' or ESC to quit.")
+    monitor = MultiCamera(parse_pairs(args.camera, _source), parse_pairs(args.backend), args.eyes,
+                          args.posture.split(","), (args.width, args.height), pin=args.pin,
+                          smoothing=not args.no_smoothing, tolerance=args.tolerance,
+                          sinks=sinks_from_args(args), show=not args.headless)
+    stats = monitor.run(args.duration)
+    print(f"Fused frames: {stats['fused']} | matched: {stats['matched']}")
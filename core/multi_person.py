@@ -0,0 +1,308 @@
+"""
+Multi-person mode: one camera watches several seats.
+
+- FaceMesh(max_num_faces=N) finds every face in the frame.
+- FaceTracker gives each face a stable track ID (greedy IoU matching on face boxes).
+- Each track borrows a PersonState from a StatePool: its own EyeStrainDetector,
+  PostureDetector and Pose model. Pose runs on a body crop below the face at a
+  low rate, because posture changes slowly.
+- A track that has been gone for `evict_after` seconds returns its state to the
+  pool, where it is reset and reused by the next person who shows up.
+
+Usage (from the repository root):
+    python -m core.multi_person --max-people 4
+"""
+import argparse
+import time
+import numpy as np
+
+from core.eye_strain import EyeStrainDetector
+from core.posture import PostureDetector
+from core.landmarks import as_array
+
+
+def face_box(face, frame_shape):
+    """Pixel bounding box (x0, y0, x1, y1) of a face landmark array."""
+    h, w = frame_shape[:2]
+    px = face[:, :2] * (w, h)
+    x0, y0 = px.min(axis=0)
+    x1, y1 = px.max(axis=0)
+    return (float(x0), float(y0), float(x1), float(y1))
+
+
+def box_iou(a, b):
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """
+    Assigns stable IDs to face boxes across frames.
+    - Greedy matching on IoU with the track's last box.
+    - Tracks not seen for `evict_after` seconds are dropped.
+    """
+
+    def __init__(self, min_iou=0.2, evict_after=5.0):
+        self.min_iou = min_iou
+        self.evict_after = evict_after
+        self.tracks = {}  # track_id -> {"box": ..., "last_seen": ...}
+        self._next_id = 1
+
+    def update(self, boxes, timestamp):
+        """Return (assignments, evicted): assignments[i] is the track ID of boxes[i]."""
+        pairs = sorted(
+            ((box_iou(track["box"], box), tid, i)
+             for tid, track in self.tracks.items() for i, box in enumerate(boxes)),
+            reverse=True)
+        assignments = [None] * len(boxes)
+        used = set()
+        for iou, tid, i in pairs:
+            if iou < self.min_iou:
+                break
+            if tid in used or assignments[i] is not None:
+                continue
+            assignments[i] = tid
+            used.add(tid)
+
+        for i, box in enumerate(boxes):
+            if assignments[i] is None:
+                assignments[i] = self._next_id
+                self._next_id += 1
+            self.tracks[assignments[i]] = {"box": box, "last_seen": timestamp}
+
+        evicted = [tid for tid, track in self.tracks.items()
+                   if timestamp - track["last_seen"] > self.evict_after]
+        for tid in evicted:
+            del self.tracks[tid]
+        return assignments, evicted
+
+
+class PersonState:
+    """Everything that belongs to one tracked person."""
+
+    def __init__(self, eye_kwargs, pose_factory):
+        self.eye_detector = EyeStrainDetector(**eye_kwargs)
+        self.posture_detector = PostureDetector()
+        self._pose_factory = pose_factory
+        self.pose_model = None  # created on first use, kept across reuse
+        self.pose_landmarks = None
+        self.last_pose_time = None
+
+    def reset(self):
+        self.eye_detector.reset()
+        self.posture_detector.reset()
+        self.pose_landmarks = None
+        self.last_pose_time = None
+        if self.pose_model is not None and hasattr(self.pose_model, "reset"):
+            self.pose_model.reset()
+
+    def pose(self):
+        if self.pose_model is None:
+            self.pose_model = self._pose_factory()
+        return self.pose_model
+
+    def close(self):
+        if self.pose_model is not None:
+            self.pose_model.close()
+
+
+class StatePool:
+    """
+    Reusable PersonState objects, so a new track does not rebuild a Pose graph.
+    At most `max_size` states are kept idle; extra released states are closed.
+    """
+
+    def __init__(self, eye_kwargs=None, pose_factory=None, max_size=8):
+        self.eye_kwargs = eye_kwargs or {}
+        self.pose_factory = pose_factory
+        self.max_size = max_size
+        self._free = []
+
+    def acquire(self):
+        if self._free:
+            return self._free.pop()
+        return PersonState(self.eye_kwargs, self.pose_factory)
+
+    def release(self, state):
+        state.reset()
+        if len(self._free) < self.max_size:
+            self._free.append(state)
+        else:
+            state.close()
+
+    def close(self):
+        for state in self._free:
+            state.close()
+        self._free = []
+
+
+class MultiPersonMonitor:
+    """
+    Per-frame multi-person processing: faces -> tracks -> per-track detectors.
+    process() returns one dict per visible person:
+    {"track_id", "box", "eye_info", "eye_pts", "pose_landmarks", "posture"}.
+    """
+
+    def __init__(self,
+                 max_people=4,
+                 pose_hz=3.0,
+                 evict_after=5.0,
+                 eye_kwargs=None,
+                 refine_face_landmarks=True,
+                 min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=max_people,
+            refine_landmarks=refine_face_landmarks,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+        def pose_factory():
+            return mp.solutions.pose.Pose(
+                model_complexity=0,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
+
+        self.tracker = FaceTracker(evict_after=evict_after)
+        self.pool = StatePool(eye_kwargs, pose_factory, max_size=max_people)
+        self.states = {}  # track_id -> PersonState
+        self.pose_interval = 1.0 / pose_hz if pose_hz > 0 else 0.0
+
+    def start_calibration(self):
+        for state in self.states.values():
+            state.eye_detector.start_calibration()
+            state.posture_detector.start_calibration(frames=50)
+
+    def _body_crop(self, box, frame_shape):
+        """Region below a face box that holds the head and shoulders."""
+        h, w = frame_shape[:2]
+        fw, fh = box[2] - box[0], box[3] - box[1]
+        cx = (box[0] + box[2]) / 2
+        x0 = int(max(0, cx - 2.0 * fw))
+        x1 = int(min(w, cx + 2.0 * fw))
+        y0 = int(max(0, box[1] - 0.5 * fh))
+        y1 = int(min(h, box[3] + 3.0 * fh))
+        return x0, y0, x1, y1
+
+    def _update_pose(self, state, rgb_frame, box, timestamp):
+        if state.last_pose_time is not None and timestamp - state.last_pose_time < self.pose_interval:
+            return
+        state.last_pose_time = timestamp
+        h, w = rgb_frame.shape[:2]
+        x0, y0, x1, y1 = self._body_crop(box, rgb_frame.shape)
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            state.pose_landmarks = None
+            return
+        results = state.pose().process(np.ascontiguousarray(rgb_frame[y0:y1, x0:x1]))
+        pose = as_array(results.pose_landmarks)
+        if pose is not None:
+            # Crop-normalized -> full-frame normalized
+            pose[:, 0] = (x0 + pose[:, 0] * (x1 - x0)) / w
+            pose[:, 1] = (y0 + pose[:, 1] * (y1 - y0)) / h
+        state.pose_landmarks = pose
+
+    def process(self, rgb_frame, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        results = self.face_mesh.process(rgb_frame)
+        faces = [as_array(f) for f in (results.multi_face_landmarks or [])]
+        boxes = [face_box(f, rgb_frame.shape) for f in faces]
+
+        assignments, evicted = self.tracker.update(boxes, timestamp)
+        for tid in evicted:
+            state = self.states.pop(tid, None)
+            if state is not None:
+                self.pool.release(state)
+
+        people = []
+        for face, box, tid in zip(faces, boxes, assignments):
+            state = self.states.get(tid)
+            if state is None:
+                state = self.states[tid] = self.pool.acquire()
+
+            eye_info, left_pts, right_pts = state.eye_detector.process_landmarks(face, rgb_frame.shape, timestamp)
+
+            self._update_pose(state, rgb_frame, box, timestamp)
+            metrics = state.posture_detector.calculate_metrics(state.pose_landmarks)
+            posture_detector = state.posture_detector
+            if posture_detector.calib_mode:
+                posture_detector.process_calibration(metrics)
+                posture = f"Calibrating... {len(posture_detector.calib_metrics)}/{posture_detector.calib_frames}"
+            elif posture_detector.baseline is not None:
+                posture = posture_detector.detect_posture(metrics)
+            else:
+                posture = "Press 'E' to calibrate"
+
+            people.append({
+                "track_id": tid,
+                "box": box,
+                "eye_info": eye_info,
+                "eye_pts": (left_pts, right_pts),
+                "pose_landmarks": state.pose_landmarks,
+                "posture": posture,
+            })
+        return people
+
+    def close(self):
+        for state in self.states.values():
+            state.close()
+        self.states = {}
+        self.pool.close()
+        self.face_mesh.close()
+
+
+if __name__ == "__main__":
+    import cv2
+    from core.drawing import draw_eye_contours, draw_pose
+
+    parser = argparse.ArgumentParser(description="Multi-person posture & eye strain monitor.")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--max-people", type=int, default=4)
+    parser.add_argument("--pose-hz", type=float, default=3.0)
+    parser.add_argument("--evict-after", type=float, default=5.0, help="seconds before a lost track is dropped")
+    args = parser.parse_args()
+
+    monitor = MultiPersonMonitor(max_people=args.max_people, pose_hz=args.pose_hz, evict_after=args.evict_after)
+    cap = cv2.VideoCapture(args.camera)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+
+    print("Instructions:")
+    print(" - Press 'E' to calibrate everyone in view.")
+    print(" - Press 'Q' or ESC to quit.")
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        ts = time.time()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        for person in monitor.process(rgb_frame, ts):
+            x0, y0, x1, y1 = [int(v) for v in person["box"]]
+            draw_pose(frame, person["pose_landmarks"])
+            draw_eye_contours(frame, *person["eye_pts"])
+            cv2.rectangle(frame, (x0, y0), (x1, y1), (255, 255, 0), 1)
+            info = person["eye_info"]
+            label = f"#{person['track_id']}"
+            if info is not None:
+                label += f" {info['blink_rate']:.0f}/min {info['status']}"
+            cv2.putText(frame, label, (x0, max(15, y0 - 25)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            cv2.putText(frame, person["posture"], (x0, max(30, y0 - 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                        (0, 255, 0) if "✅" in person["posture"] else (0, 0, 255), 1)
+
+        cv2.imshow("Multi-person Monitor", frame)
+        key = cv2.waitKey(1) & 0xFF
+        if key in [27, ord('q')]:
+            break
+        elif key == ord('e') or key == ord('E'):
+            monitor.start_calibration()
+
+    monitor.close()
+    cap.release()
+    cv2.destroyAllWindows()
@@ -0,0 +1,407 @@
+"""
+Multi-process monitor: capture, inference and display run as separate processes.
+
+- capture:   cv2.VideoCapture decodes straight into a slot of a shared-memory FrameRing.
+- inference: frame-quality gate + backend + landmark smoothing + EyeStrainDetector / PostureDetector + alert
+             rules, always on the newest frame. Only a small result dict (landmarks,
+             texts, alert reason) goes to the display through a bounded queue.
+- display:   draws the overlays on its own copy of the ring frame, shows the windows,
+             hands alerts to the AlertDispatcher and sends key presses back to inference.
+- The main process only supervises: a stage that crashes is restarted (display and
+  capture keep no state), and monitoring goes on while the display is down or stalled.
+
+Frames are never pickled: processes exchange ring sequence numbers, not pixels. Each
+stage is its own process, so the pure-Python parts do not share a GIL; --pin puts each
+stage on its own core.
+
+Usage (from the repository root):
+    python -m core.pipeline --backend holistic --pin
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+
+import numpy as np
+
+from core.alerts import add_alert_arguments, sinks_from_args
+from core.backends import full_backends
+
+STAGES = ("capture", "inference", "display")
+
+
+def _pin(core):
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core % os.cpu_count()})
+
+
+# --------------------------- Capture ---------------------------
+def capture_main(ring_spec, camera, stop, core=None):
+    import cv2
+    from core.frame_ring import FrameRing
+    _pin(core)
+    cv2.setNumThreads(1)
+    ring = FrameRing.attach(ring_spec)
+    h, w = ring.shape[:2]
+    cap = cv2.VideoCapture(camera)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+    # A video file is played back at its own frame rate, like a camera
+    interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0) if isinstance(camera, str) else 0.0
+    next_time = time.time()
+    try:
+        while not stop.is_set():
+            if interval:
+                next_time += interval
+                time.sleep(max(0.0, next_time - time.time()))
+            slot = ring.begin_write()
+            ret, frame = cap.read(slot)
+            if not ret:
+                time.sleep(0.01)
+                continue
+            if frame is not slot:
+                # Camera ignored the requested size: scale into the slot
+                cv2.resize(frame, (w, h), dst=slot)
+            ring.commit(time.time())
+    finally:
+        cap.release()
+        ring.close()
+
+
+# --------------------------- Inference ---------------------------
+def inference_main(ring_spec, backend_name, results, commands, stop, smoothing=True, core=None,
+                   state_path=None, checkpoint_every=5.0, trace_every=0, config_path=None):
+    import cv2
+    from core.alerts import SmartAlerts
+    from core.backends import create_backend
+    from core.config import ConfigWatcher, apply_config, backend_kwargs, default_config, rebuild_backend
+    from core.eye_strain import EyeStrainDetector
+    from core.frame_quality import FrameQualityGate
+    from core.frame_ring import FrameRing
+    from core.posture import PostureDetector
+    from core.smoothing import LandmarkSmoother
+    from core.snapshot import Checkpointer
+    from core.tracing import NO_TRACE, FrameTrace
+    _pin(core)
+    ring = FrameRing.attach(ring_spec)
+    config_watcher = ConfigWatcher(config_path) if config_path else None
+    config = config_watcher.config if config_watcher is not None else default_config()
+    model_kwargs = backend_kwargs(backend_name, config)
+    backend = create_backend(backend_name, **model_kwargs)
+    smoother = LandmarkSmoother() if smoothing else None
+    frame_quality = FrameQualityGate()
+    eye_detector = EyeStrainDetector(**config["eye"])
+    posture_detector = PostureDetector()
+    smart_alerts = SmartAlerts(now=time.time(), **config["alerts"])
+    apply_config(config, posture=posture_detector)
+    # A restarted inference stage picks up calibration and alert timers where the last one stopped
+    checkpoints = Checkpointer(state_path, checkpoint_every) if state_path else None
+    if checkpoints is not None:
+        checkpoints.load(eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+    rgb = np.empty(ring.shape, np.uint8)
+    last_seq = -1
+    pending_alert = None
+
+    try:
+        while not stop.is_set():
+            try:
+                if commands.get_nowait() == "calibrate":
+                    eye_detector.start_calibration()
+                    posture_detector.start_calibration(frames=50)
+            except queue.Empty:
+                pass
+            # Edited settings apply in place; the model is rebuilt only if its own settings changed
+            changed = config_watcher.poll() if config_watcher is not None else None
+            if changed:
+                apply_config(config_watcher.config, changed, eye=eye_detector, posture=posture_detector,
+                             alerts=smart_alerts)
+                backend, model_kwargs = rebuild_backend(backend, backend_name, model_kwargs,
+                                                        config_watcher.config)
+
+            seq = ring.latest()
+            if seq == last_seq:
+                time.sleep(0.002)
+                continue
+            frame, ts = ring.get(seq)
+            if frame is None:
+                continue
+            # Spans travel with the result; the display process exports them
+            trace = FrameTrace(seq, ts, sampled=seq % trace_every == 0) if trace_every else NO_TRACE
+            trace.mark("queue")
+            if frame_quality.check(frame) is not None:
+                # Dark, blurred or repeated: the display keeps showing the last result
+                last_seq = seq
+                continue
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            if not ring.valid(seq):
+                continue  # capture lapped us while converting
+            last_seq = seq
+
+            trace.mark("quality gate")
+            result = backend.process(rgb, ts)
+            if smoother is not None:
+                smoother(result)
+            trace.mark("inference")
+
+            out = {"seq": seq, "ts": ts, "inference_time": result.inference_time,
+                   "eye_info": None, "eye_pts": ([], []), "eye_text": None,
+                   "pose": result.pose_landmarks, "posture": None,
+                   "alert": None, "break_remaining": None}
+
+            if result.face_landmarks is not None:
+                eye_info, left_pts, right_pts = eye_detector.process_landmarks(result.face_landmarks, ring.shape, ts)
+                out["eye_info"], out["eye_pts"] = eye_info, (left_pts, right_pts)
+                if eye_info is not None:
+                    if eye_detector.calib_mode:
+                        out["eye_text"] = f"Calibrating Eyes... {len(eye_detector.calib_values)}/{eye_detector.ear_calib_frames}"
+                    elif not eye_detector.calibrated:
+                        out["eye_text"] = "Press 'E' to calibrate"
+                    trace.mark("eye detector")
+                    out["alert"] = smart_alerts.update(eye_info, eye_detector.calibrated, ts) or pending_alert
+                    out["break_remaining"] = smart_alerts.break_remaining(ts)
+                    trace.mark("alert rules")
+
+            if result.pose_landmarks is not None:
+                metrics = posture_detector.calculate_metrics(result.pose_landmarks)
+                if posture_detector.calib_mode:
+                    posture_detector.process_calibration(metrics)
+                    out["posture"] = f"Calibrating Posture... {len(posture_detector.calib_metrics)}/{posture_detector.calib_frames}"
+                elif posture_detector.baseline is not None:
+                    out["posture"] = posture_detector.detect_posture(metrics)
+                else:
+                    out["posture"] = "Press 'E' to calibrate posture"
+                trace.mark("posture detector")
+
+            if checkpoints is not None:
+                checkpoints.maybe_save(ts, eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+            if out["alert"]:
+                trace.set_alert(out["alert"])
+            out["trace"] = trace.spans if trace.keep else None
+
+            try:
+                results.put_nowait(out)
+                pending_alert = None
+            except queue.Full:
+                # Display is slow or down: monitoring goes on, only this overlay is skipped.
+                # An alert on a dropped result rides along with the next one.
+                pending_alert = out["alert"] or pending_alert
+    finally:
+        print(frame_quality.summary())
+        if checkpoints is not None:
+            checkpoints.close(eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+        backend.close()
+        ring.close()
+
+
+# --------------------------- Display ---------------------------
+def _draw(frame_eye, frame_posture, res):
+    import cv2
+    from core.drawing import draw_eye_contours, draw_pose
+
+    draw_pose(frame_posture, res["pose"])
+    if res["posture"] is not None:
+        color = (0, 255, 0) if "✅" in res["posture"] else (0, 0, 255) if "⚠️" in res["posture"] else (0, 200, 200)
+        cv2.putText(frame_posture, res["posture"], (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+
+    info = res["eye_info"]
+    draw_eye_contours(frame_eye, *res["eye_pts"])
+    if info is None:
+        return
+    cv2.putText(frame_eye, f"Blinks: {info['blink_count']} | Rate: {info['blink_rate']:.1f}/min",
+                (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    cv2.putText(frame_eye, f"EAR: {info['avg_ear']:.2f}", (30, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.7, info['color'], 2)
+    cv2.putText(frame_eye, f"Status: {info['status']}", (30, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.7, info['color'], 2)
+    y_pos = 140
+    if info['closure_duration'] > 0.1:
+        cv2.putText(frame_eye, f"Closure: {info['closure_duration']:.2f}s",
+                    (30, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+        y_pos += 30
+    if info["yawn"]:
+        cv2.putText(frame_eye, "YAWN DETECTED", (30, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        y_pos += 30
+    if res["eye_text"]:
+        cv2.putText(frame_eye, res["eye_text"], (30, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 200), 2)
+    if res["break_remaining"] is not None:
+        cv2.putText(frame_eye, f"👁️ BREAK TIME: Look away for {res['break_remaining']:.0f}s",
+                    (30, frame_eye.shape[0] - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 200, 255), 2)
+
+
+def display_main(ring_spec, results, commands, stop, sinks=None, core=None, trace_path=None):
+    import cv2
+    from core.alerts import AlertDispatcher, AlertOverlay
+    from core.frame_ring import FrameRing
+    from core.tracing import Tracer
+    _pin(core)
+    cv2.setNumThreads(1)
+    ring = FrameRing.attach(ring_spec)
+    tracer = Tracer(trace_path, process_name="posture pipeline") if trace_path else None
+    alert_dispatcher = AlertDispatcher(sinks, tracer=tracer)
+    alert_overlay = AlertOverlay(duration=5.0)
+    frame_eye = np.empty(ring.shape, np.uint8)
+    frame_posture = np.empty(ring.shape, np.uint8)
+    res = None
+    trace = None
+
+    try:
+        while not stop.is_set():
+            # Newest result; alerts from results skipped on the way are still delivered
+            try:
+                res = results.get(timeout=0.5)
+                while True:
+                    if tracer is not None:
+                        if trace is not None:
+                            tracer.finish(trace)  # superseded before it was shown
+                        trace = tracer.resume(res["seq"], res["ts"], res["trace"], res["alert"]) \
+                            if res["trace"] else None
+                        if trace is not None:
+                            trace.mark("result queue")
+                    if res["alert"]:
+                        alert_dispatcher.dispatch(res["alert"], res["ts"])
+                        alert_overlay.show(res["alert"], res["ts"])
+                    res = results.get_nowait()
+            except queue.Empty:
+                pass
+
+            seq = res["seq"] if res is not None else ring.latest()
+            frame, _ = ring.get(seq)
+            if frame is None:
+                # Slot already overwritten: draw the result on the newest frame instead
+                seq = ring.latest()
+                frame, _ = ring.get(seq)
+                if frame is None:
+                    continue
+            np.copyto(frame_eye, frame)
+            if not ring.valid(seq):
+                continue
+            np.copyto(frame_posture, frame_eye)
+
+            if res is not None:
+                _draw(frame_eye, frame_posture, res)
+                alert_overlay.draw(frame_eye, res["ts"])
+            else:
+                cv2.putText(frame_posture, "Waiting for inference...", (30, 40),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
+
+            cv2.imshow("Eye Strain Detection (Pipeline)", frame_eye)
+            cv2.imshow("Posture Detection (Pipeline)", frame_posture)
+            key = cv2.waitKey(1) & 0xFF
+            if trace is not None:
+                trace.mark("display")
+                tracer.finish(trace)
+                trace = None
+            if key in [27, ord('q')]:
+                stop.set()
+            elif key == ord('e') or key == ord('E'):
+                commands.put("calibrate")
+    finally:
+        alert_dispatcher.close()
+        if tracer is not None:
+            tracer.close()
+        cv2.destroyAllWindows()
+        ring.close()
+
+
+# --------------------------- Supervisor ---------------------------
+class Pipeline:
+    """
+    Starts the three stage processes and restarts any that dies.
+    - Uses the 'spawn' start method: no MediaPipe or OpenCV state is forked.
+    - The FrameRing is owned (and unlinked) by this process.
+    - Inference checkpoints its detector and alert state to `state` (a temporary file
+      by default, removed on close), so a restarted inference stage resumes it.
+    - With `config`, inference reloads detector, alert and model settings from that
+      file while running (core/config.py).
+    - With `trace`, inference records spans for one frame in `trace_every` and for
+      every alert frame; display adds its own spans and writes the trace file.
+    """
+
+    def __init__(self, backend="holistic", camera=0, size=(640, 480), slots=8, pin=False, smoothing=True,
+                 sinks=None, state=None, trace=None, trace_every=30, config=None):
+        from core.config import load_config
+        from core.frame_ring import FrameRing
+        if config:
+            load_config(config)  # fail here, not in a stage the supervisor keeps restarting
+        self.ctx = multiprocessing.get_context("spawn")
+        self.ring = FrameRing((size[1], size[0], 3), slots)
+        self.stop = self.ctx.Event()
+        self.results = self.ctx.Queue(maxsize=4)
+        self.commands = self.ctx.Queue()
+        self._own_state = state is None
+        self.state = state or os.path.join(tempfile.gettempdir(), f"posture_pipeline_{os.getpid()}.state")
+        cores = {name: (i if pin else None) for i, name in enumerate(STAGES)}
+        spec = self.ring.spec()
+        self._targets = {
+            "capture": (capture_main, (spec, camera, self.stop, cores["capture"])),
+            "inference": (inference_main, (spec, backend, self.results, self.commands, self.stop,
+                                           smoothing, cores["inference"], self.state, 5.0,
+                                           trace_every if trace else 0, config)),
+            "display": (display_main, (spec, self.results, self.commands, self.stop, sinks, cores["display"],
+                                       trace)),
+        }
+        self.processes = {}
+        self.restarts = {name: 0 for name in STAGES}
+
+    def _start(self, name):
+        target, args = self._targets[name]
+        p = self.ctx.Process(target=target, args=args, name=name, daemon=True)
+        p.start()
+        self.processes[name] = p
+
+    def run(self, check_every=0.5):
+        for name in STAGES:
+            self._start(name)
+        try:
+            while not self.stop.is_set():
+                time.sleep(check_every)
+                for name, p in self.processes.items():
+                    if not p.is_alive() and not self.stop.is_set():
+                        self.restarts[name] += 1
+                        print(f"⚠️ {name} process exited (code {p.exitcode}), restarting "
+                              f"(restart #{self.restarts[name]})")
+                        self._start(name)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.stop.set()
+        for p in self.processes.values():
+            p.join(timeout=3)
+            if p.is_alive():
+                p.terminate()
+        self.ring.close()
+        if self._own_state and os.path.exists(self.state):
+            os.remove(self.state)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Posture & eye strain monitor as separate processes.")
+    parser.add_argument("--backend", default="holistic", choices=full_backends())
+    parser.add_argument("--camera", default="0", help="camera index or a video file")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--slots", type=int, default=8, help="frames in the shared-memory ring")
+    parser.add_argument("--pin", action="store_true", help="pin capture/inference/display to cores 0/1/2")
+    parser.add_argument("--no-smoothing", action="store_true")
+    parser.add_argument("--state", metavar="FILE", default=None,
+                        help="keep calibration and alert state in FILE across runs")
+    parser.add_argument("--config", metavar="FILE", default=None,
+                        help="detector, alert and model settings (JSON); edits apply while running")
+    parser.add_argument("--trace", metavar="FILE", default=None,
+                        help="write capture-to-alert latency spans to FILE (Chrome trace JSON)")
+    parser.add_argument("--trace-every", type=int, default=30,
+                        help="trace one frame in N (alert frames are always traced)")
+    add_alert_arguments(parser)
+    args = parser.parse_args()
+
+    print("Instructions:")
+    print(" - Press 'E' to calibrate BOTH posture and eyes.")
+    print(" - Press 'Q' or ESC to quit.")
+    camera = int(args.camera) if args.camera.isdigit() else args.camera
+    Pipeline(args.backend, camera, (args.width, args.height), args.slots,
+             args.pin, not args.no_smoothing, sinks_from_args(args), args.state, args.trace, args.trace_every,
+             args.config).run()
@@ -0,0 +1,309 @@
+import warnings
+
+import numpy as np
+
+from core.landmarks import as_array
+from core.snapshot import export_fields, import_fields
+
+
+class PostureDetector:
+    """
+    Shared posture calculator used by every backend.
+    - Does NOT run its own MediaPipe model.
+    - Receives pose landmarks (33-point BlazePose layout) from any backend.
+    - Compares ratio-based metrics against a calibrated baseline.
+    - LIMITS are the detect_posture() thresholds; configure() changes them in place
+      (core/config.py), keeping the baseline.
+    """
+
+    # Pose landmark indices (mediapipe.solutions.pose.PoseLandmark)
+    NOSE = 0
+    LEFT_EYE = 2
+    RIGHT_EYE = 5
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+
+    STATE_FIELDS = ("baseline", "calib_mode", "calib_metrics", "calib_frames")
+
+    # Section of the config file (core/config.py) that holds this detector's LIMITS
+    CONFIG_SECTION = "posture"
+    LIMITS = {"ratio_drop": 0.15, "shoulder_tilt": 10.0, "head_shift": 0.05}
+
+    def __init__(self, **limits):
+        self.limits = dict(self.LIMITS)
+        self.configure(**limits)
+        self.reset()
+
+    def configure(self, **limits):
+        """Change detection thresholds; the baseline and calibration are kept."""
+        unknown = set(limits) - set(self.LIMITS)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no limit(s): {', '.join(sorted(unknown))}")
+        self.limits.update({name: float(value) for name, value in limits.items()})
+
+    def reset(self):
+        """Clear the baseline and any calibration in progress."""
+        self.baseline = None  # To store baseline posture metrics
+
+        # Calibration state
+        self.calib_mode = False
+        self.calib_metrics = []
+        self.calib_frames = 50 # Default
+
+    def get_state(self):
+        """Baseline and calibration progress as plain JSON types (see core/snapshot.py)."""
+        return export_fields(self, self.STATE_FIELDS)
+
+    def set_state(self, state):
+        self.reset()
+        import_fields(self, state, self.STATE_FIELDS)
+
+    def start_calibration(self, frames=50):
+        self.calib_mode = True
+        self.calib_metrics = []
+        self.calib_frames = frames
+        print("Posture calibration started... Sit in your ideal posture.")
+
+    def process_calibration(self, metrics):
+        if not self.calib_mode:
+            return False # Not calibrating
+
+        if metrics:
+            self.calib_metrics.append(metrics)
+
+        if len(self.calib_metrics) >= self.calib_frames:
+            self.set_baseline(self.calib_metrics)
+            self.calib_mode = False
+            print("✅ Posture calibration complete.")
+            return True # Calibration finished
+
+        return False # Calibration ongoing
+
+    def calculate_metrics(self, landmarks):
+        if landmarks is None:
+            return None
+
+        try:
+            pts = as_array(landmarks)
+
+            # Extract important points (normalized x, y)
+            left_eye = pts[self.LEFT_EYE]
+            right_eye = pts[self.RIGHT_EYE]
+            left_shoulder = pts[self.LEFT_SHOULDER]
+            right_shoulder = pts[self.RIGHT_SHOULDER]
+            nose = pts[self.NOSE]
+
+            # Compute distances in normalized coordinates
+            eye_center_y = (left_eye[1] + right_eye[1]) / 2
+            shoulder_center_y = (left_shoulder[1] + right_shoulder[1]) / 2
+
+            eye_to_shoulder = abs(eye_center_y - shoulder_center_y)
+            shoulder_width = abs(left_shoulder[0] - right_shoulder[0])
+
+            # Ratio-based metric for camera-distance invariance
+            if shoulder_width < 0.01: # Avoid division by zero
+                return None
+            normalized_eye_to_shoulder = eye_to_shoulder / shoulder_width
+
+            # Shoulder angle (slouch or tilt)
+            shoulder_slope = np.degrees(
+                np.arctan2(left_shoulder[1] - right_shoulder[1], left_shoulder[0] - right_shoulder[0])
+            )
+
+            # Forward head posture check (nose alignment)
+            head_forward = abs(nose[0] - (left_shoulder[0] + right_shoulder[0]) / 2)
+
+            return {
+                "eye_shoulder_ratio": float(normalized_eye_to_shoulder),
+                "shoulder_angle": float(shoulder_slope),
+                "head_forward": float(head_forward)
+            }
+        except Exception as e:
+            return None
+
+    def set_baseline(self, metrics_list):
+        valid_metrics = [m for m in metrics_list if m is not None]
+        if not valid_metrics:
+            print("⚠️ Could not capture posture baseline. Please try again.")
+            return
+
+        avg_metrics = {key: float(np.mean([m[key] for m in valid_metrics])) for key in valid_metrics[0].keys()}
+        self.baseline = avg_metrics
+        print("✅ Baseline posture captured:", self.baseline)
+
+    def detect_posture(self, metrics):
+        if not self.baseline or metrics is None:
+            return "Calculating..."
+
+        ratio_drop = (self.baseline["eye_shoulder_ratio"] - metrics["eye_shoulder_ratio"]) / self.baseline["eye_shoulder_ratio"]
+        head_shift = abs(metrics["head_forward"] - self.baseline["head_forward"])
+        shoulder_tilt = abs(metrics["shoulder_angle"] - self.baseline["shoulder_angle"])
+
+        if ratio_drop > self.limits["ratio_drop"]:
+            return "⚠️ Possible hunchback detected"
+        elif shoulder_tilt > self.limits["shoulder_tilt"]:
+            return "⚠️ Uneven shoulders"
+        elif head_shift > self.limits["head_shift"]:
+            return "⚠️ Forward head posture"
+        else:
+            return "✅ Good posture"
+
+
+class SidePostureDetector(PostureDetector):
+    """
+    Posture from a side camera, where forward-head and slouching show up directly.
+    - Uses the ear, shoulder and hip of the side facing the camera (higher visibility).
+    - neck_angle:   ear-over-shoulder line vs. vertical (forward head raises it).
+    - head_forward: horizontal ear-shoulder offset in units of ear-shoulder distance,
+                    positive when the head is in front of the shoulder.
+    - torso_angle:  shoulder-over-hip line vs. vertical (slouching raises it);
+                    NaN while the hip is hidden, e.g. behind a desk.
+    - `aspect` is the frame width / height, so angles are measured in pixel space.
+    """
+
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+
+    CONFIG_SECTION = "side_posture"
+    LIMITS = {"torso_shift": 10.0, "neck_shift": 10.0}
+
+    def __init__(self, aspect=4 / 3, min_visibility=0.5):
+        self.aspect = aspect
+        self.min_visibility = min_visibility
+        super().__init__()
+
+    def calculate_metrics(self, landmarks):
+        if landmarks is None:
+            return None
+
+        pts = as_array(landmarks)
+        left = pts[[self.LEFT_EAR, self.LEFT_SHOULDER, self.LEFT_HIP]]
+        right = pts[[self.RIGHT_EAR, self.RIGHT_SHOULDER, self.RIGHT_HIP]]
+        ear, shoulder, hip = left if left[:2, 3].sum() >= right[:2, 3].sum() else right
+        if min(ear[3], shoulder[3]) < self.min_visibility:
+            return None
+
+        # Facing direction from the nose, so the camera can sit on either side
+        facing = 1.0 if pts[self.NOSE][0] >= ear[0] else -1.0
+        dx = (ear[0] - shoulder[0]) * self.aspect * facing
+        dy = shoulder[1] - ear[1]
+        neck = np.hypot(dx, dy)
+        if neck < 0.01:
+            return None
+
+        torso_angle = float("nan")
+        if hip[3] >= self.min_visibility:
+            tx = (shoulder[0] - hip[0]) * self.aspect * facing
+            torso_angle = float(np.degrees(np.arctan2(tx, hip[1] - shoulder[1])))
+
+        return {
+            "neck_angle": float(np.degrees(np.arctan2(dx, dy))),
+            "head_forward": float(dx / neck),
+            "torso_angle": torso_angle
+        }
+
+    def set_baseline(self, metrics_list):
+        valid_metrics = [m for m in metrics_list if m is not None]
+        if not valid_metrics:
+            print("⚠️ Could not capture posture baseline. Please try again.")
+            return
+
+        # nanmean: the hip may only be visible in part of the calibration frames
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN torso_angle stays NaN
+            self.baseline = {key: float(np.nanmean([m[key] for m in valid_metrics])) for key in valid_metrics[0]}
+        print("✅ Baseline posture captured (side view):", self.baseline)
+
+    def detect_posture(self, metrics):
+        if not self.baseline or metrics is None:
+            return "Calculating..."
+
+        neck_shift = metrics["neck_angle"] - self.baseline["neck_angle"]
+        torso_shift = metrics["torso_angle"] - self.baseline["torso_angle"]  # NaN if either hip was hidden
+
+        if torso_shift > self.limits["torso_shift"]:
+            return "⚠️ Possible hunchback detected"
+        elif neck_shift > self.limits["neck_shift"]:
+            return "⚠️ Forward head posture"
+        else:
+            return "✅ Good posture"
+
+
+class FacePostureDetector(PostureDetector):
+    """
+    Posture from face landmarks alone (FaceMesh layout), so no body model has to run.
+    - pitch / yaw: orientation of a least-squares plane through rigid face points
+      (forehead, nose, eye corners, temples), solved for all points in one lstsq call.
+      Positive pitch = head tilted down.
+    - roll:        angle of the line between the outer eye corners.
+    - face_scale:  3D outer eye-corner distance; grows when leaning toward the screen
+                   and does not change with head rotation.
+    - face_drop:   vertical position of the nose bridge, in face-scale units; grows
+                   when slumping lowers the head in the frame.
+    Everything is compared against a calibrated baseline, like the body detectors.
+    - `aspect` is the frame width / height; FaceMesh x and z share one scale, y does not.
+    """
+
+    # No lips or jaw: they move when talking or yawning
+    RIGID_POINTS = [10, 151, 9, 8, 168, 6, 197, 195, 5, 4, 1, 33, 133, 362, 263,
+                    234, 454, 127, 356, 93, 323, 67, 297, 109, 338, 103, 332]
+    LEFT_EYE_OUTER = 33
+    RIGHT_EYE_OUTER = 263
+    NOSE_BRIDGE = 168
+
+    CONFIG_SECTION = "face_posture"
+    LIMITS = {"face_drop": 0.5, "scale_gain": 0.15, "pitch_shift": 15.0, "roll_shift": 10.0}
+
+    def __init__(self, aspect=4 / 3):
+        self.aspect = aspect
+        super().__init__()
+
+    def calculate_metrics(self, landmarks):
+        if landmarks is None:
+            return None
+
+        pts = as_array(landmarks)
+        if len(pts) <= max(self.RIGID_POINTS):
+            return None
+        # Width units on every axis
+        xyz = pts[self.RIGID_POINTS, :3] * (1.0, 1.0 / self.aspect, 1.0)
+
+        # Plane z = a*x + b*y + c through the rigid points
+        A = np.column_stack([xyz[:, 0], xyz[:, 1], np.ones(len(xyz))])
+        (a, b, _), *_ = np.linalg.lstsq(A, xyz[:, 2], rcond=None)
+
+        left = pts[self.LEFT_EYE_OUTER, :3] * (1.0, 1.0 / self.aspect, 1.0)
+        right = pts[self.RIGHT_EYE_OUTER, :3] * (1.0, 1.0 / self.aspect, 1.0)
+        face_scale = float(np.linalg.norm(right - left))
+        if face_scale < 0.01:
+            return None
+
+        return {
+            "pitch": float(np.degrees(np.arctan(b))),
+            "yaw": float(np.degrees(np.arctan(a))),
+            "roll": float(np.degrees(np.arctan2(right[1] - left[1], right[0] - left[0]))),
+            "face_scale": face_scale,
+            "face_drop": float(pts[self.NOSE_BRIDGE, 1] / self.aspect / face_scale)
+        }
+
+    def detect_posture(self, metrics):
+        if not self.baseline or metrics is None:
+            return "Calculating..."
+
+        scale_gain = metrics["face_scale"] / self.baseline["face_scale"] - 1.0
+        # Drop in baseline face-scale units, so it does not grow just from leaning in
+        drop = (metrics["face_drop"] * metrics["face_scale"] / self.baseline["face_scale"]
+                - self.baseline["face_drop"])
+        pitch_shift = metrics["pitch"] - self.baseline["pitch"]
+        roll_shift = abs(metrics["roll"] - self.baseline["roll"])
+
+        if drop > self.limits["face_drop"]:
+            return "⚠️ Possible hunchback detected"
+        elif scale_gain > self.limits["scale_gain"] or pitch_shift > self.limits["pitch_shift"]:
+            return "⚠️ Forward head posture"
+        elif roll_shift > self.limits["roll_shift"]:
+            return "⚠️ Head tilted"
+        else:
+            return "✅ Good posture"
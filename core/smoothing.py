@@ -0,0 +1,103 @@
+import numpy as np
+
+from core.eye_strain import EyeStrainDetector
+from core.posture import PostureDetector
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., 2012) over a whole landmark array at once.
+    - Low-pass whose cutoff rises with speed: still landmarks are smoothed hard
+      (min_cutoff), fast ones follow with little lag (beta).
+    - Works on the x, y, z columns of an (N, 4) array; visibility passes through.
+    - min_cutoff / beta can be set per landmark group, e.g. eyes light, shoulders heavy.
+    - Uses the real frame interval, and restarts after gaps longer than max_gap seconds.
+
+    groups: list of (indices, min_cutoff, beta); landmarks not listed use the defaults.
+    Cutoffs are in Hz, speeds in normalized image units per second.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0, groups=None, max_gap=0.5):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.groups = groups or []
+        self.max_gap = max_gap
+        self._params = None  # (min_cutoff, beta) columns, built for the first array size
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    def _build_params(self, n):
+        min_cutoff = np.full((n, 1), float(self.min_cutoff))
+        beta = np.full((n, 1), float(self.beta))
+        for indices, group_cutoff, group_beta in self.groups:
+            min_cutoff[indices] = group_cutoff
+            beta[indices] = group_beta
+        self._params = (min_cutoff, beta)
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, landmarks, timestamp):
+        """Return a smoothed copy of `landmarks` (an (N, 4) array, or None)."""
+        if landmarks is None:
+            return None
+        x = landmarks[:, :3]
+        if self._params is None or len(self._params[0]) != len(x):
+            self._build_params(len(x))
+            self._x = None
+
+        dt = None if self._t is None else timestamp - self._t
+        if self._x is None or dt is None or dt <= 0 or dt > self.max_gap:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+        else:
+            min_cutoff, beta = self._params
+            dx = (x - self._x) / dt
+            self._dx += self._alpha(dt, self.d_cutoff) * (dx - self._dx)
+            # Cutoff follows each landmark's (x, y) speed
+            speed = np.linalg.norm(self._dx[:, :2], axis=1, keepdims=True)
+            self._x += self._alpha(dt, min_cutoff + beta * speed) * (x - self._x)
+        self._t = timestamp
+
+        out = landmarks.copy()
+        out[:, :3] = self._x
+        return out
+
+
+# Eye and mouth points feed EAR/MAR, which EyeStrainDetector already low-passes;
+# a high beta lets the filter open up during a blink so blinks keep their shape.
+FACE_GROUPS = [
+    (EyeStrainDetector.LEFT_EYE_IDX + EyeStrainDetector.RIGHT_EYE_IDX, 1.0, 100.0),
+    ([EyeStrainDetector.MOUTH_TOP, EyeStrainDetector.MOUTH_BOTTOM,
+      EyeStrainDetector.MOUTH_LEFT, EyeStrainDetector.MOUTH_RIGHT], 2.0, 20.0),
+]
+# Posture changes over seconds: the points PostureDetector uses are smoothed hard
+POSE_GROUPS = [
+    ([PostureDetector.NOSE, PostureDetector.LEFT_EYE, PostureDetector.RIGHT_EYE,
+      PostureDetector.LEFT_SHOULDER, PostureDetector.RIGHT_SHOULDER], 0.3, 5.0),
+]
+
+
+class LandmarkSmoother:
+    """Face and pose filters for one person, applied to a FrameResult's landmarks."""
+
+    def __init__(self, face_groups=FACE_GROUPS, pose_groups=POSE_GROUPS):
+        self.face = OneEuroFilter(min_cutoff=1.0, beta=10.0, groups=face_groups)
+        self.pose = OneEuroFilter(min_cutoff=1.0, beta=10.0, groups=pose_groups)
+
+    def reset(self):
+        self.face.reset()
+        self.pose.reset()
+
+    def __call__(self, result):
+        """Smooth result.face_landmarks / result.pose_landmarks in place; returns result."""
+        result.face_landmarks = self.face(result.face_landmarks, result.timestamp)
+        result.pose_landmarks = self.pose(result.pose_landmarks, result.timestamp)
+        return result
@@ -0,0 +1,196 @@
+"""
+Versioned snapshot / restore of detector and alert state.
+
+- EyeStrainDetector, PostureDetector (and its subclasses) and SmartAlerts expose
+  get_state() / set_state(): only per-person state (calibration, baselines, blink
+  history, state machines, timers), never configuration.
+- snapshot() bundles components into one versioned dict; dumps() / loads() turn it
+  into compact zlib-compressed JSON (a calibrated session is well under 2 KB).
+- restore() checks the format, version and component types before touching anything,
+  so a bad or foreign snapshot leaves the running detectors as they were.
+- Checkpointer saves periodically from the frame loop; the file is written on a
+  background thread with an atomic replace, so a crash never leaves half a file.
+
+Timestamps are capture times (time.time()), so a session can resume on another host
+as long as the clocks are synchronized.
+
+Usage:
+    checkpoints = Checkpointer("state.bin", interval=30)
+    checkpoints.load(eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+    checkpoints.maybe_save(ts, eye=eye_detector, posture=posture_detector, alerts=smart_alerts)
+"""
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+
+FORMAT = "posture-monitor-state"
+VERSION = 1
+
+# Upgrades from older snapshot versions: {old_version: function(snapshot) -> snapshot of old_version + 1}
+MIGRATIONS = {}
+
+
+def export_fields(obj, fields):
+    """Attribute values as JSON types: deques and tuples become lists."""
+    state = {}
+    for name in fields:
+        value = getattr(obj, name)
+        if isinstance(value, (deque, tuple)):
+            value = list(value)
+        state[name] = value
+    return state
+
+
+def import_fields(obj, state, fields):
+    """Inverse of export_fields: keeps the container type the attribute has after reset()."""
+    for name in fields:
+        if name not in state:
+            continue
+        value = state[name]
+        if isinstance(getattr(obj, name), deque):
+            value = deque(value)
+        setattr(obj, name, value)
+
+
+def snapshot(timestamp=None, **components):
+    """Versioned snapshot of every component (objects with get_state()); None components are skipped."""
+    return {
+        "format": FORMAT,
+        "version": VERSION,
+        "saved_at": time.time() if timestamp is None else timestamp,
+        "components": {name: {"type": type(obj).__name__, "state": obj.get_state()}
+                       for name, obj in components.items() if obj is not None},
+    }
+
+
+def _migrate(snap):
+    if snap.get("format") != FORMAT:
+        raise ValueError("Not a posture monitor state snapshot")
+    version = snap.get("version")
+    if not isinstance(version, int) or version > VERSION:
+        raise ValueError(f"Snapshot version {version} is newer than this code (version {VERSION})")
+    while version < VERSION:
+        if version not in MIGRATIONS:
+            raise ValueError(f"No migration from snapshot version {version}")
+        snap = MIGRATIONS[version](snap)
+        version = snap["version"]
+    return snap
+
+
+def restore(snap, **components):
+    """
+    Load a snapshot into the given components (name=object). Components missing from
+    the snapshot are left alone. Returns the names that were restored.
+    Raises ValueError, without changing anything, on a foreign, newer or mismatched snapshot.
+    """
+    snap = _migrate(snap)
+    saved = snap["components"]
+    for name, obj in components.items():
+        if obj is not None and name in saved and saved[name]["type"] != type(obj).__name__:
+            raise ValueError(f"Snapshot '{name}' is a {saved[name]['type']}, not a {type(obj).__name__}")
+    restored = []
+    for name, obj in components.items():
+        if obj is not None and name in saved:
+            obj.set_state(saved[name]["state"])
+            restored.append(name)
+    return restored
+
+
+def dumps(snap):
+    return zlib.compress(json.dumps(snap, separators=(",", ":")).encode("utf-8"))
+
+
+def loads(data):
+    try:
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+    except (zlib.error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Corrupt state snapshot: {e}")
+
+
+def _atomic_write(path, data):
+    """Readers see the old file or the new one, never a partial one."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def save(path, snap):
+    _atomic_write(path, dumps(snap))
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a session to `path`.
+    - maybe_save() builds the snapshot on the caller's thread (a few dicts and lists)
+      and hands the bytes to a writer thread; a checkpoint still waiting to be written
+      is replaced by the newer one.
+    - close() queues a final checkpoint when components are given and waits for the writer.
+    """
+
+    def __init__(self, path, interval=30.0):
+        self.path = path
+        self.interval = interval
+        self._last = None
+        self.restored_at = None  # saved_at of the snapshot load() restored
+        self._pending = queue.Queue(maxsize=1)
+        self.saved = 0
+        self._thread = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def load(self, **components):
+        """Restore from `path` if it exists; returns the restored names ([] if there was nothing usable)."""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            snap = load(self.path)
+            restored = restore(snap, **components)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Ignoring state file {self.path}: {e}")
+            return []
+        self.restored_at = snap["saved_at"]
+        age = time.time() - snap["saved_at"]
+        print(f"✅ Restored {', '.join(restored) or 'nothing'} from {self.path} (saved {age:.0f}s ago)")
+        return restored
+
+    def maybe_save(self, timestamp, **components):
+        if self._last is not None and timestamp - self._last < self.interval:
+            return False
+        self._last = timestamp
+        data = dumps(snapshot(timestamp, **components))
+        try:
+            self._pending.get_nowait()  # drop an older checkpoint that was not written yet
+        except queue.Empty:
+            pass
+        self._pending.put_nowait(data)
+        return True
+
+    def _write_loop(self):
+        while True:
+            data = self._pending.get()
+            if data is None:
+                break
+            try:
+                _atomic_write(self.path, data)
+                self.saved += 1
+            except OSError as e:
+                print(f"⚠️ Checkpoint failed: {e}")
+
+    def close(self, timestamp=None, **components):
+        if components:
+            self._last = None
+            self.maybe_save(time.time() if timestamp is None else timestamp, **components)
+        self._pending.put(None)
+        self._thread.join(timeout=5.0)
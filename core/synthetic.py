@@ -0,0 +1,404 @@
+"""
+Synthetic Holistic-shaped landmark streams with labeled ground truth.
+
+SyntheticUser scripts one person at a desk: open-eye EAR noise, blinks, long eye
+closures, yawns and posture episodes (slouch, shoulder tilt, forward head) that
+drift in and out. session() renders it frame by frame as a (478, 4) FaceMesh array
+and a (33, 4) BlazePose array, which go straight into
+EyeStrainDetector.process_landmarks and PostureDetector.calculate_metrics. No
+camera or MediaPipe is needed.
+
+evaluate() runs the detectors on a session and scores every event type
+(precision / recall against the ground truth). Run it as a module to stress-test
+many simulated users on one core:
+
+Usage (from the repository root):
+    python -m core.synthetic --users 200 --seconds 120
+    python -m core.synthetic --users 2000 --seconds 10 --noise 0.002
+"""
+import argparse
+import contextlib
+import io
+import time
+import numpy as np
+
+from core.eye_strain import EyeStrainDetector
+from core.posture import PostureDetector
+
+OPEN_EAR = 0.30
+CLOSED_EAR = 0.04
+OPEN_MAR, YAWN_MAR = 0.3, 0.9
+
+# Face geometry in width units (x) and height-normalized y
+EYE_WIDTH = 0.045
+EYE_CENTERS = [(0.47, 0.37), (0.53, 0.37)]  # left, right (image coordinates)
+MOUTH_CENTER = (0.5, 0.45)
+MOUTH_HALF_WIDTH = 0.025
+NOSE_TIP = 1
+
+# What PostureDetector should report during each posture episode
+POSTURE_VERDICTS = {
+    "slouch": "⚠️ Possible hunchback detected",
+    "tilt": "⚠️ Uneven shoulders",
+    "forward": "⚠️ Forward head posture",
+}
+
+# EAR landmark order: p1 corner, p2/p3 upper lid, p4 corner, p5/p6 lower lid
+_EYE_X = np.array([-0.5, -1 / 6, 1 / 6, 0.5, 1 / 6, -1 / 6]) * EYE_WIDTH
+_EYE_Y = np.array([0.0, -0.5, -0.5, 0.0, 0.5, 0.5]) * EYE_WIDTH  # times EAR
+
+
+def _poisson_events(rng, start, end, per_minute, duration, gap=0.5):
+    """Non-overlapping (start, end) intervals with exponential spacing."""
+    events = []
+    if per_minute <= 0:
+        return events
+    t = start + rng.exponential(60.0 / per_minute)
+    while t < end:
+        length = rng.uniform(*duration)
+        if t + length > end:
+            break
+        events.append((t, t + length))
+        t += length + gap + rng.exponential(60.0 / per_minute)
+    return events
+
+
+def _ramp(t, start, end, rise):
+    """0 outside [start, end], ramps to 1 over `rise` seconds at both ends."""
+    return np.clip(np.minimum(t - start, end - t) / rise, 0.0, 1.0)
+
+
+class SyntheticUser:
+    """
+    Scripted person: event rates are per minute, durations are (min, max) seconds.
+    - The first `calib_seconds` are open eyes and good posture, for calibration.
+    - landmark_noise / pose_noise: per-frame jitter (normalized units), like a
+      landmark model's output noise.
+    - timestamp_jitter: std of the capture-time jitter (seconds).
+    """
+
+    def __init__(self,
+                 seed=0,
+                 width=640,
+                 height=480,
+                 blink_rate=15.0,
+                 blink_duration=(0.1, 0.3),
+                 blink_depth=(0.03, 0.15),
+                 closure_rate=0.5,
+                 closure_duration=(1.5, 3.0),
+                 yawn_rate=0.5,
+                 yawn_duration=(2.5, 5.0),
+                 posture_rate=1.0,
+                 posture_duration=(8.0, 20.0),
+                 posture_kinds=("slouch", "tilt", "forward"),
+                 drift_seconds=2.0,
+                 ear_noise=0.01,
+                 landmark_noise=0.0005,
+                 pose_noise=0.003,
+                 timestamp_jitter=0.0,
+                 calib_seconds=3.0):
+        self.rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.blink_rate = blink_rate
+        self.blink_duration = blink_duration
+        self.blink_depth = blink_depth
+        self.closure_rate = closure_rate
+        self.closure_duration = closure_duration
+        self.yawn_rate = yawn_rate
+        self.yawn_duration = yawn_duration
+        self.posture_rate = posture_rate
+        self.posture_duration = posture_duration
+        self.posture_kinds = posture_kinds
+        self.drift_seconds = drift_seconds
+        self.ear_noise = ear_noise
+        self.landmark_noise = landmark_noise
+        self.pose_noise = pose_noise
+        self.timestamp_jitter = timestamp_jitter
+        self.calib_seconds = calib_seconds
+        self._face_template = self._make_face_template()
+        self._pose_template = self._make_pose_template()
+
+    # --------------------------- Templates ---------------------------
+    def _make_face_template(self):
+        """Static 478-point face; only the eye, mouth and nose points are placed exactly."""
+        rng = np.random.default_rng(0)
+        face = np.zeros((478, 4))
+        angle = rng.uniform(0, 2 * np.pi, 478)
+        radius = np.sqrt(rng.uniform(0, 1, 478))
+        face[:, 0] = 0.5 + 0.07 * radius * np.cos(angle)
+        face[:, 1] = 0.40 + 0.12 * radius * np.sin(angle)
+        face[NOSE_TIP, :2] = (0.5, 0.41)
+        face[:, 3] = 1.0
+        return face
+
+    def _make_pose_template(self):
+        pose = np.zeros((33, 4))
+        pose[:, 0] = np.linspace(0.35, 0.65, 33)
+        pose[:, 1] = np.linspace(0.3, 1.0, 33)
+        pose[:, 3] = 1.0
+        pose[PostureDetector.NOSE, :2] = (0.5, 0.41)
+        pose[PostureDetector.LEFT_EYE, :2] = EYE_CENTERS[0]
+        pose[PostureDetector.RIGHT_EYE, :2] = EYE_CENTERS[1]
+        pose[PostureDetector.LEFT_SHOULDER, :2] = (0.62, 0.62)
+        pose[PostureDetector.RIGHT_SHOULDER, :2] = (0.38, 0.62)
+        return pose
+
+    # --------------------------- Script ---------------------------
+    def session(self, seconds, fps=30.0):
+        return SyntheticSession(self, seconds, fps)
+
+
+class SyntheticSession:
+    """
+    One rendered script.
+    - events: list of {"kind", "start", "end"}; kinds are blink, closure, yawn and
+      the posture kinds.
+    - Iterating yields (timestamp, face, pose, labels). face/pose are reused buffers,
+      valid until the next frame; labels is {"eyes": open/blink/closed, "yawn": bool,
+      "posture": good or a posture kind}.
+    """
+
+    def __init__(self, user, seconds, fps):
+        self.user = user
+        self.fps = fps
+        rng = user.rng
+        start = user.calib_seconds + 1.0
+        t = np.arange(int(seconds * fps)) / fps
+        if user.timestamp_jitter > 0:
+            t = np.maximum.accumulate(t + rng.normal(0.0, user.timestamp_jitter, len(t)))
+        self.t = t
+
+        closures = _poisson_events(rng, start, seconds - 1.0, user.closure_rate, user.closure_duration, gap=2.0)
+        yawns = _poisson_events(rng, start, seconds - 1.0, user.yawn_rate, user.yawn_duration, gap=2.0)
+        postures = _poisson_events(rng, start, seconds - 1.0, user.posture_rate, user.posture_duration,
+                                   gap=2 * user.drift_seconds + 2.0)
+        # Blinks never overlap a long closure (with 0.5 s margin)
+        blinks = [b for b in _poisson_events(rng, start, seconds - 0.5, user.blink_rate, user.blink_duration, gap=0.3)
+                  if all(b[1] < c[0] - 0.5 or b[0] > c[1] + 0.5 for c in closures)]
+
+        # Per-frame signals
+        ear = OPEN_EAR + rng.normal(0.0, user.ear_noise, len(t))
+        eye_label = np.zeros(len(t), np.int8)  # 0 open, 1 blink, 2 closed
+        for b0, b1 in blinks:
+            phase = (t - b0) / (b1 - b0)
+            inside = (phase >= 0) & (phase <= 1)
+            depth = np.sin(np.pi * phase[inside]) ** 0.6
+            ear[inside] = OPEN_EAR - (OPEN_EAR - rng.uniform(*user.blink_depth)) * depth
+            eye_label[inside] = 1
+        for c0, c1 in closures:
+            level = _ramp(t, c0, c1, 0.1)
+            inside = level > 0
+            ear[inside] = OPEN_EAR - (OPEN_EAR - CLOSED_EAR) * level[inside]
+            eye_label[inside] = 2
+
+        mar = np.full(len(t), OPEN_MAR)
+        yawn_label = np.zeros(len(t), bool)
+        for y0, y1 in yawns:
+            level = _ramp(t, y0, y1, 0.4)
+            mar += (YAWN_MAR - OPEN_MAR) * level
+            yawn_label |= level > 0
+
+        head_dx = np.zeros(len(t))
+        head_dy = np.zeros(len(t))
+        tilt = np.zeros(len(t))
+        posture_label = np.zeros(len(t), np.int8)  # 0 good, i+1 = posture_kinds[i]
+        posture_events = []
+        for p0, p1 in postures:
+            kind_index = rng.integers(len(user.posture_kinds))
+            kind = user.posture_kinds[kind_index]
+            level = _ramp(t, p0, p1, user.drift_seconds)
+            if kind == "slouch":
+                head_dy += 0.08 * level       # head sinks toward the shoulders
+            elif kind == "tilt":
+                tilt += 0.045 * level         # ~20 degrees across 0.24 shoulder width
+            elif kind == "forward":
+                head_dx += 0.09 * level       # nose off the shoulder midline
+            posture_label[level > 0] = kind_index + 1
+            posture_events.append({"kind": kind, "start": p0, "end": p1})
+
+        self.ear, self.mar = ear, mar
+        self.head_dx, self.head_dy, self.tilt = head_dx, head_dy, tilt
+        self._eye_label, self._yawn_label, self._posture_label = eye_label, yawn_label, posture_label
+        self.events = sorted(
+            [{"kind": "blink", "start": a, "end": b} for a, b in blinks] +
+            [{"kind": "closure", "start": a, "end": b} for a, b in closures] +
+            [{"kind": "yawn", "start": a, "end": b} for a, b in yawns] +
+            posture_events, key=lambda e: e["start"])
+
+    def __len__(self):
+        return len(self.t)
+
+    def __iter__(self):
+        user = self.user
+        rng = user.rng
+        aspect = user.width / user.height
+        face = user._face_template.copy()
+        pose = user._pose_template.copy()
+        eye_idx = [EyeStrainDetector.LEFT_EYE_IDX, EyeStrainDetector.RIGHT_EYE_IDX]
+        mouth_idx = [EyeStrainDetector.MOUTH_LEFT, EyeStrainDetector.MOUTH_RIGHT,
+                     EyeStrainDetector.MOUTH_TOP, EyeStrainDetector.MOUTH_BOTTOM]
+        head_pose_idx = [PostureDetector.NOSE, PostureDetector.LEFT_EYE, PostureDetector.RIGHT_EYE]
+        shoulders = [PostureDetector.LEFT_SHOULDER, PostureDetector.RIGHT_SHOULDER]
+        eye_names = ("open", "blink", "closed")
+        posture_names = ("good",) + tuple(user.posture_kinds)
+
+        for i, ts in enumerate(self.t):
+            dx, dy = self.head_dx[i], self.head_dy[i]
+            # Face: template moved with the head, then eyes and mouth from the script
+            np.copyto(face, user._face_template)
+            face[:, 0] += dx
+            face[:, 1] += dy
+            for (cx, cy), idx in zip(EYE_CENTERS, eye_idx):
+                face[idx, 0] = cx + dx + _EYE_X
+                face[idx, 1] = cy + dy + _EYE_Y * self.ear[i] * aspect
+            mx, my = MOUTH_CENTER[0] + dx, MOUTH_CENTER[1] + dy
+            half = MOUTH_HALF_WIDTH
+            face[mouth_idx, 0] = (mx - half, mx + half, mx, mx)
+            face[mouth_idx, 1] = (my, my, my - self.mar[i] * half * aspect, my + self.mar[i] * half * aspect)
+            if user.landmark_noise > 0:
+                face[:, :2] += rng.normal(0.0, user.landmark_noise, (478, 2))
+
+            # Pose: head points follow the head, shoulders tilt around their midpoint
+            np.copyto(pose, user._pose_template)
+            pose[head_pose_idx, 0] += dx
+            pose[head_pose_idx, 1] += dy
+            pose[shoulders, 1] += (-self.tilt[i], self.tilt[i])
+            if user.pose_noise > 0:
+                pose[:, :2] += rng.normal(0.0, user.pose_noise, (33, 2))
+
+            labels = {"eyes": eye_names[self._eye_label[i]],
+                      "yawn": bool(self._yawn_label[i]),
+                      "posture": posture_names[self._posture_label[i]]}
+            yield ts, face, pose, labels
+
+
+# --------------------------- Scoring ---------------------------
+def _rising_edges(t, flags):
+    flags = np.asarray(flags, bool)
+    edges = np.flatnonzero(np.diff(flags.astype(int), prepend=0) == 1)
+    return list(t[edges])
+
+
+def match_events(detected, truth, slack=0.5):
+    """
+    Precision/recall of detection times against ground-truth (start, end) intervals.
+    A repeat detection inside an interval that is already matched (an alert that
+    flickers off and on) is not counted again.
+    """
+    matched = set()
+    tp = repeats = 0
+    for d in detected:
+        hits = [i for i, (s, e) in enumerate(truth) if s - slack <= d <= e + slack]
+        new = [i for i in hits if i not in matched]
+        if new:
+            matched.add(new[0])
+            tp += 1
+        elif hits:
+            repeats += 1
+    n_detected = len(detected) - repeats
+    precision = tp / n_detected if n_detected else 1.0
+    recall = tp / len(truth) if truth else 1.0
+    return {"true": len(truth), "detected": n_detected, "precision": precision, "recall": recall}
+
+
+def evaluate(session, eye_detector=None, posture_detector=None, smoother=None):
+    """
+    Run both detectors over a session (calibrating them on its first frames) and
+    score blinks, drowsiness, yawns and every posture kind.
+    `smoother` is an optional core.smoothing.LandmarkSmoother applied before the detectors.
+    """
+    eye_detector = eye_detector or EyeStrainDetector()
+    posture_detector = posture_detector or PostureDetector()
+    shape = (session.user.height, session.user.width, 3)
+    t = session.t
+    blinks = []
+    drowsy = np.zeros(len(t), bool)
+    yawn = np.zeros(len(t), bool)
+    verdicts = [None] * len(t)
+
+    # Calibration messages would flood the terminal with many users
+    with contextlib.redirect_stdout(io.StringIO()):
+        eye_detector.start_calibration()
+        posture_detector.start_calibration(frames=int(session.user.calib_seconds * session.fps * 0.5))
+        for i, (ts, face, pose, _) in enumerate(session):
+            if smoother is not None:
+                face = smoother.face(face, ts)
+                pose = smoother.pose(pose, ts)
+            count = eye_detector.blink_count
+            info, _, _ = eye_detector.process_landmarks(face, shape, ts)
+            if eye_detector.blink_count > count:
+                blinks.append(eye_detector.blink_timestamps[-1])
+            if info is not None:
+                drowsy[i] = "drowsy" in info["status"].lower()
+                yawn[i] = info["yawn"]
+            metrics = posture_detector.calculate_metrics(pose)
+            if posture_detector.calib_mode:
+                posture_detector.process_calibration(metrics)
+            else:
+                verdicts[i] = posture_detector.detect_posture(metrics)
+
+    truth = {}
+    for e in session.events:
+        truth.setdefault(e["kind"], []).append((e["start"], e["end"]))
+    scores = {
+        "blink": match_events(blinks, truth.get("blink", []), slack=0.2),
+        # Drowsy alerts fire drowsy_time_seconds into the closure
+        "closure": match_events(_rising_edges(t, drowsy), truth.get("closure", []), slack=1.0),
+        "yawn": match_events(_rising_edges(t, yawn), truth.get("yawn", []), slack=1.0),
+    }
+    for kind in session.user.posture_kinds:
+        flags = [v == POSTURE_VERDICTS[kind] for v in verdicts]
+        scores[kind] = match_events(_rising_edges(t, flags), truth.get(kind, []),
+                                    slack=session.user.drift_seconds)
+    return scores
+
+
+def merge_scores(all_scores):
+    """Pool per-user scores into one precision/recall per event type."""
+    merged = {}
+    for scores in all_scores:
+        for kind, s in scores.items():
+            m = merged.setdefault(kind, {"true": 0, "detected": 0, "tp_p": 0.0, "tp_r": 0.0})
+            m["true"] += s["true"]
+            m["detected"] += s["detected"]
+            m["tp_p"] += s["precision"] * s["detected"]
+            m["tp_r"] += s["recall"] * s["true"]
+    return {kind: {"true": m["true"], "detected": m["detected"],
+                   "precision": m["tp_p"] / m["detected"] if m["detected"] else 1.0,
+                   "recall": m["tp_r"] / m["true"] if m["true"] else 1.0}
+            for kind, m in merged.items()}
+
+
+def run(users=100, seconds=60.0, fps=30.0, seed=0, smoothing=False, **user_kwargs):
+    """Evaluate `users` simulated users on this core; returns (scores, frames per second)."""
+    from core.smoothing import LandmarkSmoother
+    all_scores = []
+    frames = 0
+    start = time.perf_counter()
+    for u in range(users):
+        session = SyntheticUser(seed=seed + u, **user_kwargs).session(seconds, fps)
+        all_scores.append(evaluate(session, smoother=LandmarkSmoother() if smoothing else None))
+        frames += len(session)
+    elapsed = time.perf_counter() - start
+    return merge_scores(all_scores), frames / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress-test the detectors with synthetic users.")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--noise", type=float, default=0.0005, help="face landmark jitter")
+    parser.add_argument("--pose-noise", type=float, default=0.003, help="pose landmark jitter")
+    parser.add_argument("--smoothing", action="store_true", help="apply the One Euro landmark filter")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scores, fps = run(args.users, args.seconds, args.fps, args.seed, args.smoothing,
+                      landmark_noise=args.noise, pose_noise=args.pose_noise)
+    print(f"{args.users} users x {args.seconds:.0f}s at {args.fps:.0f} FPS: "
+          f"{fps:.0f} frames/s on one core = {fps / args.fps:.0f} real-time users per core")
+    print(f"{'event':<9} {'true':>6} {'detected':>9} {'precision':>10} {'recall':>7}")
+    for kind, s in scores.items():
+        print(f"{kind:<9} {s['true']:6d} {s['detected']:9d} {s['precision']:10.2f} {s['recall']:7.2f}")
@@ -0,0 +1,195 @@
+"""
+End-to-end latency tracing, from frame capture to alert delivery.
+
+- Each frame gets a FrameTrace. mark(name) closes the span that started at the
+  previous mark (the first span starts at the capture timestamp), so the frame loop
+  pays one clock read and one tuple per stage.
+- One frame in `sample_every` is exported. A frame that raises an alert is always
+  exported, and so are its deliveries: AlertDispatcher reports, per sink, the time in
+  the sink queue and the time spent delivering. Alert latency (capture -> delivered)
+  is measured for every alert, not only sampled ones, because that is the number the
+  SLA is on.
+- close() writes the Chrome trace event format (JSON). Open it in chrome://tracing or
+  https://ui.perfetto.dev. Frames are on one track and each alert sink has its own
+  track. Flow arrows link an alert frame to its deliveries.
+- All times are wall clock (time.time()), like capture timestamps, so spans recorded
+  in another process (core/pipeline.py) line up.
+
+Usage:
+    tracer = Tracer("trace.json", sample_every=30)
+    trace = tracer.frame(capture_ts, start=read_start)
+    trace.mark("inference"); trace.mark("detectors")
+    tracer.finish(trace)
+    tracer.close()    # writes the file and prints alert latency
+"""
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameTrace:
+    """Spans of one frame: [(name, start, end)] in wall-clock seconds."""
+
+    __slots__ = ("frame", "capture_ts", "spans", "sampled", "alert", "alert_ts", "_last")
+
+    def __init__(self, frame, capture_ts, start=None, sampled=True, spans=None):
+        self.frame = frame
+        self.capture_ts = capture_ts
+        self.spans = list(spans) if spans else []
+        self.sampled = sampled
+        self.alert = None
+        self.alert_ts = None
+        self._last = self.spans[-1][2] if self.spans else (capture_ts if start is None else start)
+
+    def mark(self, name, now=None):
+        now = time.time() if now is None else now
+        self.spans.append((name, self._last, now))
+        self._last = now
+
+    def set_alert(self, reason):
+        self.alert = reason
+        self.alert_ts = time.time()
+
+    @property
+    def keep(self):
+        return self.sampled or self.alert is not None
+
+
+class _NoTrace:
+    """Stand-in when tracing is off: every call is a no-op."""
+
+    frame = None
+    alert = None
+    keep = False
+
+    def mark(self, name, now=None):
+        pass
+
+    def set_alert(self, reason):
+        pass
+
+
+NO_TRACE = _NoTrace()
+
+
+class Tracer:
+    """
+    Collects sampled frame traces and alert deliveries; exports Chrome trace JSON.
+    - sample_every: export one frame in this many (alert frames always).
+    - max_events: bound on buffered trace events; the oldest are dropped first.
+    """
+
+    FRAME_TRACK = 1
+
+    def __init__(self, path, sample_every=30, max_events=200000, process_name="posture monitor"):
+        self.path = path
+        self.sample_every = max(1, sample_every)
+        self.process_name = process_name
+        self.origin = time.time()
+        self._events = deque(maxlen=max_events)
+        self._tracks = {"frames": self.FRAME_TRACK}
+        self._alert_frames = {}  # capture timestamp -> frame number, for flow arrows
+        self._lock = threading.Lock()  # sinks report from their own threads
+        self.frames = 0
+        self.exported = 0
+        self.alert_latency = {}  # sink -> [seconds from capture to delivery]
+
+    def _us(self, t):
+        return round((t - self.origin) * 1e6, 1)
+
+    def _track(self, name):
+        if name not in self._tracks:
+            self._tracks[name] = len(self._tracks) + 1
+        return self._tracks[name]
+
+    # --- frame loop ---
+    def frame(self, capture_ts, start=None):
+        """New trace for the next frame; `start` is when reading it began (default: capture_ts)."""
+        self.frames += 1
+        return FrameTrace(self.frames, capture_ts, start, (self.frames - 1) % self.sample_every == 0)
+
+    def resume(self, frame, capture_ts, spans, alert=None):
+        """Continue a trace recorded in another process (see core/pipeline.py)."""
+        self.frames += 1
+        trace = FrameTrace(frame, capture_ts, spans=spans, sampled=True)
+        if alert:
+            self.alerted(trace, alert)
+        return trace
+
+    def alerted(self, trace, reason):
+        """The frame raised an alert: always export it and link it to the deliveries."""
+        if trace is NO_TRACE:
+            return
+        trace.set_alert(reason)
+        with self._lock:
+            self._alert_frames[trace.capture_ts] = trace.frame
+
+    def finish(self, trace):
+        if not trace.keep:
+            return
+        spans = trace.spans
+        start = min(trace.capture_ts, spans[0][1]) if spans else trace.capture_ts
+        end = spans[-1][2] if spans else trace.capture_ts
+        args = {"frame": trace.frame, "age_ms": round((end - trace.capture_ts) * 1000, 2)}
+        if trace.alert:
+            args["alert"] = trace.alert
+        events = [{"name": "alert frame" if trace.alert else "frame", "cat": "frame", "ph": "X",
+                   "ts": self._us(start), "dur": round((end - start) * 1e6, 1), "pid": 1,
+                   "tid": self.FRAME_TRACK, "args": args}]
+        for name, s, e in spans:
+            events.append({"name": name, "cat": "stage", "ph": "X", "ts": self._us(s),
+                           "dur": round((e - s) * 1e6, 1), "pid": 1, "tid": self.FRAME_TRACK,
+                           "args": {"frame_age_ms": round((s - trace.capture_ts) * 1000, 2)}})
+        if trace.alert:
+            events.append({"name": "alert", "cat": "alert", "ph": "s", "id": trace.frame,
+                           "ts": self._us(trace.alert_ts or end), "pid": 1, "tid": self.FRAME_TRACK})
+        with self._lock:
+            self._events.extend(events)
+            self.exported += 1
+
+    # --- alert sinks (called on the dispatcher threads) ---
+    def delivered(self, alert, sink, queued, started, ended, ok=True):
+        """One delivery attempt chain of `alert` by `sink` finished at `ended`."""
+        latency = ended - alert["time"]
+        with self._lock:
+            tid = self._track(f"alerts: {sink}")
+            frame = self._alert_frames.get(alert["time"])
+            args = {"reason": alert["reason"], "alert_latency_ms": round(latency * 1000, 2), "ok": ok}
+            self._events.append({"name": f"{sink} queue", "cat": "alert", "ph": "X", "ts": self._us(queued),
+                                 "dur": round((started - queued) * 1e6, 1), "pid": 1, "tid": tid, "args": args})
+            self._events.append({"name": f"{sink} deliver", "cat": "alert", "ph": "X", "ts": self._us(started),
+                                 "dur": round((ended - started) * 1e6, 1), "pid": 1, "tid": tid, "args": args})
+            if frame is not None:
+                self._events.append({"name": "alert", "cat": "alert", "ph": "f", "bp": "e", "id": frame,
+                                     "ts": self._us(started), "pid": 1, "tid": tid})
+            if ok:
+                self.alert_latency.setdefault(sink, []).append(latency)
+
+    # --- export ---
+    def summary(self):
+        """Alert latency per sink: count, p50, p95 and max in milliseconds."""
+        with self._lock:
+            latency = {sink: list(v) for sink, v in self.alert_latency.items()}
+        return {sink: {"alerts": len(v),
+                       "p50_ms": round(float(np.percentile(v, 50)) * 1000, 1),
+                       "p95_ms": round(float(np.percentile(v, 95)) * 1000, 1),
+                       "max_ms": round(max(v) * 1000, 1)} for sink, v in latency.items()}
+
+    def save(self):
+        with self._lock:
+            meta = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.process_name}}]
+            meta += [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                     for name, tid in self._tracks.items()]
+            events = meta + list(self._events)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, separators=(",", ":"))
+
+    def close(self):
+        self.save()
+        print(f"Trace: {self.exported}/{self.frames} frames written to {self.path}")
+        for sink, s in self.summary().items():
+            print(f"  Alert latency via {sink}: p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms, "
+                  f"max {s['max_ms']} ms over {s['alerts']} alerts")
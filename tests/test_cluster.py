@@ -0,0 +1,173 @@
+"""
+Multi-process tests for core/cluster.py: the coordinator and every inference node run as
+separate local processes (python -m core.cluster ...) and talk HTTP, as on real hosts.
+- HashRing: adding, removing or down-weighting a node moves only that node's streams.
+- Routing: a stream keeps its node until the ring changes, then moves only if needed.
+- Handoff: a stream claimed by a new node resumes from the old node's last frame, not
+  from the last periodic checkpoint (needs a MediaPipe with `solutions`).
+
+Run from the repository root:
+    python -m pytest tests/test_cluster.py
+"""
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.cluster import HashRing, StreamClient, _request  # noqa: E402
+
+# Includes ids that need URL encoding
+STREAMS = [f"desk-{i}" for i in range(150)] + ["desk 1/a&b=%20", "ü-cam"]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait(predicate, timeout=20.0, what="condition"):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.1)
+    raise AssertionError(f"Timed out waiting for {what}")
+
+
+def _get(url):
+    try:
+        status, body = _request(url, timeout=2.0)
+    except OSError:
+        return None
+    return json.loads(body) if status == 200 else None
+
+
+def _has_mediapipe_solutions():
+    if importlib.util.find_spec("mediapipe") is None:
+        return False
+    import mediapipe as mp
+    return hasattr(mp, "solutions")
+
+
+class LocalCluster:
+    """A coordinator process plus node processes on this machine."""
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self.procs = {}
+        self.url = f"http://127.0.0.1:{_free_port()}"
+        self._start("coordinator", "coordinator", "--port", self.url.rsplit(":", 1)[1])
+        _wait(lambda: _get(f"{self.url}/status"), what="the coordinator")
+
+    def _start(self, name, *args):
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "w")
+        self.procs[name] = subprocess.Popen([sys.executable, "-m", "core.cluster", *args], cwd=ROOT,
+                                            stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+
+    def start_node(self, name):
+        self._start(name, "node", "--coordinator", self.url, "--name", name, "--capacity", "1")
+        _wait(lambda: name in (_get(f"{self.url}/status") or {}).get("nodes", {}), what=f"{name} to join")
+
+    def stop_node(self, name):
+        self.procs.pop(name).kill()  # no final checkpoint, like a crashed host
+        _wait(lambda: name not in _get(f"{self.url}/status")["nodes"], what=f"{name} to leave")
+
+    def routes(self, streams=STREAMS):
+        return {s: _get(f"{self.url}/route?" + urllib.parse.urlencode({"stream": s}))["node"] for s in streams}
+
+    def node_status(self, name):
+        url = _get(f"{self.url}/status")["nodes"][name]["url"]
+        return _get(f"{url}/status")
+
+    def close(self):
+        for proc in self.procs.values():
+            proc.kill()
+            proc.wait()
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    c = LocalCluster(str(tmp_path))
+    yield c
+    c.close()
+
+
+def test_ring_moves_only_affected_streams():
+    ring = HashRing({"a": 1.0, "b": 1.0, "c": 1.0})
+    before = {s: ring.lookup(s) for s in STREAMS}
+
+    ring.set("d", 1.0)
+    after = {s: ring.lookup(s) for s in STREAMS}
+    moved = [s for s in STREAMS if after[s] != before[s]]
+    assert moved and all(after[s] == "d" for s in moved)
+    assert 0.1 < len(moved) / len(STREAMS) < 0.45
+
+    ring.remove("d")
+    assert {s: ring.lookup(s) for s in STREAMS} == before
+
+    ring.set("b", 0.5)
+    lighter = {s: ring.lookup(s) for s in STREAMS}
+    moved = [s for s in STREAMS if lighter[s] != before[s]]
+    assert moved and all(before[s] == "b" for s in moved)
+
+
+def test_routing_is_sticky_across_processes(cluster):
+    cluster.start_node("node-a")
+    cluster.start_node("node-b")
+    routes = cluster.routes()
+    assert set(routes.values()) == {"node-a", "node-b"}
+    assert cluster.routes() == routes
+
+    cluster.start_node("node-c")
+    grown = cluster.routes()
+    moved = [s for s in STREAMS if grown[s] != routes[s]]
+    assert moved and all(grown[s] == "node-c" for s in moved)
+
+    cluster.stop_node("node-b")
+    shrunk = cluster.routes()
+    for s in STREAMS:
+        if grown[s] == "node-b":
+            assert shrunk[s] in ("node-a", "node-c")
+        else:
+            assert shrunk[s] == grown[s]
+
+
+@pytest.mark.skipif(not _has_mediapipe_solutions(), reason="needs mediapipe.solutions for the node backend")
+def test_handoff_resumes_from_last_frame(cluster):
+    # A stream that node-b takes over from node-a once it joins
+    stream = next(s for s in STREAMS if HashRing({"node-a": 1.0, "node-b": 1.0}).lookup(s) == "node-b")
+    cluster.start_node("node-a")
+    client = StreamClient(cluster.url, stream)
+    frame = np.full((240, 320, 3), 128, np.uint8)
+
+    # node-a checkpoints on the first frame and then only every 5 s
+    first = client.send(frame, command="calibrate")
+    assert first is not None and first["node"] == "node-a"
+    deadline = time.time() + 2.0
+    while time.time() < deadline:
+        assert client.send(frame)["node"] == "node-a"
+        time.sleep(0.05)
+    last_frame = time.time()
+
+    cluster.start_node("node-b")
+    _wait(lambda: cluster.routes([stream])[stream] == "node-b", what="the stream to move")
+    client.route = None
+    out = client.send(frame)
+    assert out is not None and out["node"] == "node-b"
+
+    restored_at = cluster.node_status("node-b")["restored_at"][stream]
+    assert restored_at >= last_frame
+    assert stream not in _wait(lambda: cluster.node_status("node-a"), what="node-a status")["streams"]
@@ -0,0 +1,53 @@
+"""
+Tests for core/config.py: model settings are range-checked, and a model rebuild that fails
+at reload time keeps the running backend.
+
+Run from the repository root:
+    python -m pytest tests/test_config.py
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backends import BACKENDS, InferenceBackend  # noqa: E402
+from core.config import rebuild_backend, validate  # noqa: E402
+
+
+class _FlakyBackend(InferenceBackend):
+    """Accepts model_complexity like the real backends, but only builds with 0."""
+
+    name = "flaky"
+
+    def __init__(self, model_complexity=0):
+        if model_complexity != 0:
+            raise RuntimeError("model not available")
+        self.model_complexity = model_complexity
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("value", [5, -1, 1.5])
+def test_model_complexity_out_of_range_is_rejected(value):
+    with pytest.raises(ValueError, match="model_complexity"):
+        validate({"model": {"model_complexity": value}})
+
+
+def test_model_settings_in_range_are_accepted():
+    assert validate({"model": {"model_complexity": 2, "min_detection_confidence": 0.7}})["model"] == \
+        {"model_complexity": 2, "min_detection_confidence": 0.7}
+
+
+def test_failed_rebuild_keeps_running_backend(monkeypatch):
+    monkeypatch.setitem(BACKENDS, _FlakyBackend.name, _FlakyBackend)
+    running = _FlakyBackend()
+
+    backend, kwargs = rebuild_backend(running, "flaky", {}, {"model": {"model_complexity": 1}})
+    assert backend is running and kwargs == {} and not running.closed
+
+    backend, kwargs = rebuild_backend(running, "flaky", {}, {"model": {"model_complexity": 0}})
+    assert backend is not running and kwargs == {"model_complexity": 0} and running.closed
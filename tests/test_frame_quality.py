@@ -0,0 +1,51 @@
+"""
+Tests for core/frame_quality.py: the blur check adapts to a scene change instead of
+rejecting every frame of a plainer scene forever, while short motion blur is still caught.
+
+Run from the repository root:
+    python -m pytest tests/test_frame_quality.py
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_quality import FrameQualityGate  # noqa: E402
+
+
+def _busy(rng):
+    """Cluttered, high-detail scene: very high Laplacian variance."""
+    return rng.integers(40, 220, (480, 640, 3), np.uint8)
+
+
+def _plain(i):
+    """Plain but in-focus scene: sharp edges, good contrast, far less detail."""
+    frame = np.full((480, 640, 3), 90, np.uint8)
+    cv2.rectangle(frame, (200 + i % 5, 150), (440, 330), (200, 200, 200), -1)
+    cv2.circle(frame, (320, 240), 50, (60, 60, 60), -1)
+    return frame
+
+
+def test_scene_change_recovers():
+    rng = np.random.default_rng(0)
+    gate = FrameQualityGate()
+    assert all(gate.check(_busy(rng)) is None for _ in range(60))
+
+    results = [gate.check(_plain(i)) for i in range(300)]
+    # The first second looks like motion blur against the busy scene, then the gate re-baselines
+    assert results.index(None) <= gate.rebaseline_after
+    assert all(r is None for r in results[gate.rebaseline_after + 5:])
+    assert gate.rebaselines == 1
+
+
+def test_short_blur_is_still_rejected():
+    gate = FrameQualityGate()
+    assert all(gate.check(_plain(i)) is None for i in range(30))
+
+    blurred = [gate.check(cv2.GaussianBlur(_plain(i), (31, 31), 0)) for i in range(10)]
+    assert blurred == ["blurred"] * 10
+    assert gate.rebaselines == 0
+    assert gate.check(_plain(3)) is None